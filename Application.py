@@ -0,0 +1,25 @@
+# ---------------------------------------------------------------------------
+# 🧭 APPLICATION UNIQUE — Dashboard, CEO et fiches de trading dans un seul serveur
+# ---------------------------------------------------------------------------
+# Lancement : streamlit run Application.py   (depuis ce dossier, ou via Launcher.py)
+#
+# Un seul processus Streamlit sert toutes les pages : imports, caches
+# (st.cache_resource / st.cache_data), connexions Drive / Sheets et files
+# d'écriture sont partagés au lieu d'être dupliqués par application.
+# Chaque page reste lançable seule (`streamlit run CEO.py`, etc.).
+import streamlit as st
+
+# Adresse de chaque page : http://localhost:8501/<url_path> (utilisée par le Launcher)
+PAGES = {
+    "Trading": [
+        st.Page("Dashboard.py", title="Dashboard", icon="📊", url_path="dashboard", default=True),
+        st.Page("trading_app/Saisie de Fiche.py", title="Saisie de Fiche", icon="📋", url_path="saisie"),
+        st.Page("trading_app/pages/historique.py", title="Historique", icon="📅", url_path="historique"),
+        st.Page("trading_app/pages/recherche.py", title="Recherche", icon="🔎", url_path="recherche"),
+    ],
+    "Pilotage": [
+        st.Page("CEO.py", title="CEO", icon="📈", url_path="ceo"),
+    ],
+}
+
+st.navigation(PAGES).run()
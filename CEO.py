@@ -1,14 +1,30 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from openpyxl import load_workbook, Workbook
 import os
 
+from outils import historique_feuilles as historique
+from outils import profilage
+from outils.classeur import ecrire_feuilles, lire_classeur
+from outils.ecriture_differee import FileEcriture
+from outils.sessions import lire_sessions, version_sessions
+
 # === CONFIGURATION ===
 st.set_page_config(page_title="CEO Dashboard", page_icon="📈", layout="wide")
+profilage.demarrer("ceo")
+
+# 📁 Emplacement du fichier Excel (CEO_EXCEL_FILE permet de pointer vers un autre classeur)
+EXCEL_FILE = os.environ.get("CEO_EXCEL_FILE", r"C:\Users\tgiorello\Documents\Dashboard\suivi_objectifs.xlsx")
+
+# 📏 Sessions du Dashboard (Parquet à côté de Dashboard.py, quel que soit le dossier de lancement)
+SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
 
-# 📁 Emplacement du fichier Excel
-EXCEL_FILE = r"C:\Users\tgiorello\Documents\Dashboard\suivi_objectifs.xlsx"
+# ⏳ Sauvegarde automatique : fenêtre de regroupement des modifications (s)
+AUTOSAVE_DELAY = 2.0
+# 📓 Versions en attente d'écriture, rejouées après un arrêt brutal du serveur
+AUTOSAVE_JOURNAL = os.path.join(
+    os.path.dirname(EXCEL_FILE), f".attente_{os.path.splitext(os.path.basename(EXCEL_FILE))[0]}"
+)
 
 # === OUTIL DE VÉRIFICATION / CRÉATION ===
 def _ensure_excel_file(path: str):
@@ -16,6 +32,8 @@ def _ensure_excel_file(path: str):
     parent = os.path.dirname(path)
     os.makedirs(parent, exist_ok=True)
     if not os.path.exists(path):
+        from openpyxl import Workbook  # seulement à la création du classeur
+
         wb = Workbook()
         ws = wb.active
         ws.title = "Init"
@@ -24,29 +42,159 @@ def _ensure_excel_file(path: str):
 # Vérifie ou crée le dossier/fichier dès le lancement
 _ensure_excel_file(EXCEL_FILE)
 
+# 🕰️ Historique des feuilles (différences de cellules, base SQLite à côté du classeur)
+HISTORY_DB = historique.chemin_historique(EXCEL_FILE)
+
 # === OUTIL COMMUN ===
-def save_to_excel(df, sheet_name):
-    """Sauvegarde les données et crée un historique daté."""
-    _ensure_excel_file(EXCEL_FILE)
+def lire_feuille(sheet_name):
+    """Feuille du classeur, depuis le cache du processus (une seule analyse par version du fichier).
 
-    # 1️⃣ Écriture de la feuille principale
-    with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
+    Les feuilles CEO font quelques dizaines de lignes : la copie renvoyée
+    protège le cache partagé pour un coût négligeable.
+    """
+    with profilage.span(f"classeur · {sheet_name}"):
+        return lire_classeur(EXCEL_FILE)[sheet_name].copy()
 
-    # 2️⃣ Ajout dans la feuille Historique
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    hist = df.copy()
-    hist["Horodatage"] = timestamp
-    hist_sheet = f"{sheet_name}_Historique"
 
+def _migrer_historique(sheet_name):
+    """Reprend une seule fois l'ancienne feuille `{sheet}_Historique` dans la base."""
+    if historique.a_un_historique(HISTORY_DB, sheet_name):
+        return
     try:
-        existing = pd.read_excel(EXCEL_FILE, sheet_name=hist_sheet)
-        hist = pd.concat([existing, hist], ignore_index=True)
+        legacy = lire_feuille(f"{sheet_name}_Historique")
     except Exception:
-        pass  # Première sauvegarde
+        return  # Pas d'ancien historique
+    historique.importer_snapshots(HISTORY_DB, sheet_name, legacy)
+
+
+def save_sheets_to_excel(feuilles):
+    """Écrit plusieurs feuilles en une seule réécriture du classeur, puis les historise.
+
+    Renvoie la durée de l'écriture du classeur (s).
+    """
+    _ensure_excel_file(EXCEL_FILE)
+
+    # 1️⃣ Écriture groupée et atomique des feuilles principales
+    with profilage.span("openpyxl · écriture classeur"):
+        duree = ecrire_feuilles(EXCEL_FILE, feuilles)
+
+    # 2️⃣ Historique : seules les cellules modifiées depuis la dernière version
+    with profilage.span("historique · enregistrement"):
+        for sheet_name, df in feuilles.items():
+            _migrer_historique(sheet_name)
+            historique.enregistrer(HISTORY_DB, sheet_name, df)
+    return duree
+
+
+def save_to_excel(df, sheet_name):
+    """Sauvegarde les données et historise uniquement les cellules modifiées."""
+    return save_sheets_to_excel({sheet_name: df})
+
+
+# === SAUVEGARDE AUTOMATIQUE DIFFÉRÉE ===
+@st.cache_resource(show_spinner=False)
+def _file_ecriture():
+    """File d'écriture unique du serveur, partagée par toutes les sessions."""
+    return FileEcriture(save_sheets_to_excel, delai=AUTOSAVE_DELAY, journal=AUTOSAVE_JOURNAL)
+
 
-    with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        hist.to_excel(writer, sheet_name=hist_sheet, index=False)
+def _appliquer_editions(base, etat):
+    """Reconstruit le tableau édité à partir de l'état d'un data_editor."""
+    df = base.astype(object).reset_index(drop=True)
+    for i, modifs in etat.get("edited_rows", {}).items():
+        for col, val in modifs.items():
+            df.at[int(i), col] = val
+    if etat.get("deleted_rows"):
+        df = df.drop(index=[int(i) for i in etat["deleted_rows"]])
+    if etat.get("added_rows"):
+        df = pd.concat([df, pd.DataFrame(etat["added_rows"], columns=df.columns)], ignore_index=True)
+    return df.reset_index(drop=True)
+
+
+def _base_editeur(state_key, charger):
+    """Tableau de départ d'un data_editor, figé pour la session (les éditions s'y appliquent)."""
+    cle = f"{state_key}__base"
+    if cle not in st.session_state:
+        st.session_state[cle] = charger()
+    return st.session_state[cle]
+
+
+def _autosave(state_key, sheet_name, base):
+    """Callback on_change : dépose la version éditée dans la file et rend la main."""
+    try:
+        df = _appliquer_editions(base, st.session_state.get(state_key) or {})
+        _file_ecriture().soumettre(sheet_name, df)
+    except Exception as e:
+        st.warning(f"Sauvegarde automatique impossible ({sheet_name}) : {e}")
+
+
+@st.fragment(run_every=AUTOSAVE_DELAY)
+def afficher_etat_sauvegarde():
+    """État de la file d'écriture (rafraîchi seul, sans relancer la page)."""
+    etat = _file_ecriture().etat()
+    with st.sidebar:
+        if etat["derniere_erreur"]:
+            st.error(f"⚠️ Écriture en échec, nouvel essai en cours : {etat['derniere_erreur']}")
+        if etat["en_attente"]:
+            st.info(f"⏳ En attente d'écriture : {', '.join(etat['en_attente'])}")
+            if st.button("💾 Écrire maintenant"):
+                _file_ecriture().vider()
+        elif etat["derniere_ecriture"]:
+            st.caption(
+                f"✅ Tout est enregistré — {etat['derniere_ecriture']:%H:%M:%S} "
+                f"({etat['derniere_duree']:.2f} s)"
+            )
+
+
+def afficher_historique(sheet_name):
+    """Vue « cette feuille à une date donnée », reconstruite depuis l'historique."""
+    with st.expander("🕰️ Voir cette feuille à une date"):
+        _migrer_historique(sheet_name)
+        versions = historique.horodatages(HISTORY_DB, sheet_name)
+        if not versions:
+            st.caption("Aucun historique enregistré pour cette feuille.")
+            return
+        c1, c2 = st.columns(2)
+        with c1:
+            jour = st.date_input("Date", datetime.now().date(), key=f"asof_date_{sheet_name}")
+        with c2:
+            heure = st.time_input("Heure", datetime.max.time().replace(microsecond=0), key=f"asof_time_{sheet_name}")
+        with profilage.span(f"historique · {sheet_name}"):
+            version, df_passe = historique.etat_a(HISTORY_DB, sheet_name, datetime.combine(jour, heure))
+        if df_passe is None:
+            st.info(f"Aucune version avant cette date (première : {versions[0]}).")
+        else:
+            st.caption(f"Version du {version} — {len(versions)} versions enregistrées.")
+            st.dataframe(df_passe, use_container_width=True, hide_index=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _mesures_sessions(version):
+    from outils.metriques import MetriquesSessions
+
+    metriques = MetriquesSessions()
+    metriques.reconstruire(lire_sessions(SESSIONS_DIR), version)
+    return metriques.resume(), metriques.depuis(365)
+
+
+def afficher_mesures_sessions():
+    """Discipline et drawdowns mesurés sur les sessions du Dashboard, face aux cibles."""
+    version = version_sessions(SESSIONS_DIR)
+    if version is None:
+        return  # pas de sessions enregistrées à côté de cette application
+    with profilage.span("métriques · sessions"):
+        total, douze_mois = _mesures_sessions(version)
+    if not total["sessions"]:
+        return
+    st.caption(f"📏 Mesuré sur {total['sessions']} sessions du Dashboard")
+    c1, c2, c3 = st.columns(3)
+    for col, titre, valeur, cible, ok in [
+        (c1, "Discipline", total["discipline"], "≥ 90 %", total["discipline"] >= 0.90),
+        (c2, "Drawdown max", total["drawdown_max_pct"], "≤ 10 %", total["drawdown_max_pct"] <= 0.10),
+        (c3, "DD 12 mois", douze_mois["drawdown_max_pct"], "≤ 15 %", douze_mois["drawdown_max_pct"] <= 0.15),
+    ]:
+        texte = "—" if pd.isna(valeur) else f"{100 * valeur:.1f} %"
+        col.metric(titre, texte, f"{'✅' if ok else '❌'} cible {cible}", delta_color="off")
 
 # === MENU PRINCIPAL ===
 page = st.sidebar.radio(
@@ -64,6 +212,7 @@ page = st.sidebar.radio(
         "🏢 Stratégie Entreprise",  # <— NOUVELLE PAGE
     ]
 )
+afficher_etat_sauvegarde()
 
 # =====================================================================
 # 🏠 PAGE 1 — DASHBOARD CEO
@@ -93,7 +242,7 @@ if page == "🏠 Dashboard CEO":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            df = pd.read_excel(EXCEL_FILE, sheet_name="Suivi")
+            df = lire_feuille("Suivi")
         except Exception:
             df = pd.DataFrame(base_data)
     else:
@@ -112,10 +261,13 @@ if page == "🏠 Dashboard CEO":
     ok = edited_df["Statut"].value_counts().get("✅", 0)
     total = len(edited_df)
     st.metric("Progression globale", f"{ok}/{total} validés")
+    afficher_mesures_sessions()
 
     if st.button("💾 Enregistrer les modifications"):
-        save_to_excel(edited_df, "Suivi")
-        st.success("✅ Données enregistrées et historisées.")
+        duree = save_to_excel(edited_df, "Suivi")
+        st.success(f"✅ Données enregistrées et historisées. ({duree:.2f} s)")
+
+    afficher_historique("Suivi")
 
 
 # =====================================================================
@@ -137,7 +289,7 @@ elif page == "🚀 Matrice Sortie de Job":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            matrix_df = pd.read_excel(EXCEL_FILE, sheet_name="Matrice")
+            matrix_df = lire_feuille("Matrice")
         except Exception:
             matrix_df = pd.DataFrame(base_matrix)
     else:
@@ -156,8 +308,8 @@ elif page == "🚀 Matrice Sortie de Job":
     st.metric("Score Sortie Job", f"{ok}/5")
 
     if st.button("💾 Enregistrer la matrice"):
-        save_to_excel(edited_matrix, "Matrice")
-        st.success("✅ Matrice enregistrée et historisée.")
+        duree = save_to_excel(edited_matrix, "Matrice")
+        st.success(f"✅ Matrice enregistrée et historisée. ({duree:.2f} s)")
 
 
 # =====================================================================
@@ -188,7 +340,7 @@ elif page == "🎯 Objectif à 24 mois":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            obj_df = pd.read_excel(EXCEL_FILE, sheet_name="Objectif_24M")
+            obj_df = lire_feuille("Objectif_24M")
         except Exception:
             obj_df = pd.DataFrame(base_objectif)
     else:
@@ -204,8 +356,8 @@ elif page == "🎯 Objectif à 24 mois":
     )
 
     if st.button("💾 Enregistrer les objectifs 24 mois"):
-        save_to_excel(edited_obj, "Objectif_24M")
-        st.success("✅ Objectif à 24 mois enregistré et historisé.")
+        duree = save_to_excel(edited_obj, "Objectif_24M")
+        st.success(f"✅ Objectif à 24 mois enregistré et historisé. ({duree:.2f} s)")
 
 
 # =====================================================================
@@ -225,7 +377,7 @@ elif page == "💰 Matelas de Sécurité":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            mat_df = pd.read_excel(EXCEL_FILE, sheet_name="Matelas_Secu")
+            mat_df = lire_feuille("Matelas_Secu")
         except Exception:
             mat_df = pd.DataFrame(base_mat)
     else:
@@ -242,8 +394,8 @@ elif page == "💰 Matelas de Sécurité":
     )
 
     if st.button("💾 Enregistrer le matelas de sécurité"):
-        save_to_excel(edited_mat, "Matelas_Secu")
-        st.success("✅ Matelas de sécurité enregistré et historisé.")
+        duree = save_to_excel(edited_mat, "Matelas_Secu")
+        st.success(f"✅ Matelas de sécurité enregistré et historisé. ({duree:.2f} s)")
 
 
 # =====================================================================
@@ -264,7 +416,7 @@ elif page == "🏦 Prop Firm":
     # Charger ou créer la feuille
     if os.path.exists(EXCEL_FILE):
         try:
-            prop_df = pd.read_excel(EXCEL_FILE, sheet_name="Prop_Firm")
+            prop_df = lire_feuille("Prop_Firm")
         except Exception:
             prop_df = pd.DataFrame(base_prop)
     else:
@@ -302,10 +454,12 @@ elif page == "🏦 Prop Firm":
 
     # Bouton de sauvegarde
     if st.button("💾 Enregistrer les données Prop Firm"):
-        save_to_excel(edited_prop, "Prop_Firm")
-        st.success("✅ Données Prop Firm enregistrées et historisées.")
+        duree = save_to_excel(edited_prop, "Prop_Firm")
+        st.success(f"✅ Données Prop Firm enregistrées et historisées. ({duree:.2f} s)")
         st.balloons()
 
+    afficher_historique("Prop_Firm")
+
 # =====================================================================
 # 📈 PAGE 6 — PROJECTION DE REVENU
 # =====================================================================
@@ -323,7 +477,7 @@ elif page == "📈 Projection de Revenu":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            proj_df = pd.read_excel(EXCEL_FILE, sheet_name="Projection_Revenu")
+            proj_df = lire_feuille("Projection_Revenu")
         except Exception:
             proj_df = pd.DataFrame(base_projection)
     else:
@@ -340,8 +494,8 @@ elif page == "📈 Projection de Revenu":
     )
 
     if st.button("💾 Enregistrer la projection de revenu"):
-        save_to_excel(edited_proj, "Projection_Revenu")
-        st.success("✅ Projection de revenu enregistrée et historisée.")
+        duree = save_to_excel(edited_proj, "Projection_Revenu")
+        st.success(f"✅ Projection de revenu enregistrée et historisée. ({duree:.2f} s)")
 
 
 # =====================================================================
@@ -362,7 +516,7 @@ elif page == "📊 Objectifs et KPI":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            kpi_df = pd.read_excel(EXCEL_FILE, sheet_name="Objectifs_KPI")
+            kpi_df = lire_feuille("Objectifs_KPI")
         except Exception:
             kpi_df = pd.DataFrame(base_kpi)
     else:
@@ -378,8 +532,8 @@ elif page == "📊 Objectifs et KPI":
     )
 
     if st.button("💾 Enregistrer les Objectifs & KPI"):
-        save_to_excel(edited_kpi, "Objectifs_KPI")
-        st.success("✅ Données Objectifs & KPI enregistrées et historisées.")
+        duree = save_to_excel(edited_kpi, "Objectifs_KPI")
+        st.success(f"✅ Données Objectifs & KPI enregistrées et historisées. ({duree:.2f} s)")
 
 
 # =====================================================================
@@ -399,7 +553,7 @@ elif page == "🗓️ Journal Mensuel":
 
     if os.path.exists(EXCEL_FILE):
         try:
-            journal_df = pd.read_excel(EXCEL_FILE, sheet_name="Journal_Mensuel")
+            journal_df = lire_feuille("Journal_Mensuel")
         except Exception:
             journal_df = pd.DataFrame(base_journal)
     else:
@@ -415,8 +569,8 @@ elif page == "🗓️ Journal Mensuel":
     )
 
     if st.button("💾 Enregistrer le Journal Mensuel"):
-        save_to_excel(edited_journal, "Journal_Mensuel")
-        st.success("✅ Journal mensuel enregistré et historisé.")
+        duree = save_to_excel(edited_journal, "Journal_Mensuel")
+        st.success(f"✅ Journal mensuel enregistré et historisé. ({duree:.2f} s)")
 
 
 # =====================================================================
@@ -437,36 +591,29 @@ elif page == "🧠 CheckPoint Psycho":
         **{f"M{i}": ["❌"] * 6 for i in range(1, 13)}
     }
 
-    # Charger les données existantes si dispo
-    if os.path.exists(EXCEL_FILE):
+    # Charger les données existantes si dispo (version en file d'écriture en priorité)
+    def _charger_psy():
+        en_attente = _file_ecriture().en_attente("Checkpoint_Psycho")
+        if en_attente is not None:
+            return en_attente
         try:
-            psy_df = pd.read_excel(EXCEL_FILE, sheet_name="Checkpoint_Psycho")
+            return lire_feuille("Checkpoint_Psycho")
         except Exception:
-            psy_df = pd.DataFrame(base_psy)
-    else:
-        psy_df = pd.DataFrame(base_psy)
-        with pd.ExcelWriter(EXCEL_FILE, engine="openpyxl", mode="a") as writer:
-            psy_df.to_excel(writer, sheet_name="Checkpoint_Psycho", index=False)
+            return pd.DataFrame(base_psy)
+
+    psy_df = _base_editeur("psy_table", _charger_psy)
 
     st.subheader("📅 Suivi psychologique sur 12 mois")
     st.caption("✅ Coche si le critère est respecté pour le mois concerné.")
 
-    # --- Sauvegarde automatique : toute modification est immédiatement persistée ---
-    def _save_psy():
-        try:
-            df = st.session_state["psy_table"]
-            if isinstance(df, pd.DataFrame):
-                save_to_excel(df, "Checkpoint_Psycho")
-                st.toast("Enregistré automatiquement ✅")
-        except Exception as e:
-            st.warning(f"Sauvegarde auto impossible : {e}")
-
+    # --- Sauvegarde automatique : chaque modification part dans la file d'écriture ---
     edited_psy = st.data_editor(
         psy_df,
         key="psy_table",
         use_container_width=True,
         hide_index=True,
-        on_change=_save_psy,
+        on_change=_autosave,
+        args=("psy_table", "Checkpoint_Psycho", psy_df),
         column_config={
             col: st.column_config.SelectboxColumn(col, options=["✅", "❌"]) 
             for col in [f"M{i}" for i in range(1, 13)]
@@ -486,8 +633,14 @@ elif page == "🧠 CheckPoint Psycho":
 
     # Bouton manuel (optionnel) pour forcer la sauvegarde et marquer un point dans l'historique
     if st.button("💾 Enregistrer le CheckPoint Psycho"):
-        save_to_excel(edited_psy if isinstance(edited_psy, pd.DataFrame) else psy_df, "Checkpoint_Psycho")
-        st.success("✅ CheckPoint Psycho enregistré et historisé avec succès.")
+        _file_ecriture().soumettre("Checkpoint_Psycho", edited_psy)
+        duree = _file_ecriture().vider()
+        if duree is None:
+            st.error(f"Enregistrement impossible : {_file_ecriture().etat()['derniere_erreur']}")
+        else:
+            st.success(f"✅ CheckPoint Psycho enregistré et historisé avec succès. ({duree:.2f} s)")
+
+    afficher_historique("Checkpoint_Psycho")
 
 # =====================================================================
 # 🏢 PAGE — STRATÉGIE ENTREPRISE (simple & pro, autosave sans boutons)
@@ -617,8 +770,11 @@ Hypothèses :
 
     # ---------- Helpers locaux ----------
     def _load_or_base(sheet_name: str, base_df: pd.DataFrame) -> pd.DataFrame:
+        en_attente = _file_ecriture().en_attente(sheet_name)
+        if en_attente is not None:
+            return en_attente
         try:
-            df = pd.read_excel(EXCEL_FILE, sheet_name=sheet_name)
+            df = lire_feuille(sheet_name)
             # Si colonnes incohérentes ou feuille vide, on repart de la base
             if df.empty or set(base_df.columns) - set(df.columns):
                 return base_df.copy()
@@ -626,15 +782,6 @@ Hypothèses :
         except Exception:
             return base_df.copy()
 
-    def _autosave_from_state(state_key: str, sheet_name: str):
-        try:
-            df = st.session_state.get(state_key)
-            if isinstance(df, pd.DataFrame):
-                save_to_excel(df, sheet_name)
-                st.toast(f"Enregistré dans '{sheet_name}'", icon="✅")
-        except Exception as e:
-            st.warning(f"Sauvegarde automatique impossible ({sheet_name}) : {e}")
-
     st.divider()
 
     # ======================= SECTION 1 — VUE D’ENSEMBLE =======================
@@ -693,7 +840,7 @@ Hypothèses :
         ],
         "Liaison comptable": ["Xero", "Non", "Non"]
     })
-    _comptes = _load_or_base("SE_Resume_Compte", base_comptes)
+    _comptes = _base_editeur("se_comptes", lambda: _load_or_base("SE_Resume_Compte", base_comptes))
 
     st.caption("Édite si nécessaire (autosave).")
     se_comptes = st.data_editor(
@@ -705,9 +852,10 @@ Hypothèses :
         column_config={
             "Liaison comptable": st.column_config.SelectboxColumn("Liaison comptable", options=["Xero", "Non"])
         },
-        on_change=_autosave_from_state,
-        args=("se_comptes", "SE_Resume_Compte"),
+        on_change=_autosave,
+        args=("se_comptes", "SE_Resume_Compte", _comptes),
     )
+    afficher_historique("SE_Resume_Compte")
     st.divider()
 
     # ======================= SECTION 3 — FLUX MENSUEL =======================
@@ -723,7 +871,7 @@ Hypothèses :
         ],
         "Statut / Note": ["", "", "", "", ""]
     })
-    _flux = _load_or_base("SE_Flux_Mensuel", base_flux)
+    _flux = _base_editeur("se_flux", lambda: _load_or_base("SE_Flux_Mensuel", base_flux))
 
     st.caption("Classe les étapes, ajoute des notes. Tri par Ordre recommandé.")
     se_flux = st.data_editor(
@@ -737,9 +885,10 @@ Hypothèses :
             "Étape": st.column_config.TextColumn("Étape"),
             "Statut / Note": st.column_config.TextColumn("Statut / Note"),
         },
-        on_change=_autosave_from_state,
-        args=("se_flux", "SE_Flux_Mensuel"),
+        on_change=_autosave,
+        args=("se_flux", "SE_Flux_Mensuel", _flux),
     )
+    afficher_historique("SE_Flux_Mensuel")
     st.divider()
 
     # ======================= SECTION 4 — NOTES =======================
@@ -749,7 +898,7 @@ Hypothèses :
         "• Andbank = socle perso local",
         "• Wise Personnel = voyages / loisirs"
     ]})
-    _notes = _load_or_base("SE_Notes", base_notes)
+    _notes = _base_editeur("se_notes", lambda: _load_or_base("SE_Notes", base_notes))
 
     st.caption("Texte libre (autosave).")
     se_notes = st.data_editor(
@@ -759,9 +908,10 @@ Hypothèses :
         hide_index=True,
         num_rows="dynamic",
         column_config={"Note": st.column_config.TextColumn("Note", help="Ajoute autant de lignes que nécessaire.")},
-        on_change=_autosave_from_state,
-        args=("se_notes", "SE_Notes"),
+        on_change=_autosave,
+        args=("se_notes", "SE_Notes", _notes),
     )
+    afficher_historique("SE_Notes")
 
     # --- AJOUT : Frais femme de ménage & impact fiscal (fin de page) ---
     st.divider()
@@ -826,3 +976,7 @@ avec seulement **~9 %** de fiscalité réelle, tout en ayant :
 """)
 
 
+# =====================================================================
+# ⏱️ PROFILAGE DU RERUN
+# =====================================================================
+profilage.panneau()
@@ -2,20 +2,37 @@ import io
 import json
 import os
 from datetime import datetime
-import tempfile
 
 import pandas as pd
-import plotly.express as px
 import streamlit as st
-from pydrive2.auth import GoogleAuth
-from pydrive2.drive import GoogleDrive
 from streamlit_option_menu import option_menu
 
+from outils import profilage
+from outils.cube_sessions import CubeSessions, correlation_binaire
+from outils.metriques import MetriquesSessions
+from outils.miniatures import generer, rendu
+from outils.sessions import (
+    COLONNES,
+    ajouter_session,
+    bornes_dates,
+    exporter_excel,
+    lire_sessions,
+    migrer_excel,
+    partitions,
+    version_sessions,
+)
+from outils.stockage_captures import enregistrer_capture, resoudre
+from outils.stockage_drive import StockDrive
+from outils.synchro import CibleDrive, MoteurSynchro
+
 
 # ---------------------------------------------------------------------------
 # 🔌 Google Drive helpers
 # ---------------------------------------------------------------------------
 def connect_drive():
+    from pydrive2.auth import GoogleAuth
+    from pydrive2.drive import GoogleDrive
+
     gauth = GoogleAuth()
     # Si le fichier token existe déjà, il évite de redemander la connexion
     if os.path.exists("mycreds.txt"):
@@ -26,6 +43,32 @@ def connect_drive():
     return GoogleDrive(gauth)
 
 
+@st.cache_resource(show_spinner=False)
+def _sa_drive():
+    """Drive via le compte de service (st.secrets), partagé par toutes les sessions."""
+    # Imports différés : pydrive2 n'est chargé qu'au premier accès à Drive
+    from pydrive2.auth import ServiceAccountCredentials
+    from pydrive2.drive import GoogleDrive
+
+    sa = st.secrets["gcp_service_account"]
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(
+        sa, scopes=["https://www.googleapis.com/auth/drive"]
+    )
+    return GoogleDrive(creds.CreateOAuth2())
+
+
+@st.cache_resource(show_spinner=False)
+def stock_drive():
+    """Stockage clé / valeur JSON (petits états : Mandala...) dans le dossier Drive partagé."""
+    return StockDrive(_sa_drive(), st.secrets["gcp_service_account"].get("drive_parent_folder_id"))
+
+
+@st.cache_resource(show_spinner=False)
+def moteur_synchro():
+    """Écritures vers Drive journalisées localement puis envoyées en arrière-plan."""
+    return MoteurSynchro(SYNC_JOURNAL, {"drive": CibleDrive(stock_drive())})
+
+
 def read_excel_from_drive(drive, file_id):
     file = drive.CreateFile({"id": file_id})
     file_content = io.BytesIO(file.GetContentBinary())
@@ -45,6 +88,72 @@ def save_excel_to_drive(drive, df, file_id):
 # 🧭 CONFIGURATION GLOBALE
 # ---------------------------------------------------------------------------
 st.set_page_config(page_title="Trading Dashboard", layout="wide")
+profilage.demarrer("dashboard")
+
+# 📁 Sessions : stockage Parquet partitionné par mois ; discipline.xlsx = export
+SESSIONS_DIR = "sessions"
+EXCEL_FILE = "discipline.xlsx"
+SYNC_JOURNAL = "synchro_journal.sqlite"  # écritures Drive en attente + dernier état distant
+
+# Migration unique : le premier lancement reprend l'historique Excel existant
+if version_sessions(SESSIONS_DIR) is None and not partitions(SESSIONS_DIR) and os.path.exists(EXCEL_FILE):
+    migrer_excel(EXCEL_FILE, SESSIONS_DIR)
+
+
+# ---------------------------------------------------------------------------
+# 🗄️ Cache partagé des sessions (toutes pages, toutes sessions navigateur)
+# ---------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _sessions_cachees(version, annee=None, mois=None, debut=None, fin=None):
+    return lire_sessions(SESSIONS_DIR, annee=annee, mois=mois, debut=debut, fin=fin)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _partitions_cachees(version):
+    return partitions(SESSIONS_DIR), bornes_dates(SESSIONS_DIR)
+
+
+def charger_sessions(annee=None, mois=None, debut=None, fin=None) -> pd.DataFrame:
+    """Sessions déjà typées, lues une fois par version du stockage.
+
+    Le DataFrame renvoyé est partagé entre sessions : ne jamais le modifier
+    en place (utiliser `.assign()` ou `.copy()`).
+    """
+    with profilage.span("sessions · lecture Parquet"):
+        return _sessions_cachees(version_sessions(SESSIONS_DIR), annee, mois, debut, fin)
+
+
+def charger_partitions():
+    """Partitions (année, mois) et bornes de dates, mises en cache par version."""
+    return _partitions_cachees(version_sessions(SESSIONS_DIR))
+
+
+@st.cache_resource(show_spinner=False)
+def _cube_sessions() -> CubeSessions:
+    return CubeSessions()
+
+
+def cube_sessions() -> CubeSessions:
+    """Cube d'agrégats partagé ; reconstruit seulement si le stockage a changé hors de nos ajouts."""
+    cube, version = _cube_sessions(), version_sessions(SESSIONS_DIR)
+    if cube.version is None or cube.version != version:
+        with profilage.span("cube · reconstruction"):
+            cube.reconstruire(lire_sessions(SESSIONS_DIR), version)
+    return cube
+
+
+@st.cache_resource(show_spinner=False)
+def _metriques_sessions() -> MetriquesSessions:
+    return MetriquesSessions()
+
+
+def metriques_sessions() -> MetriquesSessions:
+    """Indicateurs de performance partagés ; même règle de reconstruction que le cube."""
+    metriques, version = _metriques_sessions(), version_sessions(SESSIONS_DIR)
+    if metriques.version is None or metriques.version != version:
+        with profilage.span("métriques · reconstruction"):
+            metriques.reconstruire(charger_sessions(), version)
+    return metriques
 
 # ---------------------------------------------------------------------------
 # 🌌 MENU DE NAVIGATION
@@ -150,230 +259,316 @@ div[data-baseweb="select"] > div, .stNumberInput input, .stTextArea textarea {
 # 📊 PAGE DASHBOARD
 # ---------------------------------------------------------------------------
 if menu == "Dashboard":
-    st.markdown("## 🧾 Récapitulatif de la dernière session")
-
-    EXCEL_FILE = "discipline.xlsx"
-    if os.path.exists(EXCEL_FILE):
-        df_historique = pd.read_excel(EXCEL_FILE)
-    else:
-        df_historique = pd.DataFrame()
-
-    colonnes_attendues = [
-        "Date",
-        "Respect",
-        "Valeur",
-        "Montant",
-        "Erreur_Clé",
-        "Discipline",
-        "Mood",
-        "Commentaire",
-        "Axe_Opérationnel",
-        "Axe_Financier",
-        "Axe_Humain",
-        "Axe_Alignement",
-        "Capture",
-    ]
-    for col in colonnes_attendues:
-        if col not in df_historique.columns:
-            df_historique[col] = None
-
-    if "discipline_data" not in st.session_state:
-        st.session_state.discipline_data = df_historique.copy()
-
-    if not df_historique.empty:
-        if "Date" in df_historique.columns:
-            df_historique["Date"] = pd.to_datetime(df_historique["Date"], errors="coerce")
-        derniere_ligne = df_historique.iloc[-1]
-        montant_cumule = pd.to_numeric(
-            df_historique["Montant"], errors="coerce"
-        ).fillna(0).sum()
-    else:
-        derniere_ligne = pd.Series({col: None for col in colonnes_attendues})
-        montant_cumule = 0.0
+    # Chaque bloc est un fragment : une interaction ne relance que son bloc,
+    # pas la lecture des sessions, la courbe ni l'aperçu de capture.
+    CEO_FILE = "settings_ceo.json"
+    AXES = ["Opérationnel", "Financier", "Humain", "Alignement"]
+    NIVEAUX = ["🟢 Vert", "🟠 Orange", "🔴 Rouge"]
 
-    # 🔹 Récap en cartes (pas de st.metric pour éviter le doublon)
-    st.markdown(
-        f"""
-        <div class="recap-grid">
-            <div class="recap-card">
-                <div class="recap-title">💰 Montant cumulé (€)</div>
-                <div class="recap-value">{montant_cumule:,.2f}</div>
-            </div>
-            <div class="recap-card">
-                <div class="recap-title">📊 Respect du plan</div>
-                <div class="recap-value">{derniere_ligne.get("Respect") or "—"}</div>
-            </div>
-            <div class="recap-card">
-                <div class="recap-title">🧩 Erreur clé</div>
-                <div class="recap-value">{derniere_ligne.get("Erreur_Clé") or "—"}</div>
-            </div>
-            <div class="recap-card">
-                <div class="recap-title">🎯 Discipline</div>
-                <div class="recap-value">{derniere_ligne.get("Discipline") or "—"}</div>
-            </div>
-            <div class="recap-card">
-                <div class="recap-title">🧠 Mood</div>
-                <div class="recap-value">{derniere_ligne.get("Mood") or "—"}</div>
+    @profilage.fragment("récap")
+    def recap_cartes(derniere_ligne, montant_cumule):
+        # 🔹 Récap en cartes (pas de st.metric pour éviter le doublon)
+        st.markdown(
+            f"""
+            <div class="recap-grid">
+                <div class="recap-card">
+                    <div class="recap-title">💰 Montant cumulé (€)</div>
+                    <div class="recap-value">{montant_cumule:,.2f}</div>
+                </div>
+                <div class="recap-card">
+                    <div class="recap-title">📊 Respect du plan</div>
+                    <div class="recap-value">{derniere_ligne.get("Respect") or "—"}</div>
+                </div>
+                <div class="recap-card">
+                    <div class="recap-title">🧩 Erreur clé</div>
+                    <div class="recap-value">{derniere_ligne.get("Erreur_Clé") or "—"}</div>
+                </div>
+                <div class="recap-card">
+                    <div class="recap-title">🎯 Discipline</div>
+                    <div class="recap-value">{derniere_ligne.get("Discipline") or "—"}</div>
+                </div>
+                <div class="recap-card">
+                    <div class="recap-title">🧠 Mood</div>
+                    <div class="recap-value">{derniere_ligne.get("Mood") or "—"}</div>
+                </div>
             </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    # 📈 Évolution du respect du plan
-    st.markdown("---")
-    st.subheader("📈 Évolution du respect du plan de trading")
-
-    if not df_historique.empty:
-        temp = df_historique.copy()
-        temp["Date"] = pd.to_datetime(temp["Date"], errors="coerce")
-        temp = temp.dropna(subset=["Date"])
-        temp["Valeur"] = pd.to_numeric(temp["Valeur"], errors="coerce").fillna(0)
-        temp = temp.sort_values("Date")
-        temp["Cumul"] = temp["Valeur"].cumsum()
-
-        fig = px.line(
-            temp,
-            x="Date",
-            y="Cumul",
-            title="Évolution du respect du plan",
-            markers=True,
-            color_discrete_sequence=["#2563eb"],
-        )
-        fig.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font_color="#0f172a",
-            title_font_color="#2563eb",
-            xaxis=dict(showgrid=False),
-            yaxis(dict(gridcolor="#e5e7eb")),
+            """,
+            unsafe_allow_html=True,
         )
+
+    @profilage.fragment("courbe respect")
+    def courbe_respect(df_historique):
+        # 📈 Évolution du respect du plan
+        st.markdown("---")
+        st.subheader("📈 Évolution du respect du plan de trading")
+
+        if df_historique.empty:
+            st.info("Aucune donnée pour le moment — ajoute une première entrée pour voir la courbe.")
+            return
+
+        import plotly.express as px
+
+        temp = df_historique.dropna(subset=["Date"])
+        temp = temp.assign(Cumul=temp["Valeur"].cumsum())
+
+        with profilage.span("plotly · courbe respect"):
+            fig = px.line(
+                temp,
+                x="Date",
+                y="Cumul",
+                title="Évolution du respect du plan",
+                markers=True,
+                color_discrete_sequence=["#2563eb"],
+            )
+            fig.update_layout(
+                plot_bgcolor="rgba(0,0,0,0)",
+                paper_bgcolor="rgba(0,0,0,0)",
+                font_color="#0f172a",
+                title_font_color="#2563eb",
+                xaxis=dict(showgrid=False),
+                yaxis=dict(gridcolor="#e5e7eb"),
+            )
         st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("Aucune donnée pour le moment — ajoute une première entrée pour voir la courbe.")
 
-    # 🖼️ Capture d'écran de la dernière session
-    st.markdown("### 🖼️ Capture d'écran de la dernière session")
-    last_capture = derniere_ligne.get("Capture")
-    if last_capture and os.path.exists(last_capture):
-        st.image(last_capture, caption="Dernière capture enregistrée", use_container_width=True)
-    else:
-        st.info("Aucune capture enregistrée pour la dernière session.")
+    @profilage.fragment("capture")
+    def visionneuse_capture(capture):
+        # 🖼️ Capture d'écran de la dernière session
+        st.markdown("### 🖼️ Capture d'écran de la dernière session")
+        last_capture = resoudre(capture)
+        if not last_capture:
+            st.info("Aucune capture enregistrée pour la dernière session.")
+            return
+        # Aperçu WebP en cache ; l'original n'est envoyé qu'à la demande
+        if st.toggle("🔍 Pleine résolution", key="capture_hd"):
+            st.image(str(last_capture), caption="Dernière capture enregistrée", use_container_width=True)
+        else:
+            with profilage.span("PIL · aperçu capture"):
+                apercu = rendu(last_capture)
+            st.image(str(apercu), caption="Dernière capture enregistrée", use_container_width=True)
+
+    @profilage.fragment("nouvelle entrée")
+    def formulaire_entree():
+        st.markdown("---")
+        st.subheader("🧾 Nouvelle entrée de session")
+
+        # Upload capture (classement Année/Mois/Semaine/Jour)
+        capture_file = st.file_uploader(
+            "📸 Ajoute une capture d’écran de ta session",
+            type=["png", "jpg", "jpeg"],
+            label_visibility="collapsed",
+            key="entree_capture",
+        )
+        if capture_file:
+            # Le fichier reste sélectionné entre deux reruns : on ne l'enregistre qu'une fois
+            deja = st.session_state.get("capture_enregistree")
+            if not (deja and deja[0] == capture_file.file_id):
+                now = datetime.now()
+                dossier = os.path.join(
+                    "captures",
+                    f"{now.year}",
+                    f"{now.strftime('%B')}",
+                    f"Semaine_{now.isocalendar()[1]}",
+                    f"Jour_{now.strftime('%d')}",
+                )
+                capture_path = os.path.join(
+                    dossier, f"capture_{now.strftime('%Y%m%d_%H%M%S')}.png"
+                )
+                capture_file.seek(0)
+                with profilage.span("capture · enregistrement"):
+                    enregistrer_capture(capture_file, capture_path)
+                with profilage.span("PIL · miniatures"):
+                    generer(resoudre(capture_path))
+                st.session_state.capture_enregistree = (capture_file.file_id, capture_path)
+            st.success("📸 Capture enregistrée avec succès (classement automatique).")
+
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            st.selectbox(
+                "Respect du plan :", ["✅ Oui (respecté)", "❌ Non (non respecté)"], index=None,
+                key="entree_respect",
+            )
+        with col2:
+            st.number_input(
+                "💵 Montant associé (€)", value=0.0, step=10.0, format="%.2f", key="entree_montant"
+            )
 
-    # --- Nouvelle entrée
-    st.markdown("---")
-    st.subheader("🧾 Nouvelle entrée de session")
+        st.markdown("### 🧠 Facteurs comportementaux et contextuels")
+        colA, colB, colC = st.columns(3)
+        with colA:
+            st.selectbox(
+                "Réussite ou Erreur clé",
+                [
+                    "Entrée trop rapide sans signal complet 🕐",
+                    "Revenge trading après une perte 🔥",
+                    "Ignorer le stop-loss ou le déplacer ⛔",
+                    "Ne pas accepter une petite perte 💔",
+                    "Entrées patientes avec setup validé 🎯",
+                    "Clarté des scénarios (tendance / contre-tendance) 📘",
+                    "Adaptation du stop (mèche / MM / suiveur) 🧩",
+                    "Non Respect des TP's 🎯",
+                ],
+                index=None,
+                key="entree_erreur",
+            )
+        with colB:
+            st.selectbox(
+                "Discipline",
+                [
+                    "🔴 Session précédente hors plan",
+                    "🟡 Session mitigée (erreurs et réussites)",
+                    "🟢 Session conforme au plan",
+                ],
+                index=None,
+                key="entree_discipline",
+            )
+        with colC:
+            st.selectbox(
+                "Mood",
+                [
+                    "👶 Enfant (émotion impulsive)",
+                    "🧠 Adulte (rationnel, objectif → à viser)",
+                    "👮 Parent (auto-jugement, rigidité)",
+                ],
+                index=None,
+                key="entree_mood",
+            )
 
-    # Upload capture (classement Année/Mois/Semaine/Jour)
-    capture_file = st.file_uploader(
-        "📸 Ajoute une capture d’écran de ta session",
-        type=["png", "jpg", "jpeg"],
-        label_visibility="collapsed",
-    )
-    capture_path = None
-    if capture_file:
-        now = datetime.now()
-        dossier = os.path.join(
-            "captures",
-            f"{now.year}",
-            f"{now.strftime('%B')}",
-            f"Semaine_{now.isocalendar()[1]}",
-            f"Jour_{now.strftime('%d')}",
-        )
-        os.makedirs(dossier, exist_ok=True)
-        capture_path = os.path.join(
-            dossier, f"capture_{now.strftime('%Y%m%d_%H%M%S')}.png"
+        st.markdown("---")
+        st.subheader("🗒 Commentaire de session")
+        st.text_area(
+            "Ajoute un commentaire libre sur ta session :",
+            placeholder="Ex : Bonne discipline aujourd’hui...",
+            key="entree_commentaire",
         )
-        with open(capture_path, "wb") as f:
-            f.write(capture_file.getbuffer())
-        st.success("📸 Capture enregistrée avec succès (classement automatique).")
 
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        choix = st.selectbox(
-            "Respect du plan :", ["✅ Oui (respecté)", "❌ Non (non respecté)"], index=None
-        )
-    with col2:
-        montant = st.number_input(
-            "💵 Montant associé (€)", value=0.0, step=10.0, format="%.2f"
-        )
+    @profilage.fragment("axes CEO")
+    def axes_ceo():
+        st.markdown("---")
+        st.subheader("🧭 CEO")
 
-    st.markdown("### 🧠 Facteurs comportementaux et contextuels")
-    colA, colB, colC = st.columns(3)
-    with colA:
-        erreur_cle = st.selectbox(
-            "Réussite ou Erreur clé",
-            [
-                "Entrée trop rapide sans signal complet 🕐",
-                "Revenge trading après une perte 🔥",
-                "Ignorer le stop-loss ou le déplacer ⛔",
-                "Ne pas accepter une petite perte 💔",
-                "Entrées patientes avec setup validé 🎯",
-                "Clarté des scénarios (tendance / contre-tendance) 📘",
-                "Adaptation du stop (mèche / MM / suiveur) 🧩",
-                "Non Respect des TP's 🎯",
-            ],
-            index=None,
-        )
-    with colB:
-        discipline = st.selectbox(
-            "Discipline",
-            [
-                "🔴 Session précédente hors plan",
-                "🟡 Session mitigée (erreurs et réussites)",
-                "🟢 Session conforme au plan",
-            ],
-            index=None,
-        )
-    with colC:
-        mood = st.selectbox(
-            "Mood",
-            [
-                "👶 Enfant (émotion impulsive)",
-                "🧠 Adulte (rationnel, objectif → à viser)",
-                "👮 Parent (auto-jugement, rigidité)",
-            ],
-            index=None,
+        if os.path.exists(CEO_FILE):
+            saved_ceo = json.load(open(CEO_FILE, "r", encoding="utf-8"))
+        else:
+            saved_ceo = {a: None for a in AXES}
+
+        cols_axes = st.columns(4)
+        updated_ceo = {}
+        for i, axe in enumerate(AXES):
+            with cols_axes[i]:
+                st.markdown(
+                    f"<h5 style='text-align:center;color:#1f2937'>{axe}</h5>",
+                    unsafe_allow_html=True,
+                )
+                val = st.selectbox(
+                    "",
+                    NIVEAUX,
+                    index=NIVEAUX.index(saved_ceo.get(axe))
+                    if saved_ceo.get(axe) in NIVEAUX
+                    else None,
+                    key=f"axe_{axe}",
+                )
+                updated_ceo[axe] = val
+
+        if updated_ceo != saved_ceo:
+            json.dump(updated_ceo, open(CEO_FILE, "w", encoding="utf-8"), indent=2)
+
+    @profilage.fragment("mandala")
+    def mandala():
+        st.markdown("---")
+        st.subheader("🌕 Mandala")
+
+        # valeur locale d'abord (journal), Drive synchronisé en arrière-plan
+        if "mandala_val" not in st.session_state:
+            try:
+                with profilage.span("Drive · lecture Mandala"):
+                    valeur = moteur_synchro().lire("drive", "mandala", {"value": 1})
+                st.session_state.mandala_val = int(valeur.get("value", 1))
+            except Exception:
+                st.session_state.mandala_val = 1
+
+        def _mandala_on_change():
+            try:
+                moteur_synchro().ecrire("drive", "mandala", {"value": int(st.session_state.mandala_val)})
+            except Exception as e:
+                st.warning(f"Impossible d’enregistrer le Mandala : {e}")
+
+        st.number_input(
+            "Progression du Mandala (1 à 40)",
+            min_value=1, max_value=40, step=1,
+            value=int(st.session_state.mandala_val),
+            key="mandala_val",
+            on_change=_mandala_on_change,
         )
+        st.progress(st.session_state.mandala_val / 40)
+        try:
+            etat = moteur_synchro().etat()
+            if etat["en_attente"].get("drive"):
+                st.caption(f"⏳ {etat['en_attente']['drive']} modification(s) en attente d’envoi vers Drive")
+            if etat["erreurs"].get("drive"):
+                st.warning(f"Drive injoignable, nouvel essai automatique : {etat['erreurs']['drive']}")
+            latences = {op: m for op, m in stock_drive().latences().items() if m["n"]}
+            if latences:
+                st.caption("⏱️ Drive — " + " · ".join(
+                    f"{op} : {m['moyenne_ms']:.0f} ms (×{m['n']})" for op, m in latences.items()
+                ))
+        except Exception:
+            pass
+
+    @profilage.fragment("validation")
+    def validation():
+        # Les valeurs viennent des widgets des fragments « nouvelle entrée » et « axes CEO »
+        etat = st.session_state
+        if st.button("➕ Ajouter l'entrée complète"):
+            choix = etat.get("entree_respect")
+            if choix:
+                capture = etat.get("entree_capture")
+                deja = etat.get("capture_enregistree")
+                capture_path = deja[1] if capture and deja and deja[0] == capture.file_id else ""
+                nouvelle_entree = {
+                    "Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "Respect": choix,
+                    "Valeur": 1 if "✅" in choix else -1,
+                    "Montant": etat.get("entree_montant", 0.0),
+                    "Erreur_Clé": etat.get("entree_erreur") or "",
+                    "Discipline": etat.get("entree_discipline") or "",
+                    "Mood": etat.get("entree_mood") or "",
+                    "Commentaire": etat.get("entree_commentaire") or "",
+                    **{f"Axe_{axe}": etat.get(f"axe_{axe}") for axe in AXES},
+                    "Capture": capture_path,
+                }
+                # Ajout d'une seule ligne dans la partition du mois (pas de réécriture)
+                with profilage.span("sessions · ajout"):
+                    version_avant = version_sessions(SESSIONS_DIR)
+                    ajouter_session(nouvelle_entree, SESSIONS_DIR)
+                    version_apres = version_sessions(SESSIONS_DIR)
+                    _cube_sessions().ajouter(nouvelle_entree, version_avant, version_apres)
+                    _metriques_sessions().ajouter(nouvelle_entree, version_avant, version_apres)
+                st.success("✅ Entrée enregistrée avec succès !")
+                st.rerun()  # rerun complet : récap, courbe et capture reflètent la nouvelle session
+            else:
+                st.warning("⚠️ Sélectionne au moins le respect du plan avant d’ajouter.")
+
+        if st.button("📤 Exporter l'historique vers Excel"):
+            with profilage.span("sessions · export Excel"):
+                nb = exporter_excel(EXCEL_FILE, SESSIONS_DIR)
+            st.success(f"📤 {nb} sessions exportées dans {EXCEL_FILE}.")
 
-    st.markdown("---")
-    st.subheader("🗒 Commentaire de session")
-    commentaire = st.text_area(
-        "Ajoute un commentaire libre sur ta session :",
-        placeholder="Ex : Bonne discipline aujourd’hui...",
-    )
+    st.markdown("## 🧾 Récapitulatif de la dernière session")
 
-    st.markdown("---")
-    st.subheader("🧭 CEO")
-    CEO_FILE = "settings_ceo.json"
-    axes = ["Opérationnel", "Financier", "Humain", "Alignement"]
-    options = ["🟢 Vert", "🟠 Orange", "🔴 Rouge"]
+    df_historique = charger_sessions()
 
-    if os.path.exists(CEO_FILE):
-        saved_ceo = json.load(open(CEO_FILE, "r", encoding="utf-8"))
+    if not df_historique.empty:
+        derniere_ligne = df_historique.iloc[-1]
+        montant_cumule = df_historique["Montant"].sum()
     else:
-        saved_ceo = {a: None for a in axes}
-
-    cols_axes = st.columns(4)
-    updated_ceo = {}
-    for i, axe in enumerate(axes):
-        with cols_axes[i]:
-            st.markdown(
-                f"<h5 style='text-align:center;color:#1f2937'>{axe}</h5>",
-                unsafe_allow_html=True,
-            )
-            val = st.selectbox(
-                "",
-                options,
-                index=options.index(saved_ceo.get(axe))
-                if saved_ceo.get(axe) in options
-                else None,
-                key=f"axe_{axe}",
-            )
-            updated_ceo[axe] = val
+        derniere_ligne = pd.Series({col: None for col in COLONNES})
+        montant_cumule = 0.0
 
-    if updated_ceo != saved_ceo:
-        json.dump(updated_ceo, open(CEO_FILE, "w", encoding="utf-8"), indent=2)
+    recap_cartes(derniere_ligne, montant_cumule)
+    courbe_respect(df_historique)
+    visionneuse_capture(derniere_ligne.get("Capture"))
+    formulaire_entree()
+    axes_ceo()
 
     # Blocs d'aide CEO
     st.markdown(
@@ -401,107 +596,11 @@ if menu == "Dashboard":
         unsafe_allow_html=True,
     )
 
-    # -----------------------------------------------------------------------
     # 🌕 Mandala (PERSISTANT via Google Drive Service Account)
-    # -----------------------------------------------------------------------
-    st.markdown("---")
-    st.subheader("🌕 Mandala")
+    mandala()
 
-    # On isole une implémentation "service account" ici pour ne rien casser ailleurs
-    from pydrive2.auth import ServiceAccountCredentials
-
-    @st.cache_resource(show_spinner=False)
-    def _sa_drive():
-        sa = st.secrets["gcp_service_account"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(
-            sa, scopes=["https://www.googleapis.com/auth/drive"]
-        )
-        return GoogleDrive(creds.CreateOAuth2())
-
-    def _parent_folder_id():
-        return st.secrets["gcp_service_account"].get("drive_parent_folder_id")
-
-    def _find_or_create_mandala_file():
-        drive = _sa_drive()
-        parent = _parent_folder_id()
-        if not parent:
-            raise RuntimeError("drive_parent_folder_id manquant dans st.secrets[gcp_service_account].")
-        q = f"title = 'mandala.json' and trashed = false and '{parent}' in parents"
-        results = drive.ListFile({"q": q}).GetList()
-        if results:
-            return results[0]
-        f = drive.CreateFile({
-            "title": "mandala.json",
-            "parents": [{"id": parent}],
-            "mimeType": "application/json",
-        })
-        f.SetContentString(json.dumps({"value": 1}, ensure_ascii=False))
-        f.Upload()
-        return f
-
-    def _load_mandala():
-        try:
-            f = _find_or_create_mandala_file()
-            data = json.loads(f.GetContentString())
-            return int(data.get("value", 1))
-        except Exception:
-            return 1
-
-    def _save_mandala(value: int):
-        try:
-            f = _find_or_create_mandala_file()
-            f.SetContentString(json.dumps({"value": int(value)}, ensure_ascii=False))
-            f.Upload()
-        except Exception as e:
-            st.warning(f"Impossible d’enregistrer le Mandala sur Drive : {e}")
-
-    # valeur par défaut depuis Drive (persistante)
-    if "mandala_val" not in st.session_state:
-        st.session_state.mandala_val = _load_mandala()
-
-    def _mandala_on_change():
-        _save_mandala(st.session_state.mandala_val)
-
-    st.number_input(
-        "Progression du Mandala (1 à 40)",
-        min_value=1, max_value=40, step=1,
-        value=int(st.session_state.mandala_val),
-        key="mandala_val",
-        on_change=_mandala_on_change,
-    )
-    st.progress(st.session_state.mandala_val / 40)
-
-    # -----------------------------------------------------------------------
     # Validation de l'entrée
-    # -----------------------------------------------------------------------
-    if st.button("➕ Ajouter l'entrée complète"):
-        if choix:
-            valeur = 1 if "✅" in choix else -1
-            nouvelle_entree = pd.DataFrame(
-                {
-                    "Date": [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                    "Respect": [choix],
-                    "Valeur": [valeur],
-                    "Montant": [montant],
-                    "Erreur_Clé": [erreur_cle or ""],
-                    "Discipline": [discipline or ""],
-                    "Mood": [mood or ""],
-                    "Commentaire": [commentaire or ""],
-                    "Axe_Opérationnel": [updated_ceo["Opérationnel"]],
-                    "Axe_Financier": [updated_ceo["Financier"]],
-                    "Axe_Humain": [updated_ceo["Humain"]],
-                    "Axe_Alignement": [updated_ceo["Alignement"]],
-                    "Capture": [capture_path or ""],
-                }
-            )
-            st.session_state.discipline_data = pd.concat(
-                [st.session_state.discipline_data, nouvelle_entree], ignore_index=True
-            )
-            st.session_state.discipline_data.to_excel(EXCEL_FILE, index=False)
-            st.success("✅ Entrée enregistrée avec succès !")
-            st.rerun()
-        else:
-            st.warning("⚠️ Sélectionne au moins le respect du plan avant d’ajouter.")
+    validation()
 
 # ---------------------------------------------------------------------------
 # 📘 PAGE PLAN DE TRADING
@@ -666,51 +765,119 @@ elif menu == "Plan de Trading":
                 st.checkbox(" ", key=f"{bloc['section']}_{idx}")
 
 # ---------------------------------------------------------------------------
-# 📊 PAGE STATISTIQUES — contenu d’origine (avec OLS si dispo)
+# 📊 PAGE STATISTIQUES — servie par le cube d’agrégats (outils.cube_sessions)
 # ---------------------------------------------------------------------------
 elif menu == "Statistiques":
     st.markdown("## 📊 Analyse statistique des sessions")
 
-    EXCEL_FILE = "discipline.xlsx"
-    if not os.path.exists(EXCEL_FILE):
+    # Les filtres sont choisis à partir des partitions, sans lire les données
+    parts, (date_min, date_max) = charger_partitions()
+    if not parts:
         st.warning("Aucune donnée disponible.")
         st.stop()
 
-    df = pd.read_excel(EXCEL_FILE)
-    if df.empty:
-        st.info("Aucune donnée enregistrée.")
-        st.stop()
+    import calendar
+
+    import plotly.express as px
 
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df.dropna(subset=["Date"], inplace=True)
-    df["Année"] = df["Date"].dt.year
-    df["Mois"] = df["Date"].dt.month_name()
+    from outils.calendrier import bornes_vue, figure_calendrier
 
     col1, col2, col3 = st.columns(3)
     with col1:
         selected_year = st.selectbox(
-            "📅 Année :", ["Toutes"] + sorted(df["Année"].unique(), reverse=True)
+            "📅 Année :", ["Toutes"] + sorted({a for a, _ in parts}, reverse=True)
         )
     with col2:
-        selected_month = st.selectbox("🗓️ Mois :", ["Tous"] + sorted(df["Mois"].unique()))
-    with col3:
-        date_range = st.date_input(
-            "📆 Plage de dates :",
-            [df["Date"].min().date(), df["Date"].max().date()],
+        selected_month = st.selectbox(
+            "🗓️ Mois :", ["Tous"] + [calendar.month_name[m] for m in sorted({m for _, m in parts})]
         )
+    with col3:
+        date_range = st.date_input("📆 Plage de dates :", [date_min, date_max])
+
+    # Toutes les mesures viennent du cube d'agrégats : aucune session brute n'est relue
+    debut, fin = (date_range[0], date_range[1]) if len(date_range) == 2 else (None, None)
+    filtres = dict(
+        annee=None if selected_year == "Toutes" else int(selected_year),
+        mois=None if selected_month == "Tous" else list(calendar.month_name).index(selected_month),
+        debut=debut,
+        fin=fin,
+    )
+    cube = cube_sessions()
+    with profilage.span("cube · agrégation"):
+        total = int(cube.agreger(**filtres)["n"].iloc[0])
+        par_dimension = {col: cube.agreger([col], **filtres) for col in ("Erreur_Clé", "Discipline", "Mood", "Respect")}
+    if not total:
+        st.info("Aucune donnée enregistrée.")
+        st.stop()
 
-    df_filtered = df.copy()
-    if selected_year != "Toutes":
-        df_filtered = df_filtered[df_filtered["Année"] == int(selected_year)]
-    if selected_month != "Tous":
-        df_filtered = df_filtered[df_filtered["Mois"] == selected_month]
-    if isinstance(date_range, list) and len(date_range) == 2:
-        df_filtered = df_filtered[
-            (df_filtered["Date"].dt.date >= date_range[0])
-            & (df_filtered["Date"].dt.date <= date_range[1])
+    st.markdown(f"### 📈 {total} sessions sélectionnées")
+
+    # 📐 Performance : capital, drawdown, espérance, séries (outils.metriques)
+    from outils.metriques import CAPITAL_REFERENCE, courbe_capital, derniere_par_jour, drawdown, glissant
+
+    def _nombre(x, motif="{:,.2f}", suffixe=""):
+        if pd.isna(x):
+            return "—"
+        if x == float("inf"):
+            return "∞"
+        return motif.format(x).replace(",", " ") + suffixe
+
+    metriques = metriques_sessions()
+    with profilage.span("métriques · indicateurs"):
+        perf = metriques.calculer(**filtres)
+
+    st.subheader("📐 Performance")
+    st.caption(f"Drawdown en % d'un capital de référence de {CAPITAL_REFERENCE:,.0f} €".replace(",", " "))
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Espérance / session", _nombre(perf["esperance"], suffixe=" €"))
+    c2.metric("Win rate", _nombre(100 * perf["win_rate"], "{:.1f}", " %"),
+              help=f"Gain moyen {_nombre(perf['gain_moyen'])} € · perte moyenne {_nombre(perf['perte_moyenne'])} €")
+    c3.metric("Profit factor", _nombre(perf["profit_factor"]))
+    c4.metric("Sharpe (annualisé)", _nombre(perf["sharpe"]), help=f"Sortino {_nombre(perf['sortino'])}")
+    c1.metric("Drawdown max", _nombre(perf["drawdown_max"], "{:,.0f}", " €"),
+              f"{_nombre(100 * perf['drawdown_max_pct'], '{:.1f}', ' %')} (cible ≤ 10 %)", delta_color="off")
+    c2.metric("Drawdown actuel", _nombre(perf["drawdown"], "{:,.0f}", " €"),
+              _nombre(100 * perf["drawdown_pct"], "{:.1f}", " %"), delta_color="off")
+    c3.metric("Discipline", _nombre(100 * perf["discipline"], "{:.0f}", " %"), "cible ≥ 90 %", delta_color="off")
+    c4.metric("Séries record", f"✅ {perf['serie_gains_max']} · ❌ {perf['serie_pertes_max']}",
+              f"respect du plan : {perf['serie_respect_max']}", delta_color="off",
+              help=f"En cours : {perf['serie_gains']} gain(s), {perf['serie_pertes']} perte(s), "
+                   f"{perf['serie_respect']} session(s) dans le plan")
+
+    fenetre = st.select_slider("Fenêtre glissante (sessions) :", [20, 50, 100, 200], value=50)
+    with profilage.span("métriques · courbes"):
+        dates, montants, _, depart = metriques.selection(**filtres)
+        equite = courbe_capital(montants, depart)
+        dd, _ = drawdown(equite, depart)
+        roulant = glissant(montants, fenetre)
+        jours = derniere_par_jour(dates)  # un point par jour : la courbe reste légère sur tout l'historique
+        courbes = pd.DataFrame({
+            "Capital": equite[jours],
+            "Drawdown": -dd[jours],
+            "Espérance glissante": roulant["esperance"].to_numpy()[jours],
+            "Win rate glissant": roulant["win_rate"].to_numpy()[jours],
+        }, index=pd.DatetimeIndex(dates[jours], name="Date")).reset_index()
+    with profilage.span("plotly · performance"):
+        figures = [
+            px.line(courbes, x="Date", y="Capital", title="Courbe de capital"),
+            px.area(courbes, x="Date", y="Drawdown", title="Drawdown (€)", color_discrete_sequence=["#dc2626"]),
+            px.line(
+                courbes, x="Date", y="Espérance glissante", hover_data={"Win rate glissant": ":.0%"},
+                title=f"Espérance sur les {fenetre} dernières sessions",
+            ),
         ]
-
-    st.markdown(f"### 📈 {len(df_filtered)} sessions sélectionnées")
+        for fig in figures:
+            fig.update_layout(
+                plot_bgcolor="rgba(0,0,0,0)",
+                paper_bgcolor="rgba(0,0,0,0)",
+                font_color="#0f172a",
+                title_font_color="#2563eb",
+            )
+    col_a, col_b = st.columns(2)
+    col_a.plotly_chart(figures[0], use_container_width=True)
+    col_b.plotly_chart(figures[1], use_container_width=True)
+    st.plotly_chart(figures[2], use_container_width=True)
+    st.markdown("---")
 
     # Graphiques principaux
     for col, title, color_scale in [
@@ -718,55 +885,54 @@ elif menu == "Statistiques":
         ("Discipline", "Répartition par discipline", "Greens"),
         ("Mood", "Répartition par mood", "Oranges"),
     ]:
-        counts = df_filtered[col].value_counts().reset_index()
-        counts.columns = [col, "Nombre de Sessions"]
-
-        fig = px.bar(
-            counts,
-            x=col,
-            y="Nombre de Sessions",
-            title=title,
-            color="Nombre de Sessions",
-            color_continuous_scale=color_scale,
-        )
-        fig.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font_color="#0f172a",
-            title_font_color="#2563eb",
+        counts = (
+            par_dimension[col][[col, "n"]]
+            .sort_values("n", ascending=False)
+            .rename(columns={"n": "Nombre de Sessions"})
         )
+
+        with profilage.span(f"plotly · répartition {col}"):
+            fig = px.bar(
+                counts,
+                x=col,
+                y="Nombre de Sessions",
+                title=title,
+                color="Nombre de Sessions",
+                color_continuous_scale=color_scale,
+            )
+            fig.update_layout(
+                plot_bgcolor="rgba(0,0,0,0)",
+                paper_bgcolor="rgba(0,0,0,0)",
+                font_color="#0f172a",
+                title_font_color="#2563eb",
+            )
         st.plotly_chart(fig, use_container_width=True)
 
     # Corrélations et tendances
     st.markdown("---")
     st.subheader("🔗 Corrélations et tendances")
 
-    df_filtered["Score_Respect"] = df_filtered["Respect"].apply(
-        lambda x: 1 if "✅" in str(x) else 0
-    )
-
-    trendline_kw = {}
-    try:
-        import statsmodels.api as sm  # noqa: F401
-
-        trendline_kw["trendline"] = "ols"
-    except Exception:
-        trendline_kw = {}
-
-    fig_corr = px.scatter(
-        df_filtered,
-        x="Montant",
-        y="Score_Respect",
-        title="Corrélation entre Montant et Respect du plan",
-        color_discrete_sequence=["#2563eb"],
-        **trendline_kw,
-    )
-    fig_corr.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font_color="#0f172a",
-        title_font_color="#2563eb",
-    )
+    # Montant moyen ± écart-type selon le respect du plan, corrélation calculée sur les agrégats
+    respect = par_dimension["Respect"]
+    r = correlation_binaire(respect, respect["Respect"].str.contains("✅"))
+    with profilage.span("plotly · corrélation"):
+        fig_corr = px.bar(
+            respect,
+            x="Respect",
+            y="moyenne",
+            error_y="ecart_type",
+            hover_data={"n": True},
+            labels={"moyenne": "Montant moyen"},
+            title="Corrélation entre Montant et Respect du plan"
+            + ("" if pd.isna(r) else f" (r = {r:.2f})"),
+            color_discrete_sequence=["#2563eb"],
+        )
+        fig_corr.update_layout(
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            font_color="#0f172a",
+            title_font_color="#2563eb",
+        )
     st.plotly_chart(fig_corr, use_container_width=True)
 
     # Montant moyen par discipline & mood
@@ -774,8 +940,8 @@ elif menu == "Statistiques":
         ("Discipline", "💵 Montant moyen par discipline", "Viridis"),
         ("Mood", "🧘 Montant moyen par mood", "Plasma"),
     ]:
-        if col in df_filtered.columns:
-            avg = df_filtered.groupby(col)["Montant"].mean().reset_index()
+        avg = par_dimension[col][[col, "moyenne"]].rename(columns={"moyenne": "Montant"})
+        with profilage.span(f"plotly · moyenne {col}"):
             fig = px.bar(
                 avg,
                 x=col,
@@ -790,176 +956,43 @@ elif menu == "Statistiques":
                 font_color="#0f172a",
                 title_font_color="#2563eb",
             )
-            st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True)
 
     # 🗓️ Calendrier des gains / pertes
     st.markdown("---")
     st.subheader("🗓️ Calendrier des gains / pertes")
 
-    EXCEL_FILE = "discipline.xlsx"
-    if os.path.exists(EXCEL_FILE):
-        df_filtered = pd.read_excel(EXCEL_FILE)
-    else:
-        df_filtered = pd.DataFrame(columns=["Date", "Montant"])
-
-    if not df_filtered.empty and "Date" in df_filtered.columns and "Montant" in df_filtered.columns:
-        df_filtered["Date"] = pd.to_datetime(df_filtered["Date"], errors="coerce")
-        df_filtered = df_filtered.dropna(subset=["Date"])
-        daily_pnl = (
-            df_filtered.groupby(df_filtered["Date"].dt.date)["Montant"]
-            .sum()
-            .reset_index()
-        )
-        daily_pnl.columns = ["Date", "Montant"]
-
-        import calendar
-        import plotly.graph_objects as go
-
-        col1, col2 = st.columns(2)
-        with col1:
-            years = sorted(daily_pnl["Date"].apply(lambda x: x.year).unique(), reverse=True)
-            selected_year = st.selectbox("Année :", years, index=0)
-        with col2:
+    col0, col1, col2 = st.columns(3)
+    with col0:
+        vue = st.radio("Vue :", ["Mois", "Trimestre", "Année"], horizontal=True)
+    with col1:
+        years = sorted({a for a, _ in parts}, reverse=True)
+        selected_year = st.selectbox("Année :", years, index=0)
+    month_number, trimestre = 1, 1
+    with col2:
+        if vue == "Mois":
             months = list(calendar.month_name)[1:]
             selected_month = st.selectbox("Mois :", months, index=datetime.now().month - 1)
-
-        month_number = list(calendar.month_name).index(selected_month)
-        df_month = daily_pnl[
-            (pd.to_datetime(daily_pnl["Date"]).dt.month == month_number)
-            & (pd.to_datetime(daily_pnl["Date"]).dt.year == selected_year)
-        ]
-
-        if not df_month.empty:
-            cal = calendar.Calendar(firstweekday=0)
-            month_days = cal.monthdatescalendar(selected_year, month_number)
-
-            z, text = [], []
-            for week in month_days:
-                z_row, text_row = [], []
-                for day in week:
-                    if day.month == month_number:
-                        val = df_month.loc[df_month["Date"] == day, "Montant"]
-                        if not val.empty:
-                            v = val.values[0]
-                            if v > 0:
-                                color = "#86efac"
-                            elif v < 0:
-                                color = "#fca5a5"
-                            else:
-                                color = "#e5e7eb"
-                            label = f"{day.day}<br><b>{v:+.2f}€</b>"
-                        else:
-                            color = "#f8fafc"
-                            label = str(day.day)
-                        z_row.append(color)
-                        text_row.append(label)
-                    else:
-                        z_row.append("rgba(0,0,0,0)")
-                        text_row.append("")
-                z.append(z_row)
-                text.append(text_row)
-
-            fig_cal = go.Figure(
-                data=go.Heatmap(
-                    z=[[1] * len(week) for week in month_days],
-                    x=["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"],
-                    y=[f"Semaine {i+1}" for i in range(len(month_days))],
-                    text=text,
-                    hoverinfo="text",
-                    showscale=False,
-                    colorscale=[[0, "#ffffff"], [1, "#ffffff"]],
-                )
+            month_number = list(calendar.month_name).index(selected_month)
+        elif vue == "Trimestre":
+            trimestre = st.selectbox(
+                "Trimestre :", [1, 2, 3, 4], index=(datetime.now().month - 1) // 3,
+                format_func=lambda t: f"T{t}",
             )
 
-            for i, week in enumerate(month_days):
-                for j, _ in enumerate(week):
-                    color = z[i][j]
-                    if color != "rgba(0,0,0,0)":
-                        fig_cal.add_shape(
-                            type="rect",
-                            x0=j - 0.5,
-                            x1=j + 0.5,
-                            y0=i - 0.5,
-                            y1=i + 0.5,
-                            fillcolor=color,
-                            line=dict(color="#cbd5e1", width=1),
-                        )
-
-            for i, week in enumerate(month_days):
-                for j, _ in enumerate(week):
-                    if text[i][j]:
-                        fig_cal.add_annotation(
-                            x=j,
-                            y=i,
-                            text=text[i][j],
-                            showarrow=False,
-                            font=dict(size=12, color="#0f172a"),
-                        )
-
-            fig_cal.update_layout(
-                title=f"Résultats du mois de {selected_month} {selected_year}",
-                xaxis=dict(showgrid=False, zeroline=False),
-                yaxis=dict(showgrid=False, zeroline=False, autorange="reversed"),
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                margin=dict(l=0, r=0, t=60, b=0),
-                height=380,
-            )
+    with profilage.span("cube · P&L journalier"):
+        daily_pnl = cube.pnl_journalier(annee=selected_year)
+    debut_vue, fin_vue = bornes_vue(vue, selected_year, month_number, trimestre)
 
-            st.plotly_chart(fig_cal, use_container_width=True)
-        else:
-            st.info("Aucune donnée disponible pour ce mois.")
+    if daily_pnl[pd.Timestamp(debut_vue):pd.Timestamp(fin_vue)].empty:
+        st.info("Aucune donnée disponible pour cette période.")
     else:
-        st.info("Aucune donnée à afficher dans le calendrier.")
+        with profilage.span("plotly · calendrier"):
+            fig_cal = figure_calendrier(daily_pnl, vue, selected_year, month_number, trimestre)
+        st.plotly_chart(fig_cal, use_container_width=True)
 
-import io
-import pandas as pd
-import streamlit as st
-from pydrive2.auth import ServiceAccountCredentials
-from pydrive2.drive import GoogleDrive
 
-@st.cache_resource(show_spinner=False)
-def get_drive():
-    sa = st.secrets["gcp_service_account"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(
-        sa, scopes=["https://www.googleapis.com/auth/drive"]
-    )
-    return GoogleDrive(creds.CreateOAuth2())
-
-def _parent_folder_id():
-    return st.secrets["gcp_service_account"].get("drive_parent_folder_id")
-
-def test_write_read():
-    drive = get_drive()
-    parent = _parent_folder_id()
-
-    # 1) créer/écrire test.xlsx
-    df_out = pd.DataFrame({"ok": [1, 2, 3]})
-    bio = io.BytesIO()
-    df_out.to_excel(bio, index=False)
-    bio.seek(0)
-
-    # chercher le fichier par nom dans le dossier
-    q = f"title = 'test.xlsx' and trashed = false and '{parent}' in parents"
-    results = drive.ListFile({"q": q}).GetList()
-    f = results[0] if results else drive.CreateFile({
-        "title": "test.xlsx",
-        "parents": [{"id": parent}],
-        "mimeType": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    })
-    # écrire le buffer dans un fichier temporaire puis uploader en binaire
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-        tmp_path = tmp.name
-    try:
-        with open(tmp_path, 'wb') as fh:
-            fh.write(bio.getvalue())
-        f.SetContentFile(tmp_path)
-        f.Upload()
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-
-    # 2) relire test.xlsx
-    content = io.BytesIO(f.GetContentBinary())
-    df_in = pd.read_excel(content)
-    return df_in
+# ---------------------------------------------------------------------------
+# ⏱️ PROFILAGE DU RERUN
+# ---------------------------------------------------------------------------
+profilage.panneau()
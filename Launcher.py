@@ -1,48 +1,77 @@
 import tkinter as tk
-import subprocess
+import atexit
 import os
 import sys
-import platform
+import threading
+import webbrowser
+from pathlib import Path
 
-# --- DÉFINIR LES CHEMINS DE TES SCRIPTS ---
-SCRIPTS = {
-    "Dashboard": r"C:\Users\tgiorello\Documents\Dashboard\Dashboard.py",
-    "CEO": r"C:\Users\tgiorello\Documents\Dashboard\CEO.py",
-    "Saisie de Fiche": r"C:\Users\tgiorello\Documents\Dashboard\trading_app\Saisie de Fiche.py"
+# Modules communs (dossier outils/ à côté du Launcher)
+sys.path.append(str(Path(__file__).resolve().parent))
+from outils.supervision import ServeurSupervise, Superviseur
+
+# --- APPLICATION UNIQUE (Dashboard, CEO, fiches = pages d'un seul serveur) ---
+BASE_DIR = Path(__file__).resolve().parent
+APPLICATION = BASE_DIR / "Application.py"
+PORT = int(os.environ.get("DASHBOARD_PORT", "8501"))
+URL = f"http://localhost:{PORT}"
+
+# Bouton -> url_path de la page (voir Application.py)
+PAGES = {
+    "Dashboard": "dashboard",
+    "CEO": "ceo",
+    "Saisie de Fiche": "saisie",
 }
 
-# --- LANCEMENT SILENCIEUX ---
-def run_script(script_path):
-    if not os.path.exists(script_path):
-        return  # ne rien faire si le script n’existe pas
-
-    try:
-        # Vérifie si le script utilise Streamlit
-        with open(script_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        is_streamlit = "streamlit" in content
-
-        # Commande à exécuter
-        if is_streamlit:
-            cmd = ["streamlit", "run", script_path]
-        else:
-            cmd = [sys.executable, script_path]
-
-        # Supprime la fenêtre console sous Windows
-        creation_flags = 0
-        if platform.system() == "Windows":
-            creation_flags = subprocess.CREATE_NO_WINDOW
-
-        subprocess.Popen(
-            cmd,
-            shell=False,
-            creationflags=creation_flags,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-
-    except Exception as e:
-        print(f"Erreur lors du lancement de {script_path}: {e}")
+# --- SUPERVISION (PID, santé HTTP, redémarrages, RSS / CPU) ---
+superviseur = Superviseur([ServeurSupervise("application", APPLICATION, PORT, cwd=BASE_DIR)])
+atexit.register(superviseur.arreter_tout)  # filet de sécurité si la fenêtre n'est pas fermée normalement
+
+_verrou_demarrage = threading.Lock()  # deux clics rapprochés ne lancent qu'un serveur
+
+
+def ouvrir_page(url_path):
+    """Affiche la page : réutilise le serveur s'il tourne, sinon le démarre puis attend qu'il réponde."""
+    def _ouvrir():
+        with _verrou_demarrage:
+            try:
+                pret = superviseur.assurer("application")
+            except Exception as e:
+                print(f"Erreur lors du lancement de {APPLICATION}: {e}")
+                return
+        if not pret:
+            print(f"Le serveur ne répond pas sur {URL}")
+            return
+        # new=0 : réutilise la fenêtre du navigateur et la ramène au premier plan
+        webbrowser.open(f"{URL}/{url_path}", new=0, autoraise=True)
+
+    threading.Thread(target=_ouvrir, daemon=True).start()
+
+
+ICONES = {"actif": "🟢", "démarrage": "🟡", "externe": "🔵", "bloqué": "🟠", "en échec": "🔴", "arrêté": "⚪"}
+
+
+def texte_etat(e: dict) -> str:
+    """Ligne d'état d'un serveur : PID, port, mémoire, CPU, redémarrages."""
+    texte = f"{ICONES.get(e['etat'], '')} {e['etat']} — :{e['port']}"
+    if e["pid"]:
+        texte += f" — PID {e['pid']}"
+    if e["rss_mo"] is not None:
+        texte += f"\n{e['rss_mo']:.0f} Mo — CPU {e['cpu']:.0f} %"
+    if e["redemarrages"]:
+        texte += f" — {e['redemarrages']} redémarrage(s)"
+    if e["erreur"] and e["etat"] != "actif":
+        texte += f"\n{e['erreur']}"
+    return texte
+
+
+def quitter():
+    """Arrête proprement les serveurs lancés par le Launcher, puis ferme la fenêtre."""
+    etat_var.set("⏳ Arrêt des serveurs…")
+    root.update_idletasks()
+    superviseur.arreter_tout()
+    root.destroy()
+
 
 # --- INTERFACE PRINCIPALE ---
 root = tk.Tk()
@@ -55,18 +84,32 @@ frame.pack(expand=True)
 tk.Label(frame, text="Sélection :", 
          bg="#1e1e1e", fg="white", font=("Segoe UI", 14, "bold")).pack(pady=(0, 15))
 
-for name, path in SCRIPTS.items():
+for name, url_path in PAGES.items():
     tk.Button(
         frame, text=f" {name}", width=30,
         bg="#3a7ff6", fg="white", relief="raised", bd=3,
-        command=lambda p=path: run_script(p)
+        command=lambda p=url_path: ouvrir_page(p)
     ).pack(pady=8)
 
+# État du serveur, rafraîchi toutes les 2 s
+etat_var = tk.StringVar(value="⚪ arrêté")
+tk.Label(frame, textvariable=etat_var, justify="left", width=40, height=3,
+         bg="#1e1e1e", fg="#cbd5e1", font=("Segoe UI", 9)).pack(pady=(15, 0))
+
+
+def rafraichir_etat():
+    etat_var.set("\n".join(texte_etat(e) for e in superviseur.etat()))
+    root.after(2000, rafraichir_etat)
+
+
+rafraichir_etat()
+
 tk.Button(
     frame, text="Quitter", width=30, relief="raised", bd=3,
     bg="#d9534f", fg="white",
-    command=root.destroy
+    command=quitter
 ).pack(pady=(20, 0))
+root.protocol("WM_DELETE_WINDOW", quitter)
 
 # Centrage automatique
 root.update_idletasks()
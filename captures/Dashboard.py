@@ -4,38 +4,99 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
 import json
 import os
+import sys
+from pathlib import Path
 from streamlit_option_menu import option_menu
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+
+# Modules communs (dossier outils/ à la racine du projet)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from outils.sync_sheets import LecteurIncremental, SyncFeuille
+from outils.synchro import REMPLACER, CibleSheets, MoteurSynchro
+
+SYNC_JOURNAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "synchro_journal.sqlite")
 
 # ---------------------------------------------------------------------------
 # 🔗 CONNEXION GOOGLE SHEETS — Données persistantes
 # ---------------------------------------------------------------------------
 
-def connect_sheets():
-    """Connexion sécurisée au Google Sheet via secrets.toml"""
+@st.cache_resource(show_spinner=False)
+def _client_sheets():
+    """Client gspread unique pour le processus (jeton renouvelé automatiquement)"""
+    import gspread  # import différé : premier accès à la feuille seulement
+
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(st.secrets["gcp_service_account"], scope)
-    client = gspread.authorize(creds)
+    return gspread.service_account_from_dict(dict(st.secrets["gcp_service_account"]), scopes=scope)
+
+@st.cache_resource(show_spinner=False)
+def connect_sheets():
+    """Connexion sécurisée au Google Sheet via secrets.toml (ouverte une seule fois)"""
+    client = _client_sheets()
     sheet = client.open_by_key(st.secrets["sheets"]["sheet_id"]).worksheet(st.secrets["sheets"]["worksheet_name"])
     return sheet
 
-def read_sheet_to_df():
-    """Lit les données Google Sheets dans un DataFrame"""
-    sheet = connect_sheets()
-    data = sheet.get_all_records()
-    df = pd.DataFrame(data)
+@st.cache_resource(show_spinner=False)
+def _lecteur_sheets():
+    """Copie locale partagée de la feuille, complétée par les nouvelles lignes"""
+    return LecteurIncremental(connect_sheets())
+
+@st.cache_resource(show_spinner=False)
+def _sync_sheets():
+    """Synchroniseur partagé : mémorise ce qui a déjà été envoyé à la feuille."""
+    return SyncFeuille(connect_sheets())
+
+@st.cache_resource(show_spinner=False)
+def moteur_synchro():
+    """Journal local des écritures, envoyées à Google Sheets en arrière-plan"""
+    return MoteurSynchro(SYNC_JOURNAL, {"sheets": CibleSheets(_sync_sheets(), _lecteur_sheets())})
+
+COLONNES = [
+    "Date", "Respect", "Valeur", "Montant",
+    "Erreur_Clé", "Discipline", "Mood", "Commentaire",
+    "Axe_Opérationnel", "Axe_Financier", "Axe_Humain", "Axe_Alignement",
+    "Capture"
+]
+
+def _typer(lignes) -> pd.DataFrame:
+    """Lignes de la feuille -> DataFrame aux colonnes attendues, dates converties"""
+    df = pd.DataFrame(lignes)
+    for col in COLONNES:
+        if col not in df.columns:
+            df[col] = None
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
     return df
 
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _historique_partage(version):
+    """Copie de la feuille à une version donnée, partagée en lecture seule par toutes les sessions"""
+    return _typer(moteur_synchro().lire_distant("sheets", "sessions", []))
+
+def read_sheet_to_df():
+    """Lit les sessions : copie partagée de la feuille + entrées pas encore envoyées.
+
+    Le DataFrame partagé ne doit jamais être modifié en place. Une nouvelle
+    version de la feuille (après envoi des entrées) remplace la copie pour
+    toutes les sessions à la fois ; seules les entrées en attente, peu
+    nombreuses, sont relues à chaque rerun.
+    """
+    moteur = moteur_synchro()
+    historique = _historique_partage(moteur.version_distante("sheets", "sessions"))
+    en_attente = moteur.operations_en_attente("sheets", "sessions")
+    if any(type_ == REMPLACER for type_, _ in en_attente):  # réécriture complète en attente
+        return _typer(moteur.lire("sheets", "sessions", []))
+    if not en_attente:
+        return historique
+    return pd.concat([historique, _typer([ligne for _, ligne in en_attente])], ignore_index=True)
+
+def append_row_to_sheet(ligne: dict):
+    """Ajoute une session (journal local immédiat, envoi en arrière-plan)"""
+    moteur_synchro().ajouter("sheets", "sessions", ligne)
+
 def write_df_to_sheet(df):
-    """Écrit un DataFrame dans le Google Sheet"""
-    sheet = connect_sheets()
-    sheet.clear()
-    sheet.update([df.columns.values.tolist()] + df.values.tolist())
+    """Remplace le contenu de la feuille (seules les différences seront envoyées)"""
+    moteur_synchro().ecrire("sheets", "sessions", df.to_dict("records"))
 
 # ---------------------------------------------------------------------------
 # 🧭 CONFIGURATION GLOBALE
@@ -121,28 +182,22 @@ if menu == "Dashboard":
         df_historique = read_sheet_to_df()
     except Exception as e:
         st.warning(f"Erreur de lecture Google Sheets : {e}")
-        df_historique = pd.DataFrame()
+        df_historique = _typer([])
 
-    colonnes_attendues = [
-        "Date", "Respect", "Valeur", "Montant",
-        "Erreur_Clé", "Discipline", "Mood", "Commentaire",
-        "Axe_Opérationnel", "Axe_Financier", "Axe_Humain", "Axe_Alignement",
-        "Capture"
-    ]
-    for col in colonnes_attendues:
-        if col not in df_historique.columns:
-            df_historique[col] = None
-
-    if "discipline_data" not in st.session_state:
-        st.session_state.discipline_data = df_historique.copy()
+    try:
+        etat_synchro = moteur_synchro().etat()
+        if etat_synchro["en_attente"].get("sheets"):
+            st.caption(f"⏳ {etat_synchro['en_attente']['sheets']} entrée(s) en attente d’envoi vers Google Sheets")
+        if etat_synchro["erreurs"].get("sheets"):
+            st.warning(f"Google Sheets injoignable, nouvel essai automatique : {etat_synchro['erreurs']['sheets']}")
+    except Exception:
+        pass
 
     if not df_historique.empty:
-        if "Date" in df_historique.columns:
-            df_historique["Date"] = pd.to_datetime(df_historique["Date"], errors="coerce")
         derniere_ligne = df_historique.iloc[-1]
         montant_cumule = pd.to_numeric(df_historique["Montant"], errors="coerce").fillna(0).sum()
     else:
-        derniere_ligne = pd.Series({col: None for col in colonnes_attendues})
+        derniere_ligne = pd.Series({col: None for col in COLONNES})
         montant_cumule = 0.0
 
     st.markdown(
@@ -181,10 +236,9 @@ if menu == "Dashboard":
                 "Axe_Humain": [""], "Axe_Alignement": [""],
                 "Capture": [""]
             })
-            st.session_state.discipline_data = pd.concat([st.session_state.discipline_data, nouvelle_entree], ignore_index=True)
             try:
-                write_df_to_sheet(st.session_state.discipline_data)
-                st.success("✅ Entrée enregistrée sur Google Sheets avec succès !")
+                append_row_to_sheet(nouvelle_entree.iloc[0].to_dict())
+                st.success("✅ Entrée enregistrée (envoi vers Google Sheets en arrière-plan) !")
                 st.rerun()
             except Exception as e:
                 st.error(f"Erreur lors de la sauvegarde Google Sheets : {e}")
@@ -0,0 +1 @@
+"""Outils communs aux applications Streamlit (Dashboard, CEO, Saisie de Fiche)."""
@@ -0,0 +1,471 @@
+"""Banc d'essai headless des pages Streamlit (streamlit.testing.v1.AppTest).
+
+Chaque page est exécutée dans un processus neuf (démarrage à froid réel),
+sur une copie du jeu de données synthétique (`outils.donnees_synthetiques`)
+et du code de l'application. On mesure :
+- `froid_s` : premier rendu complet de la page (imports, lecture des
+  données, construction des caches et index) ;
+- `chaud_*` : reruns suivants dans la même session (médiane, p95) ;
+- `rss_*_mo` : mémoire du processus avant le premier rendu et pic atteint.
+
+`--interactions` mesure en plus quelques interactions de widgets isolés
+(Mandala, axe CEO…) de deux façons : rerun complet du script (comportement
+sans fragment) et rerun du seul `st.fragment` qui contient le widget. Pour
+chacune : médiane de la durée et octets des messages envoyés au navigateur.
+
+`--sessions N` ouvre N sessions navigateur simultanées sur chaque page
+(N AppTest dans un même processus, caches partagés comme sur le serveur) et
+mesure la mémoire : RSS ajoutée par session et taille des objets gardés
+dans `st.session_state`.
+
+Les services externes (Google Sheets, Drive) sont remplacés par les
+doublures en mémoire de `tests/doublures.py` (`FeuilleFactice`,
+`DriveFactice`) ; le menu `option_menu` (composant JS, absent en headless)
+est forcé sur la page voulue. Le comptage des octets envoyés au navigateur
+de `outils.profilage` n'est activé que là (`activer_octets`).
+
+Exemple :
+    python -m outils.donnees_synthetiques /tmp/bench --sessions 100000 --fiches 50000
+    python -m outils.banc_essai /tmp/bench --reruns 5 --sortie rapport.json
+    python -m outils.banc_essai /tmp/bench --sortie apres.json --reference rapport.json
+    python -m outils.banc_essai /tmp/bench --pages dashboard --interactions
+    python -m outils.banc_essai /tmp/bench --pages dashboard captures_dashboard --sessions 20
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from outils import profilage
+
+RACINE = Path(__file__).resolve().parents[1]
+CODE = ["Dashboard.py", "CEO.py", "outils", "trading_app", "captures/Dashboard.py", "tests"]
+DONNEES = ["discipline.xlsx", "sessions", "suivi_objectifs.xlsx", "suivi_objectifs_historique.sqlite",
+           "data", "sessions_sheets.json", "manifest_synthetique.json"]
+
+# nom -> (script, interaction après le premier run)
+PAGES = {
+    "dashboard": ("Dashboard.py", {"menu": "Dashboard"}),
+    "plan_trading": ("Dashboard.py", {"menu": "Plan de Trading"}),
+    "statistiques": ("Dashboard.py", {"menu": "Statistiques"}),
+    "ceo_dashboard": ("CEO.py", {}),
+    "ceo_prop_firm": ("CEO.py", {"radio": "🏦 Prop Firm"}),
+    "ceo_kpi": ("CEO.py", {"radio": "📊 Objectifs et KPI"}),
+    "ceo_journal": ("CEO.py", {"radio": "🗓️ Journal Mensuel"}),
+    "saisie_fiche": ("trading_app/Saisie de Fiche.py", {}),
+    "historique": ("trading_app/pages/historique.py", {"date": "derniere"}),
+    "recherche": ("trading_app/pages/recherche.py", {"texte": "pullback"}),
+    "captures_dashboard": ("captures/Dashboard.py", {"menu": "Dashboard"}),
+}
+
+# nom -> (script, menu, type de widget, clé, valeurs successives)
+INTERACTIONS = {
+    "mandala": ("Dashboard.py", "Dashboard", "number_input", "mandala_val", [3, 4, 5, 6, 7]),
+    "axe_ceo": ("Dashboard.py", "Dashboard", "selectbox", "axe_Financier", ["🟢 Vert", "🟠 Orange", "🔴 Rouge"]),
+    "montant_entree": ("Dashboard.py", "Dashboard", "number_input", "entree_montant", [10.0, 20.0, 30.0]),
+    "respect_entree": ("Dashboard.py", "Dashboard", "selectbox", "entree_respect",
+                       ["✅ Oui (respecté)", "❌ Non (non respecté)"]),
+}
+
+
+# ---------------------------------------------------------------------------
+# 📏 Mesures
+# ---------------------------------------------------------------------------
+def _rss_mo() -> dict:
+    """RSS courante et pic du processus (Mo)."""
+    import psutil
+
+    info = psutil.Process().memory_info()
+    courant = info.rss / 2**20
+    try:
+        import resource
+
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pic = pic / 2**20 if sys.platform == "darwin" else pic / 2**10  # octets (macOS) / Ko (Linux)
+    except ImportError:  # Windows
+        pic = getattr(info, "peak_wset", info.rss) / 2**20
+    return {"courant": round(courant, 1), "pic": round(pic, 1)}
+
+
+def _centile(valeurs: list, q: float):
+    if not valeurs:
+        return None
+    triees = sorted(valeurs)
+    return triees[min(len(triees) - 1, max(0, round(q * len(triees) + 0.5) - 1))]
+
+
+def _derniere_date_fiches(base: Path):
+    jours = [p.name for p in base.glob("*/*/*/*") if p.is_dir()]
+    if not jours:
+        return None
+    return max(datetime.strptime(j, "%d-%m-%Y") for j in jours).date()
+
+
+# ---------------------------------------------------------------------------
+# 🎭 Doublures des services externes
+# ---------------------------------------------------------------------------
+def _installer_doublures(menu):
+    from unittest import mock
+
+    import streamlit_option_menu
+
+    from tests.doublures import DriveFactice, FeuilleFactice
+
+    mock.patch.object(streamlit_option_menu, "option_menu", lambda *a, **k: menu or a[1][0]).start()
+
+    valeurs = []
+    if os.path.exists("sessions_sheets.json"):
+        with open("sessions_sheets.json", "r", encoding="utf-8") as f:
+            valeurs = json.load(f)
+    feuille = FeuilleFactice(valeurs)
+
+    class _Classeur:
+        def open_by_key(self, _cle):
+            return self
+
+        def worksheet(self, _nom):
+            return feuille
+
+    mock.patch("gspread.service_account_from_dict", lambda *a, **k: _Classeur()).start()
+
+    class _Identifiants:
+        def CreateOAuth2(self):
+            return None
+
+    drive = DriveFactice()
+    mock.patch("pydrive2.auth.ServiceAccountCredentials.from_json_keyfile_dict",
+               lambda *a, **k: _Identifiants()).start()
+    mock.patch("pydrive2.drive.GoogleDrive", lambda *a, **k: drive).start()
+    profilage.activer_octets()  # pages mesurées : octets envoyés au navigateur dans les journaux
+
+
+# ---------------------------------------------------------------------------
+# ⏱️ Mesure d'une page (processus enfant)
+# ---------------------------------------------------------------------------
+def mesurer_page(nom: str, reruns: int = 5, timeout: float = 600) -> dict:
+    """Exécute une page dans le processus courant (dossier courant = copie de travail)."""
+    from streamlit.testing.v1 import AppTest
+
+    script, action = PAGES[nom]
+    _installer_doublures(action.get("menu"))
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+    at.secrets["gcp_service_account"] = {"drive_parent_folder_id": "banc"}
+    at.secrets["sheets"] = {"sheet_id": "banc", "worksheet_name": "banc"}
+    rss_base = _rss_mo()
+
+    debut = time.perf_counter()
+    at.run()
+    if "radio" in action:
+        at.sidebar.radio[0].set_value(action["radio"]).run()
+    if action.get("date") == "derniere":
+        jour = _derniere_date_fiches(Path("data"))
+        if jour:
+            at.sidebar.date_input[0].set_value(jour).run()
+    if "texte" in action:
+        at.text_input[0].input(action["texte"]).run()
+    froid = time.perf_counter() - debut
+
+    chauds = []
+    for _ in range(reruns):
+        debut = time.perf_counter()
+        at.run()
+        chauds.append(time.perf_counter() - debut)
+
+    return {
+        "script": script,
+        "froid_s": round(froid, 4),
+        "chaud_mediane_s": round(_centile(chauds, 0.5), 4) if chauds else None,
+        "chaud_p95_s": round(_centile(chauds, 0.95), 4) if chauds else None,
+        "chaud_s": [round(c, 4) for c in chauds],
+        "rss_base_mo": rss_base["courant"],
+        "rss_pic_mo": _rss_mo()["pic"],
+        "exceptions": [e.message for e in at.exception],
+    }
+
+
+def _installer_reruns_fragment() -> dict:
+    """AppTest relance toujours tout le script : permet de ne relancer qu'un fragment.
+
+    `etat["fragment"]` : identifiant du fragment à relancer au prochain `run()`
+    (None = rerun complet). Après chaque run, `etat["messages"]` et
+    `etat["octets"]` décrivent les messages envoyés au navigateur.
+    """
+    from dataclasses import replace
+
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    etat = {"fragment": None, "messages": [], "octets": 0}
+    demander, executer = LocalScriptRunner.request_rerun, LocalScriptRunner.run
+
+    def request_rerun(self, rerun_data):
+        if etat["fragment"]:
+            # le runner de test est créé avec une demande de rerun complet, qui l'emporterait
+            self._requests = ScriptRequests()
+            rerun_data = replace(rerun_data, fragment_id_queue=[etat["fragment"]], is_fragment_scoped_rerun=True)
+        return demander(self, rerun_data)
+
+    def run(self, *args, **kwargs):
+        arbre = executer(self, *args, **kwargs)
+        etat["messages"] = list(self.forward_msgs())
+        etat["octets"] = sum(m.ByteSize() for m in etat["messages"])
+        return arbre
+
+    LocalScriptRunner.request_rerun, LocalScriptRunner.run = request_rerun, run
+    return etat
+
+
+def _fragment_du_widget(messages, type_widget: str, cle: str):
+    """Identifiant du fragment qui contient le widget `cle` (None s'il n'est dans aucun fragment)."""
+    for msg in messages:
+        if msg.HasField("delta") and msg.delta.HasField("new_element"):
+            element = msg.delta.new_element
+            if element.WhichOneof("type") == type_widget and getattr(element, type_widget).id.endswith(cle):
+                return msg.delta.fragment_id or None
+    return None
+
+
+def mesurer_interaction(nom: str, repetitions: int = 5, timeout: float = 600) -> dict:
+    """Durée et octets envoyés par une interaction : rerun complet puis rerun du fragment seul."""
+    from streamlit.testing.v1 import AppTest
+
+    script, menu, type_widget, cle, valeurs = INTERACTIONS[nom]
+    _installer_doublures(menu)
+    etat = _installer_reruns_fragment()
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+    at.secrets["gcp_service_account"] = {"drive_parent_folder_id": "banc"}
+    at.secrets["sheets"] = {"sheet_id": "banc", "worksheet_name": "banc"}
+    at.run()
+    fragment = _fragment_du_widget(etat["messages"], type_widget, cle)
+
+    resultat = {"script": script, "widget": cle, "fragment": fragment is not None}
+    for mode, cible in (("complet", None), ("fragment", fragment)):
+        if mode == "fragment" and cible is None:
+            break
+        at.run()  # arbre complet avant la série
+        durees, octets = [], []
+        for i in range(repetitions):
+            getattr(at, type_widget)(key=cle).set_value(valeurs[i % len(valeurs)])
+            etat["fragment"] = cible
+            debut = time.perf_counter()
+            try:
+                at.run()
+            finally:
+                etat["fragment"] = None
+            durees.append(time.perf_counter() - debut)
+            octets.append(etat["octets"])
+        resultat[mode] = {
+            "mediane_ms": round(1000 * _centile(durees, 0.5), 1),
+            "p95_ms": round(1000 * _centile(durees, 0.95), 1),
+            "octets": _centile(octets, 0.5),
+        }
+    resultat["exceptions"] = [e.message for e in at.exception]
+    return resultat
+
+
+def _taille_etat(etat: dict) -> int:
+    """Octets gardés par une session : DataFrames (mémoire profonde), autres objets picklés."""
+    import pickle
+
+    import pandas as pd
+
+    total = 0
+    for valeur in etat.values():
+        if isinstance(valeur, (pd.DataFrame, pd.Series)):
+            total += int(valeur.memory_usage(deep=True).sum())
+        else:
+            try:
+                total += len(pickle.dumps(valeur))
+            except Exception:
+                total += sys.getsizeof(valeur)
+    return total
+
+
+def mesurer_sessions(nom: str, n: int = 10, timeout: float = 600) -> dict:
+    """N sessions simultanées sur une page : RSS par session et état gardé par session."""
+    import gc
+
+    from streamlit.testing.v1 import AppTest
+
+    script, action = PAGES[nom]
+    _installer_doublures(action.get("menu"))
+    sessions, rss = [], []
+    for _ in range(n):
+        at = AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+        at.secrets["gcp_service_account"] = {"drive_parent_folder_id": "banc"}
+        at.secrets["sheets"] = {"sheet_id": "banc", "worksheet_name": "banc"}
+        at.run()
+        sessions.append(at)
+        gc.collect()
+        rss.append(_rss_mo()["courant"])
+    etats = [_taille_etat(at.session_state.to_dict()) for at in sessions]
+    return {
+        "script": script,
+        "sessions": n,
+        "rss_premiere_mo": rss[0],
+        "rss_finale_mo": rss[-1],
+        "rss_par_session_mo": round((rss[-1] - rss[0]) / (n - 1), 2) if n > 1 else None,
+        "etat_par_session_ko": round(_centile(etats, 0.5) / 1024, 1),
+        "exceptions": [e.message for at in sessions for e in at.exception],
+    }
+
+
+# ---------------------------------------------------------------------------
+# 🚀 Orchestration
+# ---------------------------------------------------------------------------
+def preparer(donnees=None, travail=None) -> Path:
+    """Copie de travail : code de l'application + jeu de données synthétique (s'il est fourni)."""
+    travail = Path(travail or tempfile.mkdtemp(prefix="banc_"))
+    for rel in CODE:
+        src, dst = RACINE / rel, travail / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if src.is_dir():
+            shutil.copytree(src, dst, ignore=shutil.ignore_patterns("__pycache__"), dirs_exist_ok=True)
+        else:
+            shutil.copy2(src, dst)
+    for rel in DONNEES if donnees else []:
+        src = Path(donnees) / rel
+        if src.is_dir():
+            shutil.copytree(src, travail / rel, dirs_exist_ok=True)
+        elif src.exists():
+            shutil.copy2(src, travail / rel)
+    return travail
+
+
+def _meta(donnees: Path) -> dict:
+    import pandas as pd
+    import streamlit
+
+    meta = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "processeur": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "streamlit": streamlit.__version__,
+        "pandas": pd.__version__,
+    }
+    manifeste = donnees / "manifest_synthetique.json"
+    if manifeste.exists():
+        with open(manifeste, "r", encoding="utf-8") as f:
+            meta["donnees"] = json.load(f)
+    return meta
+
+
+def lancer(donnees, pages=None, reruns: int = 5, timeout: float = 600, interactions=None,
+           sessions: int = None) -> dict:
+    """Mesure chaque page (interactions, sessions simultanées) dans un sous-processus ; renvoie le rapport."""
+    donnees = Path(donnees)
+    travail = preparer(donnees)
+    env = dict(os.environ, CEO_EXCEL_FILE=str(travail / "suivi_objectifs.xlsx"), PYTHONPATH=str(travail))
+    rapport = {"meta": _meta(donnees), "pages": {}}
+    mesures = [("pages", ["--page", nom], nom, PAGES[nom][0]) for nom in pages or PAGES]
+    if interactions is not None:
+        rapport["interactions"] = {}
+        mesures += [("interactions", ["--interaction", nom], nom, INTERACTIONS[nom][0])
+                    for nom in interactions or INTERACTIONS]
+    if sessions:
+        rapport["sessions"] = {}
+        mesures += [("sessions", ["--page", nom, "--sessions", str(sessions)], nom, PAGES[nom][0])
+                    for nom in pages or PAGES]
+    try:
+        for rubrique, options, nom, script in mesures:
+            print(f"⏱️  {nom}…", file=sys.stderr, flush=True)
+            proc = subprocess.run(
+                [sys.executable, "-m", "outils.banc_essai", *options,
+                 "--reruns", str(reruns), "--timeout", str(timeout)],
+                cwd=travail, env=env, capture_output=True, text=True,
+            )
+            try:
+                rapport[rubrique][nom] = json.loads(proc.stdout.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                rapport[rubrique][nom] = {"script": script, "erreur": proc.stderr.strip()[-2000:]}
+    finally:
+        shutil.rmtree(travail, ignore_errors=True)
+    return rapport
+
+
+def comparer(rapport: dict, reference: dict) -> str:
+    """Tableau texte : temps à froid, médiane à chaud et pic mémoire, avant -> après."""
+    def _delta(avant, apres):
+        if not avant or apres is None:
+            return ""
+        return f"{100 * (apres - avant) / avant:+.0f}%"
+
+    lignes = [f"{'page':<20} {'froid (s)':>18} {'':>6} {'chaud méd. (s)':>18} {'':>6} {'pic RSS (Mo)':>16} {'':>6}"]
+    for nom, apres in rapport["pages"].items():
+        avant = reference.get("pages", {}).get(nom, {})
+        cellules = [f"{nom:<20}"]
+        for cle, largeur in (("froid_s", 18), ("chaud_mediane_s", 18), ("rss_pic_mo", 16)):
+            a, b = avant.get(cle), apres.get(cle)
+            texte = f"{a if a is not None else '—'} -> {b if b is not None else '—'}"
+            cellules.append(f"{texte:>{largeur}} {_delta(a, b):>6}")
+        lignes.append(" ".join(cellules))
+    return "\n".join(lignes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai headless des pages Streamlit.")
+    parser.add_argument("donnees", nargs="?", help="Dossier produit par outils.donnees_synthetiques")
+    parser.add_argument("--pages", nargs="*", choices=list(PAGES), help="Sous-ensemble de pages (défaut : toutes)")
+    parser.add_argument("--reruns", type=int, default=5, help="Reruns à chaud par page")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--sortie", default="rapport_banc.json", help="Rapport JSON")
+    parser.add_argument("--reference", help="Rapport précédent à comparer")
+    parser.add_argument("--interactions", nargs="*", choices=list(INTERACTIONS),
+                        help="Mesure aussi ces interactions, rerun complet vs fragment (sans nom : toutes)")
+    parser.add_argument("--sessions", type=int, help="Mesure aussi la mémoire de N sessions simultanées par page")
+    parser.add_argument("--page", help=argparse.SUPPRESS)  # processus enfant : une seule page
+    parser.add_argument("--interaction", help=argparse.SUPPRESS)  # processus enfant : une interaction
+    args = parser.parse_args()
+
+    if args.page and args.sessions:
+        print(json.dumps(mesurer_sessions(args.page, args.sessions, args.timeout), ensure_ascii=False))
+        sys.exit(0)
+    if args.page:
+        print(json.dumps(mesurer_page(args.page, args.reruns, args.timeout), ensure_ascii=False))
+        sys.exit(0)
+    if args.interaction:
+        print(json.dumps(mesurer_interaction(args.interaction, args.reruns, args.timeout), ensure_ascii=False))
+        sys.exit(0)
+    if not args.donnees:
+        parser.error("dossier de données requis")
+
+    rapport = lancer(args.donnees, args.pages, args.reruns, args.timeout, args.interactions, args.sessions)
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    for nom, r in rapport["pages"].items():
+        if "erreur" in r:
+            print(f"{nom:<20} ÉCHEC  {r['erreur'].splitlines()[-1] if r['erreur'] else ''}")
+        else:
+            print(f"{nom:<20} froid {r['froid_s']:>7.2f} s   chaud {r['chaud_mediane_s']:>7.3f} s "
+                  f"(p95 {r['chaud_p95_s']:.3f})   pic {r['rss_pic_mo']:>6.0f} Mo"
+                  + (f"   ⚠️ {len(r['exceptions'])} exception(s)" if r["exceptions"] else ""))
+    for nom, r in rapport.get("interactions", {}).items():
+        if "erreur" in r:
+            print(f"{nom:<20} ÉCHEC  {r['erreur'].splitlines()[-1] if r['erreur'] else ''}")
+            continue
+        ligne = f"{nom:<20} rerun complet {r['complet']['mediane_ms']:>7.1f} ms {r['complet']['octets'] / 1024:>8.1f} Ko"
+        if r["fragment"]:
+            ligne += f"   fragment seul {r['fragment']['mediane_ms']:>7.1f} ms {r['fragment']['octets'] / 1024:>8.1f} Ko"
+        else:
+            ligne += "   (widget hors fragment)"
+        print(ligne + (f"   ⚠️ {len(r['exceptions'])} exception(s)" if r["exceptions"] else ""))
+    for nom, r in rapport.get("sessions", {}).items():
+        if "erreur" in r:
+            print(f"{nom:<20} ÉCHEC  {r['erreur'].splitlines()[-1] if r['erreur'] else ''}")
+            continue
+        print(f"{nom:<20} {r['sessions']} sessions : RSS {r['rss_premiere_mo']:.0f} -> {r['rss_finale_mo']:.0f} Mo "
+              f"({r['rss_par_session_mo']} Mo / session), état {r['etat_par_session_ko']} Ko / session"
+              + (f"   ⚠️ {len(r['exceptions'])} exception(s)" if r["exceptions"] else ""))
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            print("\n" + comparer(rapport, json.load(f)))
+    print(f"\n📄 Rapport : {args.sortie}")
@@ -0,0 +1,163 @@
+"""Calendrier des gains / pertes : grilles vectorisées et rendu en une seule heatmap.
+
+La grille est construite par un unique `reindex` du P&L journalier sur la
+période affichée, puis placée dans un tableau (semaine × jour) par indexation
+NumPy. Le rendu utilise une seule trace Heatmap dont la couleur de chaque case
+vient d'un tableau de catégories (pas de forme Plotly par case).
+"""
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+JOURS = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
+MOIS_COURTS = ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin", "Juil", "Août", "Sep", "Oct", "Nov", "Déc"]
+
+# Catégorie de case -> couleur (mêmes teintes que l'ancien calendrier)
+SANS_SESSION, PERTE, NEUTRE, GAIN = 0, 1, 2, 3
+COULEURS = ["#f8fafc", "#fca5a5", "#e5e7eb", "#86efac"]
+
+
+def pnl_journalier(df: pd.DataFrame) -> pd.Series:
+    """Somme des montants par jour, indexée par date (DatetimeIndex normalisé)."""
+    if df.empty:
+        return pd.Series(dtype="float64", index=pd.DatetimeIndex([], name="Date"))
+    dates = df["Date"].dt.normalize()
+    return df["Montant"].groupby(dates).sum().sort_index()
+
+
+def bornes_vue(vue: str, annee: int, mois: int = 1, trimestre: int = 1):
+    """Premier et dernier jour affichés pour une vue « Mois », « Trimestre » ou « Année »."""
+    if vue == "Mois":
+        return date(annee, mois, 1), date(annee, mois, calendar.monthrange(annee, mois)[1])
+    if vue == "Trimestre":
+        m0 = 3 * (trimestre - 1) + 1
+        return date(annee, m0, 1), date(annee, m0 + 2, calendar.monthrange(annee, m0 + 2)[1])
+    return date(annee, 1, 1), date(annee, 12, 31)
+
+
+def _categories(valeurs: np.ndarray) -> np.ndarray:
+    cat = np.full(valeurs.shape, SANS_SESSION, dtype="float64")
+    cat[valeurs > 0] = GAIN
+    cat[valeurs < 0] = PERTE
+    cat[valeurs == 0] = NEUTRE
+    return cat
+
+
+def grille(daily: pd.Series, debut: date, fin: date, semaines_en_lignes: bool = True) -> dict:
+    """Place le P&L de [debut, fin] dans une grille semaine × jour.
+
+    Renvoie les tableaux `z` (catégorie de couleur, NaN hors période),
+    `montant` (NaN sans session), `jours` (objets date) et `debuts_semaine`.
+    Avec `semaines_en_lignes=False` la grille est transposée (jours en lignes,
+    semaines en colonnes) pour les vues trimestre / année.
+    """
+    lundi = debut - timedelta(days=debut.weekday())
+    dimanche = fin + timedelta(days=6 - fin.weekday())
+    idx = pd.date_range(lundi, dimanche, freq="D")
+    valeurs = daily.reindex(idx).to_numpy(dtype="float64")
+
+    n_semaines = len(idx) // 7
+    semaine = np.arange(len(idx)) // 7
+    jour = idx.weekday.to_numpy()
+    dans_periode = (idx >= pd.Timestamp(debut)) & (idx <= pd.Timestamp(fin))
+
+    z = np.full((n_semaines, 7), np.nan)
+    montant = np.full((n_semaines, 7), np.nan)
+    jours = np.empty((n_semaines, 7), dtype=object)
+    z[semaine[dans_periode], jour[dans_periode]] = _categories(valeurs[dans_periode])
+    montant[semaine, jour] = valeurs
+    jours[semaine, jour] = idx.date
+
+    g = {
+        "z": z,
+        "montant": montant,
+        "jours": jours,
+        "debuts_semaine": idx[::7].date,
+    }
+    if not semaines_en_lignes:
+        g.update({k: g[k].T for k in ("z", "montant", "jours")})
+    return g
+
+
+def _libelles(g: dict, avec_montant: bool) -> np.ndarray:
+    """Texte des cases : jour du mois, et montant s'il y a eu une session."""
+    jours, z, montant = g["jours"], g["z"], g["montant"]
+    texte = np.full(z.shape, "", dtype=object)
+    visible = ~np.isnan(z)
+    texte[visible] = [str(j.day) for j in jours[visible]]
+    if avec_montant:
+        avec = visible & ~np.isnan(montant)
+        texte[avec] = [f"{j.day}<br><b>{v:+.2f}€</b>" for j, v in zip(jours[avec], montant[avec])]
+    return texte
+
+
+def figure_calendrier(daily: pd.Series, vue: str, annee: int, mois: int = 1, trimestre: int = 1):
+    """Figure Plotly du calendrier (une seule trace Heatmap)."""
+    import plotly.graph_objects as go
+
+    debut, fin = bornes_vue(vue, annee, mois, trimestre)
+    mensuelle = vue == "Mois"
+    g = grille(daily, debut, fin, semaines_en_lignes=mensuelle)
+
+    n = len(COULEURS)
+    colorscale = []
+    for i, c in enumerate(COULEURS):
+        colorscale += [[i / n, c], [(i + 1) / n, c]]
+
+    survol = np.full(g["z"].shape, "", dtype=object)
+    visible = ~np.isnan(g["z"])
+    survol[visible] = [
+        f"{d:%d/%m/%Y}" + ("" if np.isnan(v) else f"<br>{v:+.2f}€")
+        for d, v in zip(g["jours"][visible], g["montant"][visible])
+    ]
+
+    if mensuelle:
+        x, y = JOURS, [f"Semaine {i + 1}" for i in range(g["z"].shape[0])]
+        texte = _libelles(g, avec_montant=True)
+    else:
+        x, y = list(range(g["z"].shape[1])), JOURS
+        texte = _libelles(g, avec_montant=False) if vue == "Trimestre" else None
+
+    heatmap = go.Heatmap(
+        z=g["z"],
+        x=x,
+        y=y,
+        zmin=0,
+        zmax=n,
+        colorscale=colorscale,
+        showscale=False,
+        xgap=2,
+        ygap=2,
+        customdata=survol,
+        hovertemplate="%{customdata}<extra></extra>",
+    )
+    if texte is not None:
+        heatmap.update(text=texte, texttemplate="%{text}", textfont=dict(size=12 if mensuelle else 9, color="#0f172a"))
+
+    fig = go.Figure(data=heatmap)
+    if not mensuelle:
+        # Repères de mois sur l'axe des semaines : la colonne qui contient le 1er du mois
+        lundi = g["debuts_semaine"][0]
+        premiers = [date(annee, m, 1) for m in range(debut.month, fin.month + 1)]
+        fig.update_xaxes(
+            tickvals=[(p - lundi).days // 7 for p in premiers],
+            ticktext=[MOIS_COURTS[p.month - 1] for p in premiers],
+        )
+
+    titres = {
+        "Mois": f"Résultats du mois de {calendar.month_name[mois]} {annee}",
+        "Trimestre": f"Résultats du T{trimestre} {annee}",
+        "Année": f"Résultats de l'année {annee}",
+    }
+    fig.update_layout(
+        title=titres[vue],
+        xaxis=dict(showgrid=False, zeroline=False, side="top" if not mensuelle else "bottom"),
+        yaxis=dict(showgrid=False, zeroline=False, autorange="reversed"),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=0, r=0, t=60, b=0),
+        height=380 if mensuelle else 260,
+    )
+    return fig
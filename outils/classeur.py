@@ -0,0 +1,132 @@
+"""Lecture en cache et écriture groupée et atomique des feuilles d'un classeur Excel.
+
+Écriture : un seul cycle chargement / sauvegarde openpyxl quel que soit le
+nombre de feuilles remplacées ; la sauvegarde passe par un fichier
+temporaire du même dossier puis `os.replace`, pour qu'un plantage en cours
+d'écriture ne laisse jamais un classeur tronqué.
+
+Lecture : `lire_classeur` lit toutes les feuilles en une fois — depuis le
+miroir Feather (`outils.miroir`) s'il est à jour, sinon `sheet_name=None` —
+et garde le résultat pour tout le processus, tant que le fichier ne change
+pas (date de modification et taille). `ecrire_feuilles` invalide l'entrée
+dès que le classeur est remplacé, puis régénère cache et miroir en
+arrière-plan.
+"""
+import contextvars
+import math
+import os
+import stat
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+from outils import miroir
+
+_cache = {}  # chemin absolu -> ((mtime_ns, taille), {feuille: DataFrame})
+_verrou = threading.Lock()
+
+
+def _version(chemin: str):
+    etat = os.stat(chemin)
+    return etat.st_mtime_ns, etat.st_size
+
+
+def lire_classeur(chemin: str) -> dict:
+    """Toutes les feuilles `{nom: DataFrame}`, analysées une seule fois par version du fichier.
+
+    Les DataFrames sont partagés par tout le processus : ne jamais les
+    modifier en place (travailler sur `df.copy()`).
+    """
+    cle = os.path.abspath(chemin)
+    version = _version(cle)
+    with _verrou:
+        entree = _cache.get(cle)
+        if entree and entree[0] == version:
+            return entree[1]
+    feuilles = miroir.lire(cle)
+    with _verrou:
+        _cache[cle] = (version, feuilles)
+    return feuilles
+
+
+def invalider(chemin: str):
+    """Oublie la version en cache du classeur (après une écriture)."""
+    with _verrou:
+        _cache.pop(os.path.abspath(chemin), None)
+
+
+def _valeur_cellule(v):
+    """Convertit une valeur pandas / NumPy en valeur acceptée par openpyxl."""
+    if v is None or v is pd.NaT:
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.to_pydatetime()
+    if hasattr(v, "item"):  # types NumPy
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, (str, int, float, bool, datetime, date)):
+        return v
+    return str(v)
+
+
+def _remplacer_feuille(wb, nom: str, df: pd.DataFrame):
+    if nom in wb.sheetnames:
+        position = wb.sheetnames.index(nom)
+        del wb[nom]
+        ws = wb.create_sheet(nom, position)
+    else:
+        ws = wb.create_sheet(nom)
+    ws.append([str(c) for c in df.columns])
+    for ligne in df.itertuples(index=False, name=None):
+        ws.append([_valeur_cellule(v) for v in ligne])
+
+
+def ecrire_feuilles(chemin: str, feuilles: dict) -> float:
+    """Remplace les feuilles `{nom: DataFrame}` en une seule réécriture du classeur.
+
+    Les autres feuilles sont conservées. Renvoie la durée de l'écriture (s).
+    """
+    from openpyxl import Workbook, load_workbook  # import différé : seulement à l'écriture
+
+    debut = time.perf_counter()
+    if os.path.exists(chemin):
+        wb = load_workbook(chemin)
+    else:
+        wb = Workbook()
+        wb.remove(wb.active)
+
+    for nom, df in feuilles.items():
+        _remplacer_feuille(wb, nom, df)
+
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    fd, tmp = tempfile.mkstemp(prefix=".~", suffix=".xlsx", dir=dossier)
+    os.close(fd)
+    try:
+        wb.save(tmp)
+        try:
+            mode = stat.S_IMODE(os.stat(chemin).st_mode)  # droits du classeur remplacé
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp, mode)  # mkstemp crée le fichier en 0600
+        os.replace(tmp, chemin)
+        invalider(chemin)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    duree = time.perf_counter() - debut
+    # Relecture hors du chemin de l'interface : le prochain affichage trouve cache et miroir à jour
+    threading.Thread(
+        target=contextvars.copy_context().run, args=(_precharger, chemin), name="miroir", daemon=True
+    ).start()
+    return duree
+
+
+def _precharger(chemin: str):
+    try:
+        lire_classeur(chemin)
+    except Exception:
+        pass  # la prochaine lecture réessaiera
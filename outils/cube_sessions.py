@@ -0,0 +1,164 @@
+"""Cube OLAP des sessions pour la page Statistiques.
+
+Une cellule par combinaison Année × Mois × Jour × Discipline × Mood ×
+Erreur_Clé × Respect, avec trois mesures additives : nombre de sessions,
+somme et somme des carrés du Montant. Moyenne et écart-type se déduisent
+des mesures, et toute agrégation (par dimension, sur n'importe quel filtre
+année / mois / plage de dates / valeur) se calcule sur les cellules seules,
+sans relire les sessions brutes.
+
+- `reconstruire(df)` : construction complète (groupby vectorisé) ;
+- `ajouter(entree)` : mise à jour O(1) d'une cellule pour une nouvelle session ;
+- `agreger(par, ...)` : mesures regroupées par les dimensions demandées.
+
+Le cube note la version du stockage qu'il reflète (`version_sessions`) :
+l'application le reconstruit seulement si le stockage a changé autrement
+que par ses propres ajouts (import, compactage, autre processus).
+"""
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ["annee", "mois", "jour", "Discipline", "Mood", "Erreur_Clé", "Respect"]
+MESURES = ["n", "somme", "somme_carres"]
+_TEXTE = ["Discipline", "Mood", "Erreur_Clé", "Respect"]
+
+
+def _texte(v) -> str:
+    return "" if v is None or (isinstance(v, float) and np.isnan(v)) else str(v)
+
+
+class CubeSessions:
+    """Agrégats additifs des sessions, mis à jour session par session."""
+
+    def __init__(self):
+        self._cellules = {}  # (annee, mois, jour, discipline, mood, erreur, respect) -> [n, somme, somme_carres]
+        self._cadre = None  # cellules sous forme de DataFrame, recalculé après modification
+        self._verrou = threading.Lock()
+        self.version = None
+
+    # -- Construction -------------------------------------------------------
+    def reconstruire(self, df: pd.DataFrame, version=None):
+        """Remplace le contenu du cube par l'agrégation de `df` (sessions typées)."""
+        df = df.dropna(subset=["Date"])
+        montant = df["Montant"].astype("float64")
+        cles = pd.DataFrame({
+            "annee": df["Date"].dt.year, "mois": df["Date"].dt.month, "jour": df["Date"].dt.day,
+            **{c: df[c].astype(str) for c in _TEXTE},
+            "n": 1, "somme": montant, "somme_carres": montant ** 2,
+        })
+        agg = cles.groupby(DIMENSIONS, sort=False)[MESURES].sum()
+        cellules = {
+            tuple(k): [int(n), float(s), float(s2)]
+            for k, n, s, s2 in zip(agg.index, agg["n"], agg["somme"], agg["somme_carres"])
+        }
+        with self._verrou:
+            self._cellules, self._cadre, self.version = cellules, None, version
+
+    def ajouter(self, entree: dict, version_avant=None, version_apres=None):
+        """Ajoute une session (O(1)) au cube qui reflétait `version_avant`.
+
+        Il reflète alors `version_apres`. Si le cube reflète une autre
+        version (reconstruit entre-temps par une autre session, peut-être
+        déjà avec cette ligne), rien n'est ajouté : il est marqué périmé et
+        sera reconstruit à la prochaine lecture.
+        """
+        quand = pd.Timestamp(entree["Date"])
+        montant = float(pd.to_numeric(entree.get("Montant"), errors="coerce") or 0.0)
+        cle = (quand.year, quand.month, quand.day, *(_texte(entree.get(c)) for c in _TEXTE))
+        with self._verrou:
+            if self.version != version_avant:
+                self.version = None
+                return
+            cellule = self._cellules.setdefault(cle, [0, 0.0, 0.0])
+            cellule[0] += 1
+            cellule[1] += montant
+            cellule[2] += montant * montant
+            self._cadre = None
+            self.version = version_apres
+
+    def __len__(self):
+        """Nombre de cellules non vides."""
+        return len(self._cellules)
+
+    # -- Requêtes -----------------------------------------------------------
+    def cellules(self) -> pd.DataFrame:
+        """Toutes les cellules (dimensions + mesures), mises en cache jusqu'au prochain ajout."""
+        with self._verrou:
+            if self._cadre is None:
+                if self._cellules:
+                    cles, mesures = zip(*self._cellules.items())
+                    cadre = pd.DataFrame(list(cles), columns=DIMENSIONS)
+                    cadre[MESURES] = np.array(mesures, dtype="float64")
+                    cadre["n"] = cadre["n"].astype("int64")
+                else:
+                    cadre = pd.DataFrame(columns=DIMENSIONS + MESURES)
+                cadre["cle_date"] = (cadre["annee"] * 10000 + cadre["mois"] * 100 + cadre["jour"]).astype("int64")
+                self._cadre = cadre
+            return self._cadre
+
+    def _filtrer(self, annee=None, mois=None, debut: date = None, fin: date = None, **egalites) -> pd.DataFrame:
+        c = self.cellules()
+        masque = np.ones(len(c), dtype=bool)
+        if annee is not None:
+            masque &= (c["annee"] == int(annee)).to_numpy()
+        if mois is not None:
+            masque &= (c["mois"] == int(mois)).to_numpy()
+        if debut is not None:
+            masque &= (c["cle_date"] >= debut.year * 10000 + debut.month * 100 + debut.day).to_numpy()
+        if fin is not None:
+            masque &= (c["cle_date"] <= fin.year * 10000 + fin.month * 100 + fin.day).to_numpy()
+        for dim, valeur in egalites.items():
+            masque &= (c[dim] == valeur).to_numpy()
+        return c[masque]
+
+    def agreger(self, par=(), **filtres) -> pd.DataFrame:
+        """Mesures regroupées par `par` (liste de dimensions) sur les cellules filtrées.
+
+        Filtres : `annee`, `mois` (entiers), `debut` / `fin` (dates incluses) et
+        égalités sur les autres dimensions (`Discipline="Bonne"`…). Colonnes :
+        dimensions de `par`, n, somme, somme_carres, moyenne, ecart_type.
+        """
+        par = list(par)
+        c = self._filtrer(**filtres)
+        if par:
+            agg = c.groupby(par, sort=True)[MESURES].sum().reset_index()
+        else:
+            agg = pd.DataFrame([c[MESURES].sum()], columns=MESURES)
+        agg["n"] = agg["n"].astype("int64")
+        n = agg["n"].where(agg["n"] > 0)
+        agg["moyenne"] = agg["somme"] / n
+        agg["ecart_type"] = np.sqrt((agg["somme_carres"] / n - agg["moyenne"] ** 2).clip(lower=0))
+        return agg
+
+    def pnl_journalier(self, **filtres) -> pd.Series:
+        """Somme des montants par jour (même forme que `calendrier.pnl_journalier`)."""
+        agg = self.agreger(["annee", "mois", "jour"], **filtres)
+        if agg.empty:
+            return pd.Series(dtype="float64", index=pd.DatetimeIndex([], name="Date"), name="Montant")
+        index = pd.DatetimeIndex(
+            pd.to_datetime(dict(year=agg["annee"], month=agg["mois"], day=agg["jour"])), name="Date"
+        )
+        return pd.Series(agg["somme"].to_numpy(), index=index, name="Montant").sort_index()
+
+
+def correlation_binaire(groupes: pd.DataFrame, positif) -> float:
+    """Corrélation (point-bisériale) entre le Montant et un indicateur 0/1.
+
+    `groupes` : sortie de `agreger([...])` ; `positif` : masque booléen des
+    groupes où l'indicateur vaut 1. Calcul exact à partir de n / somme /
+    somme des carrés. Renvoie NaN si l'un des deux groupes est vide.
+    """
+    positif = np.asarray(positif, dtype=bool)
+    n1, n0 = groupes["n"][positif].sum(), groupes["n"][~positif].sum()
+    n = n1 + n0
+    if not n1 or not n0:
+        return float("nan")
+    s1, s0 = groupes["somme"][positif].sum(), groupes["somme"][~positif].sum()
+    variance = groupes["somme_carres"].sum() / n - ((s1 + s0) / n) ** 2
+    if variance <= 0:
+        return float("nan")
+    return float((s1 / n1 - s0 / n0) / np.sqrt(variance) * np.sqrt(n1 * n0) / n)
+
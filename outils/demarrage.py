@@ -0,0 +1,144 @@
+"""Rapport de démarrage à froid des applications (`python -X importtime`).
+
+Chaque application est lancée dans un processus neuf avec `-X importtime` :
+1. import du cadre de test Streamlit (coût fixe, identique pour toutes) ;
+2. premier rendu du script avec `AppTest` (page par défaut).
+
+Les imports déclenchés pendant l'étape 2 sont ceux du script lui-même : ce
+sont eux que les imports différés doivent réduire. Le rapport donne, par
+application, la durée totale du processus, le temps jusqu'au premier rendu,
+la part des imports et les modules les plus lourds. Un budget (ms) par
+application est vérifié sur le premier rendu ; le code de sortie vaut 1 si
+un budget est dépassé.
+
+Exemple :
+    python -m outils.demarrage --sortie demarrage.json
+    python -m outils.demarrage --donnees /tmp/bench --apps dashboard ceo
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from outils.banc_essai import preparer
+
+APPS = {
+    "dashboard": "Dashboard.py",
+    "ceo": "CEO.py",
+    "trading_app": "trading_app/Saisie de Fiche.py",
+    "captures": "captures/Dashboard.py",
+}
+# Budget du premier rendu (ms, cadre Streamlit exclu) — à ajuster à la machine avec --budget
+BUDGET_MS = {"dashboard": 2000, "ceo": 1500, "trading_app": 600, "captures": 1200}
+MARQUEUR = "-- premier rendu --"
+
+
+def analyser_importtime(sortie: str, top: int = 10) -> dict:
+    """Imports postérieurs au marqueur : total (ms) et modules de premier niveau les plus lourds."""
+    lignes = sortie.splitlines()
+    if MARQUEUR in lignes:
+        lignes = lignes[lignes.index(MARQUEUR) + 1:]
+    modules = []
+    for ligne in lignes:
+        if not ligne.startswith("import time:") or "cumulative" in ligne:
+            continue
+        _, cumul, nom = ligne.split("|", 2)
+        nom = nom[1:]  # un espace de séparation, puis deux par niveau d'imbrication
+        niveau = (len(nom) - len(nom.lstrip())) // 2
+        modules.append((nom.strip(), int(cumul) / 1000, niveau))
+    if not modules:
+        return {"imports_ms": 0.0, "modules": []}
+    racine = min(n for _, _, n in modules)
+    premiers = [(nom, ms) for nom, ms, n in modules if n == racine]
+    return {
+        "imports_ms": round(sum(ms for _, ms in premiers), 1),
+        "modules": [{"module": nom, "ms": round(ms, 1)} for nom, ms in sorted(premiers, key=lambda m: -m[1])[:top]],
+    }
+
+
+def _premier_rendu(app: str, timeout: float) -> dict:
+    """Processus enfant : cadre de test, marqueur sur stderr, puis premier rendu du script."""
+    debut = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    cadre = time.perf_counter() - debut
+    print(MARQUEUR, file=sys.stderr, flush=True)
+    debut = time.perf_counter()
+    at = AppTest.from_file(os.path.abspath(APPS[app]), default_timeout=timeout)
+    at.run()
+    rendu = time.perf_counter() - debut
+    return {
+        "cadre_ms": round(1000 * cadre, 1),
+        "premier_rendu_ms": round(1000 * rendu, 1),
+        "exceptions": [e.message for e in at.exception],
+    }
+
+
+def mesurer(apps=None, donnees=None, timeout: float = 300, budgets: dict = None) -> dict:
+    """Lance chaque application dans un processus `-X importtime` neuf ; renvoie le rapport."""
+    travail = preparer(donnees)
+    env = dict(os.environ, CEO_EXCEL_FILE=str(travail / "suivi_objectifs.xlsx"), PYTHONPATH=str(travail))
+    rapport = {
+        "meta": {"date": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "plateforme": platform.platform(), "donnees": str(donnees) if donnees else None},
+        "apps": {},
+    }
+    try:
+        for app in apps or APPS:
+            debut = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", "outils.demarrage", "--app", app, "--timeout", str(timeout)],
+                cwd=travail, env=env, capture_output=True, text=True,
+            )
+            processus = time.perf_counter() - debut
+            try:
+                resultat = json.loads(proc.stdout.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                resultat = {"erreur": proc.stderr.strip()[-2000:]}
+            resultat.update(script=APPS[app], processus_ms=round(1000 * processus, 1), **analyser_importtime(proc.stderr))
+            budget = {**BUDGET_MS, **(budgets or {})}.get(app)
+            resultat["budget_ms"] = budget
+            resultat["dans_budget"] = budget is None or resultat.get("premier_rendu_ms", float("inf")) <= budget
+            rapport["apps"][app] = resultat
+    finally:
+        shutil.rmtree(travail, ignore_errors=True)
+    return rapport
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Démarrage à froid des applications (-X importtime).")
+    parser.add_argument("--apps", nargs="*", choices=list(APPS), help="Sous-ensemble (défaut : toutes)")
+    parser.add_argument("--donnees", help="Jeu de données synthétique (outils.donnees_synthetiques) ; défaut : vide")
+    parser.add_argument("--budget", nargs="*", default=[], metavar="APP=MS", help="Remplace un budget, ex. ceo=1000")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--sortie", default="demarrage.json")
+    parser.add_argument("--app", help=argparse.SUPPRESS)  # processus enfant
+    args = parser.parse_args()
+
+    if args.app:
+        print(json.dumps(_premier_rendu(args.app, args.timeout), ensure_ascii=False))
+        sys.exit(0)
+
+    budgets = {app: float(ms) for app, ms in (b.split("=", 1) for b in args.budget)}
+    rapport = mesurer(args.apps, args.donnees, args.timeout, budgets)
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    depasse = False
+    for app, r in rapport["apps"].items():
+        if "erreur" in r:
+            print(f"{app:<12} ÉCHEC  {r['erreur'].splitlines()[-1] if r['erreur'] else ''}")
+            depasse = True
+            continue
+        etat = "✅" if r["dans_budget"] else "❌"
+        depasse |= not r["dans_budget"]
+        print(f"{etat} {app:<12} premier rendu {r['premier_rendu_ms']:>7.0f} ms (budget {r['budget_ms']}) "
+              f"dont imports {r['imports_ms']:>6.0f} ms — processus {r['processus_ms']:>6.0f} ms, "
+              f"cadre Streamlit {r['cadre_ms']:.0f} ms")
+        print("     " + ", ".join(f"{m['module']} {m['ms']:.0f}" for m in r["modules"][:6]))
+    print(f"\n📄 Rapport : {args.sortie}")
+    sys.exit(1 if depasse else 0)
@@ -0,0 +1,239 @@
+"""Génération de données synthétiques réalistes pour mesurer les pages à grande échelle.
+
+Produit dans un dossier cible (jamais dans le dossier de travail réel) :
+- `discipline.xlsx` et le stockage Parquet `sessions/` (N sessions) ;
+- `suivi_objectifs.xlsx` avec des feuilles CEO de N lignes et, en option,
+  un historique SQLite de plusieurs versions ;
+- une arborescence `data/YYYY/MM/semaine_WW/JJ-MM-AAAA/fiche_k/` de fiches
+  JSON, dont une part avec `capture.png` ;
+- `sessions_sheets.json` : la feuille Google Sheets équivalente (pour la
+  doublure utilisée par le banc d'essai) ;
+- `manifest_synthetique.json` : paramètres et tailles, repris dans le rapport.
+
+Exemple :
+    python -m outils.donnees_synthetiques /tmp/bench --sessions 10000 --fiches 50000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outils import historique_feuilles as historique
+from outils.classeur import ecrire_feuilles
+from outils.sessions import COLONNES, importer_sessions
+
+MOTS = (
+    "bol moyenne pullback alignement vente achat tendance haussière baissière contexte "
+    "analyse rigueur patience impatience cassure range retracement structure liquidité "
+    "ouverture clôture volume stop objectif risque discipline plan entrée sortie "
+    "confirmation divergence support résistance 1 5 15 minutes heure journalier"
+).split()
+ERREURS = ["", "Entrée anticipée", "Stop trop serré", "Sur-trading", "Pas de confirmation", "Sortie trop tôt"]
+MOODS = ["Calme", "Confiant", "Stressé", "Fatigué", "Impatient", "Concentré"]
+
+
+def _phrase(rng: random.Random, n_min: int = 6, n_max: int = 40) -> str:
+    return " ".join(rng.choices(MOTS, k=rng.randint(n_min, n_max))).capitalize() + "."
+
+
+def _jours_ouvres(n: int, fin: datetime) -> pd.DatetimeIndex:
+    return pd.bdate_range(end=fin.date(), periods=n)
+
+
+# ---------------------------------------------------------------------------
+# 📈 Sessions (Dashboard)
+# ---------------------------------------------------------------------------
+def generer_sessions(n: int, rng: random.Random, fin: datetime = None) -> pd.DataFrame:
+    """N sessions réparties sur des jours ouvrés (1 à 3 par jour), P&L réaliste."""
+    fin = fin or datetime.now()
+    np_rng = np.random.default_rng(rng.randint(0, 2**32 - 1))
+    jours = _jours_ouvres(max(1, n // 2), fin)
+    dates = np.sort(np_rng.choice(jours.values, size=n, replace=True))
+    dates = pd.to_datetime(dates) + pd.to_timedelta(np_rng.integers(8 * 3600, 22 * 3600, size=n), unit="s")
+    respect = np_rng.random(n) < 0.7
+    montant = np.round(np.where(respect, np_rng.normal(40, 120, n), np_rng.normal(-60, 150, n)), 2)
+    return pd.DataFrame({
+        "Date": dates,
+        "Respect": np.where(respect, "✅ Oui (respecté)", "❌ Non (non respecté)"),
+        "Valeur": np.where(respect, 1, -1),
+        "Montant": montant,
+        "Erreur_Clé": [rng.choice(ERREURS) for _ in range(n)],
+        "Discipline": [rng.choice(["Bonne", "Moyenne", "Faible"]) for _ in range(n)],
+        "Mood": [rng.choice(MOODS) for _ in range(n)],
+        "Commentaire": [_phrase(rng, 3, 15) for _ in range(n)],
+        "Axe_Opérationnel": "", "Axe_Financier": "", "Axe_Humain": "", "Axe_Alignement": "",
+        "Capture": "",
+    }, columns=COLONNES)
+
+
+# ---------------------------------------------------------------------------
+# 🏢 Classeur CEO
+# ---------------------------------------------------------------------------
+def generer_classeur_ceo(n: int, rng: random.Random) -> dict:
+    """Feuilles CEO qui grossissent avec le temps (journal, KPI, prop firms, flux)."""
+    mois = list(range(1, n + 1))
+    return {
+        "Journal_Mensuel": pd.DataFrame({
+            "Mois": mois,
+            "Gains/Pertes (€)": [round(rng.gauss(400, 900), 2) for _ in mois],
+            "Nb trades": [rng.randint(5, 60) for _ in mois],
+            "Respect du plan (%)": [rng.randint(40, 100) for _ in mois],
+            "Sentiment général (discipline / impatience / focus)": [rng.choice(MOODS) for _ in mois],
+            "Commentaires": [_phrase(rng, 4, 20) for _ in mois],
+        }),
+        "Objectifs_KPI": pd.DataFrame({
+            "Mois": mois,
+            "Respect du plan (%)": [rng.randint(40, 100) for _ in mois],
+            "Drawdown max (%)": [round(rng.uniform(1, 15), 1) for _ in mois],
+            "R/R moyen": [round(rng.uniform(0.5, 3), 2) for _ in mois],
+            "Nb jours verts": [rng.randint(0, 20) for _ in mois],
+            "Nb jours rouges": [rng.randint(0, 20) for _ in mois],
+            "Taux de conformité (%)": [rng.randint(40, 100) for _ in mois],
+        }),
+        "Prop_Firm": pd.DataFrame({
+            "Date": [(datetime(2024, 1, 1) + timedelta(days=3 * i)).strftime("%Y-%m-%d") for i in range(n)],
+            "Prop Firm": [rng.choice(["FTMO", "Topstep", "Apex", "MFF"]) for _ in range(n)],
+            "Taille Compte (€)": [rng.choice([25000, 50000, 100000, 150000]) for _ in range(n)],
+            "Statut": [rng.choice(["En cours", "Validé", "Échoué", "Payout"]) for _ in range(n)],
+            "Payout (€)": [rng.choice(["", 500, 1000, 2500]) for _ in range(n)],
+            "Commentaires": [_phrase(rng, 3, 12) for _ in range(n)],
+        }),
+        "SE_Flux_Mensuel": pd.DataFrame({
+            "Ordre": list(range(1, n + 1)),
+            "Étape": [_phrase(rng, 4, 10) for _ in range(n)],
+            "Statut / Note": [rng.choice(["", "OK", "À faire"]) for _ in range(n)],
+        }),
+    }
+
+
+def _muter(df: pd.DataFrame, rng: random.Random, n_cellules: int = 3) -> pd.DataFrame:
+    df = df.copy()
+    for _ in range(n_cellules):
+        i, col = rng.randrange(len(df)), rng.choice(list(df.columns))
+        numerique = pd.api.types.is_numeric_dtype(df[col])
+        df.iat[i, df.columns.get_loc(col)] = rng.randint(0, 100) if numerique else _phrase(rng, 1, 4)
+    return df
+
+
+# ---------------------------------------------------------------------------
+# 🧾 Fiches (Saisie de Fiche / historique / recherche)
+# ---------------------------------------------------------------------------
+def _images_modeles(rng: random.Random, nb: int = 6) -> list:
+    """Quelques captures PNG distinctes (1600×900), réutilisées comme le ferait l'utilisateur."""
+    from PIL import Image, ImageDraw
+
+    modeles = []
+    for k in range(nb):
+        img = Image.new("RGB", (1600, 900), (rng.randint(0, 60), rng.randint(0, 60), rng.randint(40, 90)))
+        dessin = ImageDraw.Draw(img)
+        y = 450
+        for x in range(0, 1600, 8):
+            y = max(50, min(850, y + rng.randint(-25, 25)))
+            dessin.rectangle([x, y - rng.randint(5, 40), x + 5, y + rng.randint(5, 40)],
+                             fill=(0, 200, 120) if rng.random() < 0.5 else (220, 60, 60))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        modeles.append(buf.getvalue())
+    return modeles
+
+
+def generer_fiches(base: Path, n: int, rng: random.Random, part_captures: float = 0.2,
+                   fin: datetime = None) -> int:
+    """N fiches réparties sur des jours ouvrés (1 à 5 par jour) dans l'arborescence de la saisie."""
+    fin = fin or datetime.now()
+    modeles = _images_modeles(rng) if part_captures > 0 and n else []
+    jours = list(_jours_ouvres(max(1, n // 3), fin))
+    par_jour = {}
+    for _ in range(n):
+        j = rng.choice(jours)
+        par_jour[j] = par_jour.get(j, 0) + 1
+    for jour, nb in par_jour.items():
+        dossier_jour = (base / jour.strftime("%Y") / jour.strftime("%m")
+                        / f"semaine_{jour.strftime('%W')}" / jour.strftime("%d-%m-%Y"))
+        for k in range(1, nb + 1):
+            fiche_dir = dossier_jour / f"fiche_{k}"
+            fiche_dir.mkdir(parents=True, exist_ok=True)
+            data = {
+                "date": jour.strftime("%Y-%m-%d"),
+                "propos": _phrase(rng),
+                "hypothese": _phrase(rng, 4, 20),
+                "procedure": _phrase(rng, 4, 20),
+                "constat": _phrase(rng, 10, 60),
+            }
+            with open(fiche_dir / f"fiche_{k}.json", "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            if modeles and rng.random() < part_captures:
+                (fiche_dir / "capture.png").write_bytes(rng.choice(modeles))
+    return n
+
+
+# ---------------------------------------------------------------------------
+# 🚀 Génération complète
+# ---------------------------------------------------------------------------
+def generer(dest, sessions: int = 1000, fiches: int = 1000, lignes_ceo: int = 24,
+            versions_ceo: int = 0, part_captures: float = 0.2, excel: bool = True, graine: int = 42) -> dict:
+    """Crée le jeu de données complet dans `dest` ; renvoie le manifeste."""
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(graine)
+    debut = time.perf_counter()
+
+    df = generer_sessions(sessions, rng)
+    importer_sessions(df, dest / "sessions")
+    if excel:
+        out = df.assign(Date=df["Date"].dt.strftime("%Y-%m-%d %H:%M:%S"))
+        out.to_excel(dest / "discipline.xlsx", index=False)
+    # Même historique côté Google Sheets (en-tête + lignes, en texte)
+    with open(dest / "sessions_sheets.json", "w", encoding="utf-8") as f:
+        out = df.assign(Date=df["Date"].dt.strftime("%Y-%m-%d %H:%M:%S")).astype(str)
+        json.dump([list(out.columns)] + out.values.tolist(), f, ensure_ascii=False)
+
+    feuilles = generer_classeur_ceo(lignes_ceo, rng)
+    classeur = dest / "suivi_objectifs.xlsx"
+    ecrire_feuilles(str(classeur), feuilles)
+    db = historique.chemin_historique(str(classeur))
+    for v in range(versions_ceo):
+        horodatage = (datetime(2024, 1, 1) + timedelta(days=v)).strftime("%Y-%m-%d %H:%M:%S")
+        for nom in feuilles:
+            feuilles[nom] = _muter(feuilles[nom], rng)
+            historique.enregistrer(db, nom, feuilles[nom], horodatage=horodatage)
+
+    generer_fiches(dest / "data", fiches, rng, part_captures)
+
+    manifeste = {
+        "genere": datetime.now().isoformat(timespec="seconds"),
+        "duree_s": round(time.perf_counter() - debut, 1),
+        "graine": graine,
+        "sessions": sessions,
+        "fiches": fiches,
+        "part_captures": part_captures,
+        "lignes_ceo": lignes_ceo,
+        "versions_ceo": versions_ceo,
+    }
+    with open(dest / "manifest_synthetique.json", "w", encoding="utf-8") as f:
+        json.dump(manifeste, f, ensure_ascii=False, indent=2)
+    return manifeste
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jeu de données synthétique pour le banc d'essai.")
+    parser.add_argument("dest", help="Dossier cible (créé si besoin)")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--fiches", type=int, default=1000)
+    parser.add_argument("--lignes-ceo", type=int, default=24)
+    parser.add_argument("--versions-ceo", type=int, default=0)
+    parser.add_argument("--captures", type=float, default=0.2, help="Part des fiches avec capture (0 à 1)")
+    parser.add_argument("--sans-excel", action="store_true", help="Ne pas écrire discipline.xlsx (gros volumes)")
+    parser.add_argument("--graine", type=int, default=42)
+    args = parser.parse_args()
+    if os.path.abspath(args.dest) == os.path.abspath(os.getcwd()):
+        parser.error("Le dossier cible doit être distinct du dossier de travail réel.")
+    print(generer(args.dest, args.sessions, args.fiches, args.lignes_ceo, args.versions_ceo,
+                  args.captures, not args.sans_excel, args.graine))
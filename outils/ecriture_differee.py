@@ -0,0 +1,172 @@
+"""File d'écriture différée (write-behind) pour les sauvegardes automatiques.
+
+Les modifications sont déposées dans la file et l'appelant reprend la main
+immédiatement. Un thread d'arrière-plan attend que les modifications se
+calment pendant `delai` secondes, fusionne tout ce qui est en attente
+(la dernière version de chaque feuille l'emporte) et écrit le lot en une
+seule fois. La file est vidée à l'arrêt du processus.
+
+Avec `journal` (dossier), chaque version déposée est aussi copiée sur disque
+avant que l'appel ne rende la main, et effacée une fois écrite : après un
+arrêt brutal (TerminateProcess sous Windows, plantage), les versions pas
+encore écrites sont rejouées à la création de la file suivante.
+"""
+import atexit
+import contextvars
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+class FileEcriture:
+    """Regroupe les écritures rapprochées par feuille et les écrit en arrière-plan.
+
+    `ecrire` reçoit un dict {feuille: DataFrame} et renvoie la durée de
+    l'écriture (s).
+    """
+
+    def __init__(self, ecrire, delai: float = 2.0, journal=None):
+        self.delai = delai
+        self._ecrire = ecrire
+        self._journal = Path(journal) if journal else None
+        self._attente = {}
+        self._numeros = {}  # feuille -> numéro de la dernière version déposée
+        self._derniere_modif = 0.0
+        self._cond = threading.Condition()
+        self._verrou_ecriture = threading.Lock()
+
+        self.nb_ecritures = 0
+        self.derniere_ecriture = None
+        self.derniere_duree = None
+        self.derniere_erreur = None
+
+        self._rejouer()
+        # Contexte copié : les étapes du thread sont journalisées sous l'app qui a créé la file
+        self._thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(self._boucle,), name="ecriture-differee", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.vider)
+
+    # -- API ----------------------------------------------------------------
+    def soumettre(self, feuille: str, df):
+        """Dépose la nouvelle version d'une feuille ; rend la main tout de suite."""
+        df = df.copy()
+        with self._cond:
+            numero = self._numeros.get(feuille, 0) + 1
+            self._numeros[feuille] = numero
+            self._journaliser(feuille, numero, df)
+            self._attente[feuille] = df
+            self._derniere_modif = time.monotonic()
+            self._cond.notify()
+
+    def en_attente(self, feuille: str = None):
+        """Version en attente d'une feuille (ou liste des feuilles en attente)."""
+        with self._cond:
+            if feuille is None:
+                return sorted(self._attente)
+            df = self._attente.get(feuille)
+            return None if df is None else df.copy()
+
+    def vider(self):
+        """Écrit immédiatement tout ce qui est en attente (appel bloquant).
+
+        Le lot est pris sous `_verrou_ecriture` : un lot pris plus tôt ne peut
+        pas être écrit après lui et écraser une version plus récente.
+        """
+        with self._verrou_ecriture:
+            with self._cond:
+                lot = self._prendre_lot()
+            return self._ecrire_lot(*lot)
+
+    def etat(self) -> dict:
+        return {
+            "en_attente": self.en_attente(),
+            "nb_ecritures": self.nb_ecritures,
+            "derniere_ecriture": self.derniere_ecriture,
+            "derniere_duree": self.derniere_duree,
+            "derniere_erreur": self.derniere_erreur,
+        }
+
+    # -- Journal sur disque --------------------------------------------------
+    def _fichier(self, feuille: str) -> Path:
+        return self._journal / f"{feuille.encode('utf-8').hex()}.pkl"
+
+    def _journaliser(self, feuille: str, numero: int, df):
+        if self._journal is None:
+            return
+        self._journal.mkdir(parents=True, exist_ok=True)
+        fichier = self._fichier(feuille)
+        tmp = fichier.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((feuille, numero, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, fichier)
+
+    def _effacer(self, numeros: dict):
+        """Efface du journal les versions écrites, sauf si une plus récente a été déposée depuis."""
+        if self._journal is None:
+            return
+        with self._cond:
+            for feuille, numero in numeros.items():
+                if self._numeros.get(feuille) == numero:
+                    try:
+                        self._fichier(feuille).unlink()
+                    except OSError:
+                        pass
+
+    def _rejouer(self):
+        """Remet en file les versions journalisées et jamais écrites (arrêt brutal précédent)."""
+        if self._journal is None or not self._journal.is_dir():
+            return
+        for fichier in sorted(self._journal.glob("*.pkl")):
+            try:
+                with open(fichier, "rb") as f:
+                    feuille, numero, df = pickle.load(f)
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+                continue  # fichier incomplet : la version précédente a déjà été écrite
+            self._attente[feuille] = df
+            self._numeros[feuille] = numero
+
+    # -- Interne ------------------------------------------------------------
+    def _prendre_lot(self):
+        """Vide la file (appelant sous `self._cond`) : lot et numéros des versions prises."""
+        lot, self._attente = self._attente, {}
+        return lot, {feuille: self._numeros.get(feuille) for feuille in lot}
+
+    def _ecrire_lot(self, lot: dict, numeros: dict):
+        """Écrit un lot (appelant sous `self._verrou_ecriture`)."""
+        if not lot:
+            return 0.0
+        try:
+            duree = self._ecrire(lot)
+        except Exception as e:
+            self.derniere_erreur = f"{datetime.now():%H:%M:%S} — {e}"
+            # On remet le lot en file sans écraser une version plus récente
+            with self._cond:
+                for feuille, df in lot.items():
+                    self._attente.setdefault(feuille, df)
+                self._derniere_modif = time.monotonic()
+                self._cond.notify()
+            return None
+        self._effacer(numeros)
+        self.nb_ecritures += 1
+        self.derniere_ecriture = datetime.now()
+        self.derniere_duree = duree
+        self.derniere_erreur = None
+        return duree
+
+    def _boucle(self):
+        while True:
+            with self._cond:
+                while not self._attente:
+                    self._cond.wait()
+                # Debounce : on attend `delai` secondes sans nouvelle modification
+                while True:
+                    reste = self._derniere_modif + self.delai - time.monotonic()
+                    if reste <= 0 or not self._attente:
+                        break
+                    self._cond.wait(timeout=reste)
+            self.vider()
@@ -0,0 +1,202 @@
+"""Historique des feuilles CEO par différences de cellules (remplace les feuilles *_Historique).
+
+Chaque sauvegarde crée une version (horodatage, colonnes, nombre de lignes) et
+n'enregistre que les cellules qui ont changé depuis la version précédente.
+L'état d'une feuille à n'importe quelle date se reconstruit par une requête
+indexée : pour chaque cellule de la version, une recherche dans la clé
+(feuille, ligne, colonne, version) donne sa dernière valeur connue, sans
+parcourir l'historique. Les versions sont ordonnées par `id` (ordre
+d'enregistrement, celui de la chaîne des différences) ; l'horodatage ne
+sert qu'à choisir la version en vigueur à une date.
+
+Stockage : une base SQLite à côté du classeur (`suivi_objectifs_historique.sqlite`).
+"""
+import json
+import math
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+
+import pandas as pd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    feuille     TEXT    NOT NULL,
+    horodatage  TEXT    NOT NULL,
+    colonnes    TEXT    NOT NULL,
+    nb_lignes   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_versions_feuille ON versions (feuille, horodatage);
+-- Clé primaire d'une table WITHOUT ROWID = index (feuille, ligne, colonne, version) :
+-- la dernière valeur d'une cellule à une version est une seule recherche dans l'arbre.
+CREATE TABLE IF NOT EXISTS cellules (
+    feuille  TEXT    NOT NULL,
+    ligne    INTEGER NOT NULL,
+    colonne  TEXT    NOT NULL,
+    version  INTEGER NOT NULL,
+    valeur   TEXT,
+    PRIMARY KEY (feuille, ligne, colonne, version)
+) WITHOUT ROWID;
+"""
+
+
+def chemin_historique(excel_file: str) -> str:
+    """Base d'historique associée à un classeur."""
+    return os.path.splitext(excel_file)[0] + "_historique.sqlite"
+
+
+def _connexion(db: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _encoder(v) -> str:
+    """Valeur de cellule -> JSON (None pour les cellules vides)."""
+    if v is None or (isinstance(v, float) and math.isnan(v)) or v is pd.NaT:
+        return json.dumps(None)
+    if hasattr(v, "item"):  # types NumPy
+        v = v.item()
+        if isinstance(v, float) and math.isnan(v):
+            return json.dumps(None)
+    if isinstance(v, (datetime, date, pd.Timestamp)):
+        v = v.isoformat()
+    return json.dumps(v, ensure_ascii=False)
+
+
+def _cellules(df: pd.DataFrame) -> dict:
+    """{(ligne, colonne): valeur encodée} pour tout le tableau."""
+    out = {}
+    for col in df.columns:
+        for i, v in enumerate(df[col].tolist()):
+            out[(i, str(col))] = _encoder(v)
+    return out
+
+
+def _version_a(conn, feuille: str, quand: str = None):
+    sql = "SELECT id, horodatage, colonnes, nb_lignes FROM versions WHERE feuille = ?"
+    params = [feuille]
+    if quand is not None:
+        sql += " AND horodatage <= ?"
+        params.append(quand)
+    sql += " ORDER BY id DESC LIMIT 1"
+    return conn.execute(sql, params).fetchone()
+
+
+def _etat_brut(conn, feuille: str, version: int, colonnes: list, nb_lignes: int) -> dict:
+    # Pour chaque cellule (ligne × colonne) de la version : dernière valeur par une
+    # recherche dans la clé primaire — O(cellules × log historique)
+    rows = conn.execute(
+        """
+        WITH RECURSIVE lignes(ligne) AS (
+            SELECT 0 WHERE ? > 0
+            UNION ALL SELECT ligne + 1 FROM lignes WHERE ligne + 1 < ?
+        ),
+        colonnes(colonne) AS (SELECT value FROM json_each(?))
+        SELECT ligne, colonne, (
+            SELECT valeur FROM cellules AS c
+            WHERE c.feuille = ? AND c.ligne = lignes.ligne AND c.colonne = colonnes.colonne AND c.version <= ?
+            ORDER BY c.version DESC LIMIT 1
+        ) AS valeur
+        FROM lignes, colonnes
+        """,
+        (nb_lignes, nb_lignes, json.dumps(colonnes, ensure_ascii=False), feuille, version),
+    ).fetchall()
+    return {(ligne, col): val for ligne, col, val in rows if val is not None}
+
+
+# ---------------------------------------------------------------------------
+# ✍️ Écriture
+# ---------------------------------------------------------------------------
+def enregistrer(db: str, feuille: str, df: pd.DataFrame, horodatage: str = None) -> int:
+    """Historise `df` : crée une version et n'écrit que les cellules modifiées.
+
+    Renvoie le nombre de cellules écrites (0 si rien n'a changé : aucune
+    version n'est alors créée).
+    """
+    horodatage = horodatage or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    colonnes = [str(c) for c in df.columns]
+    nouvelles = _cellules(df)
+
+    with closing(_connexion(db)) as conn, conn:
+        precedente = _version_a(conn, feuille)
+        if precedente:
+            vid, _, cols_prec, nb_prec = precedente
+            anciennes = _etat_brut(conn, feuille, vid, json.loads(cols_prec), nb_prec)
+            meme_forme = json.loads(cols_prec) == colonnes and nb_prec == len(df)
+        else:
+            anciennes, meme_forme = {}, False
+
+        modifiees = {k: v for k, v in nouvelles.items() if k not in anciennes or anciennes[k] != v}
+        if meme_forme and not modifiees:
+            return 0
+
+        cur = conn.execute(
+            "INSERT INTO versions (feuille, horodatage, colonnes, nb_lignes) VALUES (?, ?, ?, ?)",
+            (feuille, horodatage, json.dumps(colonnes, ensure_ascii=False), len(df)),
+        )
+        conn.executemany(
+            "INSERT INTO cellules (feuille, ligne, colonne, version, valeur) VALUES (?, ?, ?, ?, ?)",
+            [(feuille, ligne, col, cur.lastrowid, val) for (ligne, col), val in modifiees.items()],
+        )
+    return len(modifiees)
+
+
+def importer_snapshots(db: str, feuille: str, hist: pd.DataFrame, colonne_temps: str = "Horodatage") -> int:
+    """Reprend une ancienne feuille `*_Historique` (copies complètes horodatées)."""
+    if colonne_temps not in hist.columns:
+        return 0
+    n = 0
+    for horodatage, bloc in hist.groupby(colonne_temps, sort=True):
+        snapshot = bloc.drop(columns=[colonne_temps]).reset_index(drop=True)
+        enregistrer(db, feuille, snapshot, horodatage=str(horodatage))
+        n += 1
+    return n
+
+
+# ---------------------------------------------------------------------------
+# 🕰️ Lecture
+# ---------------------------------------------------------------------------
+def a_un_historique(db: str, feuille: str) -> bool:
+    if not os.path.exists(db):
+        return False
+    with closing(_connexion(db)) as conn:
+        return _version_a(conn, feuille) is not None
+
+
+def horodatages(db: str, feuille: str) -> list:
+    """Horodatages des versions enregistrées, du plus ancien au plus récent."""
+    if not os.path.exists(db):
+        return []
+    with closing(_connexion(db)) as conn:
+        rows = conn.execute(
+            "SELECT horodatage FROM versions WHERE feuille = ? ORDER BY id", (feuille,)
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+def etat_a(db: str, feuille: str, quand=None):
+    """Reconstruit la feuille telle qu'elle était à `quand` (None = dernière version).
+
+    Renvoie (horodatage de la version utilisée, DataFrame), ou (None, None)
+    si aucune version n'existe à cette date.
+    """
+    if isinstance(quand, (datetime, pd.Timestamp)):
+        quand = quand.strftime("%Y-%m-%d %H:%M:%S")
+    if not os.path.exists(db):
+        return None, None
+    with closing(_connexion(db)) as conn:
+        version = _version_a(conn, feuille, quand)
+        if version is None:
+            return None, None
+        vid, horodatage, colonnes, nb_lignes = version
+        colonnes = json.loads(colonnes)
+        cellules = _etat_brut(conn, feuille, vid, colonnes, nb_lignes)
+
+    data = {col: [None] * nb_lignes for col in colonnes}
+    for (ligne, col), val in cellules.items():
+        data[col][ligne] = json.loads(val)
+    return horodatage, pd.DataFrame(data, columns=colonnes)
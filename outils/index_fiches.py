@@ -0,0 +1,186 @@
+"""Index persistant des fiches de trading par date.
+
+`data/index_fiches.json` associe chaque dossier jour (`2025/10/semaine_43/27-10-2025`)
+à sa signature et à ses fiches (date déclarée dans le JSON + nom du dossier).
+Une recherche par date est une dichotomie sur la liste triée des dates.
+
+La signature d'un jour est le plus grand mtime entre le dossier jour et les
+JSON de ses fiches : une fiche ajoutée, supprimée ou réécrite sur place la
+change.
+
+Auto-réparation : à chaque actualisation, seuls les dossiers jour nouveaux ou
+dont la signature a changé sont relus (en parallèle) ; les dossiers disparus
+sont retirés. Un index absent ou illisible est donc reconstruit entièrement.
+Le parcours n'est refait qu'une fois par `ACTUALISATION_MIN_S` ; entre deux,
+seul le mtime de `index_fiches.json` est consulté pour reprendre les fiches
+ajoutées par la saisie (autre instance, même fichier).
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+INDEX_FILE = "index_fiches.json"
+ACTUALISATION_MIN_S = 60  # intervalle minimal entre deux parcours de data/
+FORMATS_DATE = ["%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y"]
+
+
+def parser_date(valeur) -> date:
+    """Date d'une fiche, tolérante sur le format ; None si illisible."""
+    texte = str(valeur or "").strip()
+    for fmt in FORMATS_DATE:
+        try:
+            return datetime.strptime(texte, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _lire_jour(dossier_jour: Path) -> list:
+    """[(date ISO, nom du dossier fiche)] pour toutes les fiches d'un dossier jour."""
+    fiches = []
+    for fiche_dir in dossier_jour.iterdir():
+        if not fiche_dir.is_dir():
+            continue
+        fiche_json = next(fiche_dir.glob("*.json"), None)
+        if fiche_json is None:
+            continue
+        try:
+            with open(fiche_json, "r", encoding="utf-8") as f:
+                jour = parser_date(json.load(f).get("date"))
+        except Exception:
+            continue
+        if jour is not None:
+            fiches.append([jour.isoformat(), fiche_dir.name])
+    return fiches
+
+
+def _signature(dossier_jour: Path) -> int:
+    """Plus grand mtime (ns) entre le dossier jour et les JSON de ses fiches."""
+    signature = dossier_jour.stat().st_mtime_ns
+    for fiche_json in dossier_jour.glob("*/*.json"):
+        try:
+            signature = max(signature, fiche_json.stat().st_mtime_ns)
+        except OSError:
+            continue  # fiche supprimée pendant le parcours
+    return signature
+
+
+class IndexFiches:
+    """Index date -> dossiers de fiches, persistant et auto-réparé."""
+
+    def __init__(self, base="data", workers: int = 8):
+        self.base = Path(base)
+        self.chemin = self.base / INDEX_FILE
+        self.workers = workers
+        self._jours = {}
+        self._cles = []
+        self._charge = False
+        self._mtime_fichier = None  # mtime de index_fiches.json lu ou écrit par cette instance
+        self._dernier_parcours = None  # time.monotonic() du dernier parcours complet
+        self._verrou = threading.Lock()
+
+    # -- Persistance --------------------------------------------------------
+    def _lire(self):
+        try:
+            with open(self.chemin, "r", encoding="utf-8") as f:
+                self._jours = json.load(f).get("jours", {})
+        except Exception:
+            self._jours = {}  # Absent ou corrompu : tout sera réindexé
+        self._mtime_fichier = self._mtime_index()
+        self._charge = True
+
+    def _mtime_index(self):
+        try:
+            return self.chemin.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _sauver(self):
+        self.base.mkdir(parents=True, exist_ok=True)
+        tmp = self.chemin.with_name(f".{INDEX_FILE}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"jours": self._jours}, f, ensure_ascii=False)
+        os.replace(tmp, self.chemin)
+        self._mtime_fichier = self._mtime_index()
+
+    def _trier(self):
+        self._cles = sorted(
+            (jour_iso, f"{dossier}/{nom}")
+            for dossier, entree in self._jours.items()
+            for jour_iso, nom in entree["fiches"]
+        )
+
+    # -- API ----------------------------------------------------------------
+    def charger(self) -> "IndexFiches":
+        with self._verrou:
+            self._lire()
+        return self.actualiser()
+
+    def actualiser(self, intervalle_s: float = 0.0) -> "IndexFiches":
+        """Relit uniquement les dossiers jour nouveaux, modifiés ou supprimés.
+
+        Avec `intervalle_s`, le parcours est sauté s'il a eu lieu il y a moins
+        de `intervalle_s` secondes ; l'index est alors seulement rechargé si
+        `index_fiches.json` a été réécrit par une autre instance.
+        """
+        maintenant = time.monotonic()
+        with self._verrou:
+            if self._dernier_parcours is not None and maintenant - self._dernier_parcours < intervalle_s:
+                if self._mtime_index() != self._mtime_fichier:
+                    self._lire()
+                    self._trier()
+                return self
+            self._dernier_parcours = maintenant
+
+            presents = {}
+            if self.base.exists():
+                for dossier in self.base.glob("*/*/*/*"):
+                    if dossier.is_dir():
+                        presents[dossier.relative_to(self.base).as_posix()] = _signature(dossier)
+
+            supprimes = [d for d in self._jours if d not in presents]
+            perimes = [d for d, mtime in presents.items() if self._jours.get(d, {}).get("mtime_ns") != mtime]
+            if not supprimes and not perimes:
+                if not self._cles and self._jours:
+                    self._trier()
+                return self
+
+            for d in supprimes:
+                del self._jours[d]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                resultats = pool.map(lambda d: _lire_jour(self.base / d), perimes)
+                for d, fiches in zip(perimes, resultats):
+                    self._jours[d] = {"mtime_ns": presents[d], "fiches": fiches}
+            self._sauver()
+            self._trier()
+        return self
+
+    def ajouter(self, fiche_dir):
+        """Indexe une fiche qui vient d'être sauvegardée (appelé par la saisie).
+
+        Le dossier jour entier est relu : il ne contient que quelques fiches.
+        """
+        dossier_jour = Path(fiche_dir).parent
+        cle = dossier_jour.relative_to(self.base).as_posix()
+        with self._verrou:
+            if not self._charge:
+                self._lire()
+            self._jours[cle] = {"mtime_ns": _signature(dossier_jour), "fiches": _lire_jour(dossier_jour)}
+            self._sauver()
+            self._trier()
+
+    def chercher(self, jour: date) -> list:
+        """Dossiers des fiches déclarées à cette date (recherche dichotomique)."""
+        cle = jour.isoformat()
+        with self._verrou:
+            debut = bisect_left(self._cles, (cle, ""))
+            fin = bisect_right(self._cles, (cle, "\uffff"))
+            return [self.base / chemin for _, chemin in self._cles[debut:fin]]
+
+    def __len__(self):
+        return len(self._cles)
@@ -0,0 +1,295 @@
+"""Indicateurs de performance des sessions de trading.
+
+Sur la série des `Montant` (P&L par session, ordre chronologique) et des
+`Valeur` (+1 plan respecté / -1 non respecté) :
+
+- courbe de capital, drawdown courant et maximal (€ et % du plus haut) ;
+- taux de réussite, gain / perte moyens, espérance, profit factor ;
+- ratios de type Sharpe / Sortino (par session, annualisés sur 252 jours) ;
+- séries de gains, de pertes et de respect du plan (en cours et record) ;
+- fenêtres glissantes sur les N dernières sessions.
+
+Tout est vectorisé (NumPy, sommes cumulées) : `calculer` traite un million
+de sessions en une centaine de millisecondes. `MetriquesSessions`
+garde en plus l'état cumulé de tout l'historique et le met à jour en O(1)
+à chaque session ajoutée, sur le modèle de `outils.cube_sessions` (même
+gestion de la version du stockage).
+
+Tests (calcul complet, ajouts incrémentaux, versions du stockage) :
+    python -m pytest tests/test_metriques.py
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+JOURS_PAR_AN = 252
+CAPITAL_REFERENCE = 100_000.0  # compte prop 100k, base du drawdown en % (cf. CEO « R cible/mois »)
+
+
+# ---------------------------------------------------------------------------
+# 🧮 Calculs vectorisés
+# ---------------------------------------------------------------------------
+def _tableau(x) -> np.ndarray:
+    return np.asarray(x, dtype="float64")
+
+
+def courbe_capital(montants, capital: float = 0.0) -> np.ndarray:
+    """Capital après chaque session."""
+    return capital + np.cumsum(_tableau(montants))
+
+
+def drawdown(equite, capital: float = 0.0):
+    """Drawdown courant après chaque session : (en €, en fraction du plus haut).
+
+    Le plus haut inclut le capital de départ ; la fraction vaut NaN tant que
+    ce plus haut n'est pas positif.
+    """
+    equite = _tableau(equite)
+    pic = np.maximum.accumulate(np.maximum(equite, capital))
+    dd = pic - equite
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return dd, np.where(pic > 0, dd / pic, np.nan)
+
+
+def series(drapeaux):
+    """(série en cours, plus longue série) de valeurs vraies consécutives."""
+    x = np.asarray(drapeaux, dtype=bool)
+    bords = np.diff(np.concatenate(([0], x.view(np.int8), [0])))
+    debuts, fins = np.flatnonzero(bords == 1), np.flatnonzero(bords == -1)
+    if not debuts.size:
+        return 0, 0
+    longueurs = fins - debuts
+    return (int(longueurs[-1]) if x[-1] else 0), int(longueurs.max())
+
+
+def _etat(montants, valeurs=None, capital: float = 0.0) -> dict:
+    """Accumulateurs de toute la série (mêmes champs que l'état incrémental)."""
+    m = _tableau(montants)
+    v = np.zeros(m.size) if valeurs is None else _tableau(valeurs)
+    gains, pertes = m[m > 0], m[m < 0]
+    equite = courbe_capital(m, capital)
+    dd, dd_pct = drawdown(equite, capital)
+    etat = {
+        "n": m.size, "somme": m.sum(), "somme_carres": (m * m).sum(),
+        "somme_carres_negatifs": (pertes * pertes).sum(),
+        "n_gains": gains.size, "somme_gains": gains.sum(),
+        "n_pertes": pertes.size, "somme_pertes": pertes.sum(),
+        "n_respect": int((v > 0).sum()), "n_notes": int((v != 0).sum()),
+        "capital": capital,
+        "equite": equite[-1] if m.size else capital,
+        "pic": max(capital, equite.max()) if m.size else capital,
+        "dd_max": dd.max() if m.size else 0.0,
+        "dd_max_pct": np.nanmax(dd_pct) if m.size and not np.isnan(dd_pct).all() else 0.0,
+    }
+    for nom, drapeaux in (("gains", m > 0), ("pertes", m < 0), ("respect", v > 0)):
+        etat[f"serie_{nom}"], etat[f"serie_{nom}_max"] = series(drapeaux)
+    return etat
+
+
+def _indicateurs(etat: dict) -> dict:
+    """Indicateurs lisibles à partir des accumulateurs."""
+    n = etat["n"]
+    moyenne = etat["somme"] / n if n else float("nan")
+    ecart_type = np.sqrt(max(etat["somme_carres"] / n - moyenne ** 2, 0.0)) if n else float("nan")
+    baisse = np.sqrt(etat["somme_carres_negatifs"] / n) if n else float("nan")
+    pertes = -etat["somme_pertes"]
+    dd = etat["pic"] - etat["equite"]
+    return {
+        "sessions": n,
+        "pnl": etat["somme"],
+        "capital": etat["equite"],
+        "win_rate": etat["n_gains"] / n if n else float("nan"),
+        "gain_moyen": etat["somme_gains"] / etat["n_gains"] if etat["n_gains"] else float("nan"),
+        "perte_moyenne": etat["somme_pertes"] / etat["n_pertes"] if etat["n_pertes"] else float("nan"),
+        "esperance": moyenne,
+        "profit_factor": etat["somme_gains"] / pertes if pertes else (float("inf") if etat["somme_gains"] else float("nan")),
+        "sharpe": moyenne / ecart_type * np.sqrt(JOURS_PAR_AN) if n and ecart_type > 0 else float("nan"),
+        "sortino": moyenne / baisse * np.sqrt(JOURS_PAR_AN) if n and baisse > 0 else float("nan"),
+        "drawdown": dd,
+        "drawdown_pct": dd / etat["pic"] if etat["pic"] > 0 else float("nan"),
+        "drawdown_max": etat["dd_max"],
+        "drawdown_max_pct": etat["dd_max_pct"],
+        "discipline": etat["n_respect"] / etat["n_notes"] if etat["n_notes"] else float("nan"),
+        **{f"serie_{nom}": etat[f"serie_{nom}"] for nom in ("gains", "pertes", "respect")},
+        **{f"serie_{nom}_max": etat[f"serie_{nom}_max"] for nom in ("gains", "pertes", "respect")},
+    }
+
+
+def calculer(montants, valeurs=None, capital: float = CAPITAL_REFERENCE) -> dict:
+    """Tous les indicateurs d'une série de sessions (ordre chronologique)."""
+    return _indicateurs(_etat(montants, valeurs, capital))
+
+
+def glissant(montants, fenetre: int, index=None) -> pd.DataFrame:
+    """Indicateurs sur les `fenetre` dernières sessions, pour chaque session.
+
+    Différences de sommes cumulées : O(n) quelle que soit la fenêtre. Les
+    `fenetre - 1` premières lignes valent NaN.
+    """
+    m = _tableau(montants)
+    n = m.size
+
+    def somme_glissante(x):
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        sortie = np.full(n, np.nan)
+        if n >= fenetre:
+            sortie[fenetre - 1:] = c[fenetre:] - c[:-fenetre]
+        return sortie
+
+    somme = somme_glissante(m)
+    moyenne = somme / fenetre
+    variance = np.clip(somme_glissante(m * m) / fenetre - moyenne ** 2, 0, None)
+    gains, pertes = somme_glissante(np.where(m > 0, m, 0.0)), -somme_glissante(np.where(m < 0, m, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame({
+            "pnl": somme,
+            "win_rate": somme_glissante((m > 0).astype("float64")) / fenetre,
+            "esperance": moyenne,
+            "profit_factor": gains / pertes,
+            "sharpe": moyenne / np.sqrt(variance) * np.sqrt(JOURS_PAR_AN),
+        }, index=index)
+
+
+def derniere_par_jour(dates) -> np.ndarray:
+    """Indices de la dernière session de chaque jour (dates triées) : courbes allégées."""
+    jours = np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]")
+    return np.flatnonzero(np.concatenate((jours[1:] != jours[:-1], [True]))) if jours.size else np.array([], dtype=int)
+
+
+# ---------------------------------------------------------------------------
+# 📈 État incrémental de l'historique complet
+# ---------------------------------------------------------------------------
+class MetriquesSessions:
+    """Séries des sessions et indicateurs cumulés, mis à jour session par session."""
+
+    def __init__(self, capital: float = CAPITAL_REFERENCE):
+        self.capital = capital
+        self._dates = np.empty(0, dtype="datetime64[ns]")
+        self._montants = np.empty(0, dtype="float64")
+        self._valeurs = np.empty(0, dtype="float64")
+        self._n = 0
+        self._etat = _etat([], capital=capital)
+        self._verrou = threading.Lock()
+        self.version = None
+
+    # -- Construction -------------------------------------------------------
+    def reconstruire(self, df: pd.DataFrame, version=None):
+        """Remplace les séries par celles de `df` (sessions typées), triées par date."""
+        df = df.dropna(subset=["Date"]).sort_values("Date", kind="stable")
+        dates = df["Date"].to_numpy(dtype="datetime64[ns]")
+        montants = df["Montant"].to_numpy(dtype="float64")
+        valeurs = df["Valeur"].to_numpy(dtype="float64")
+        etat = _etat(montants, valeurs, self.capital)
+        with self._verrou:
+            self._dates, self._montants, self._valeurs = dates, montants, valeurs
+            self._n, self._etat, self.version = len(dates), etat, version
+
+    def _agrandir(self):
+        capacite = max(1024, 2 * self._n)
+        for nom in ("_dates", "_montants", "_valeurs"):
+            ancien = getattr(self, nom)
+            nouveau = np.empty(capacite, dtype=ancien.dtype)
+            nouveau[:self._n] = ancien[:self._n]
+            setattr(self, nom, nouveau)
+
+    def ajouter(self, entree: dict, version_avant=None, version_apres=None):
+        """Ajoute une session (O(1) amorti) à l'état qui reflétait `version_avant`.
+
+        Il reflète alors `version_apres`. Rien n'est ajouté, et l'état est
+        marqué périmé (reconstruit à la prochaine lecture), si l'état reflète
+        une autre version (reconstruit entre-temps par une autre session,
+        peut-être déjà avec cette ligne) ou si la session est antérieure à la
+        dernière connue (ordre chronologique cassé).
+        """
+        quand = np.datetime64(pd.Timestamp(entree["Date"]).to_datetime64(), "ns")
+        montant = float(pd.to_numeric(entree.get("Montant"), errors="coerce") or 0.0)
+        valeur = float(pd.to_numeric(entree.get("Valeur"), errors="coerce") or 0.0)
+        with self._verrou:
+            if self.version != version_avant or (self._n and quand < self._dates[self._n - 1]):
+                self.version = None
+                return
+            if self._n == len(self._dates):
+                self._agrandir()
+            self._dates[self._n], self._montants[self._n], self._valeurs[self._n] = quand, montant, valeur
+            self._n += 1
+
+            e = self._etat
+            e["n"] += 1
+            e["somme"] += montant
+            e["somme_carres"] += montant * montant
+            if montant > 0:
+                e["n_gains"] += 1
+                e["somme_gains"] += montant
+            elif montant < 0:
+                e["n_pertes"] += 1
+                e["somme_pertes"] += montant
+                e["somme_carres_negatifs"] += montant * montant
+            e["n_respect"] += valeur > 0
+            e["n_notes"] += valeur != 0
+            e["equite"] += montant
+            e["pic"] = max(e["pic"], e["equite"])
+            dd = e["pic"] - e["equite"]
+            e["dd_max"] = max(e["dd_max"], dd)
+            if e["pic"] > 0:
+                e["dd_max_pct"] = max(e["dd_max_pct"], dd / e["pic"])
+            for nom, vrai in (("gains", montant > 0), ("pertes", montant < 0), ("respect", valeur > 0)):
+                e[f"serie_{nom}"] = e[f"serie_{nom}"] + 1 if vrai else 0
+                e[f"serie_{nom}_max"] = max(e[f"serie_{nom}_max"], e[f"serie_{nom}"])
+            self.version = version_apres
+
+    def __len__(self):
+        return self._n
+
+    # -- Requêtes -----------------------------------------------------------
+    def resume(self) -> dict:
+        """Indicateurs de tout l'historique, sans recalcul."""
+        with self._verrou:
+            return _indicateurs(dict(self._etat))
+
+    def _masque(self, annee=None, mois=None, debut=None, fin=None):
+        dates = self._dates[:self._n]
+        masque = np.ones(self._n, dtype=bool)
+        if annee is not None:
+            masque &= dates.astype("datetime64[Y]").astype(int) + 1970 == int(annee)
+        if mois is not None:
+            masque &= dates.astype("datetime64[M]").astype(int) % 12 + 1 == int(mois)
+        jours = dates.astype("datetime64[D]")
+        if debut is not None:
+            masque &= jours >= np.datetime64(debut, "D")
+        if fin is not None:
+            masque &= jours <= np.datetime64(fin, "D")
+        return masque
+
+    def selection(self, **filtres):
+        """(dates, montants, valeurs, capital de départ) des sessions filtrées.
+
+        Filtres : `annee`, `mois`, `debut`, `fin` (comme `CubeSessions.agreger`).
+        Le capital de départ ajoute au capital de référence le P&L des
+        sessions antérieures à la première sélectionnée.
+        """
+        with self._verrou:
+            return self._extraire(self._masque(**filtres))
+
+    def _extraire(self, masque):
+        indices = np.flatnonzero(masque)
+        depart = self.capital + (self._montants[:indices[0]].sum() if indices.size else 0.0)
+        return self._dates[indices], self._montants[indices], self._valeurs[indices], depart
+
+    def calculer(self, **filtres) -> dict:
+        """Indicateurs des sessions filtrées ; si le filtre garde tout, état incrémental sans recalcul."""
+        with self._verrou:
+            masque = self._masque(**filtres)
+            if masque.all():
+                return _indicateurs(dict(self._etat))
+            _, montants, valeurs, depart = self._extraire(masque)
+        return calculer(montants, valeurs, depart)
+
+    def depuis(self, jours: int) -> dict:
+        """Indicateurs des `jours` derniers jours (ex. drawdown 12 mois : `depuis(365)`)."""
+        with self._verrou:
+            fin = self._dates[self._n - 1] if self._n else None
+        if fin is None:
+            return calculer([])
+        return self.calculer(debut=(fin - np.timedelta64(jours, "D")).astype("datetime64[D]").item())
+
@@ -0,0 +1,105 @@
+"""Miniatures et aperçus WebP des captures d'écran, en cache disque par contenu.
+
+Chaque image est décodée une seule fois pour produire toutes ses déclinaisons
+(`miniature` pour les listes de fiches, `apercu` pour l'affichage d'une
+fiche), enregistrées en WebP sous `.miniatures/<hash[:2]>/` avec pour nom le
+SHA-256 du fichier d'origine : une capture copiée ou renommée réutilise les
+mêmes fichiers. Les pages affichent miniature ou aperçu et ne chargent
+l'original qu'à la demande.
+
+Rattrapage des captures existantes (tous les cœurs) :
+    python -m outils.miniatures data captures
+"""
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / ".miniatures"
+LARGEURS = {"miniature": 320, "apercu": 1024}
+QUALITE_WEBP = 80
+EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+# (chemin, mtime_ns, taille) -> SHA-256 : évite de relire l'original à chaque rerun
+_empreintes = {}
+
+
+def empreinte(chemin) -> str:
+    """SHA-256 du contenu du fichier (mémorisé tant que le fichier ne change pas)."""
+    chemin = Path(chemin)
+    st = chemin.stat()
+    cle = (str(chemin.resolve()), st.st_mtime_ns, st.st_size)
+    if cle not in _empreintes:
+        h = hashlib.sha256()
+        with open(chemin, "rb") as f:
+            for bloc in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloc)
+        _empreintes[cle] = h.hexdigest()
+    return _empreintes[cle]
+
+
+def _chemin_rendu(hash_: str, largeur: int, cache: Path) -> Path:
+    return Path(cache) / hash_[:2] / f"{hash_}_{largeur}.webp"
+
+
+def generer(chemin, cache=CACHE_DIR) -> int:
+    """Crée les déclinaisons manquantes d'une image ; renvoie le nombre créé."""
+    hash_ = empreinte(chemin)
+    manquantes = [l for l in LARGEURS.values() if not _chemin_rendu(hash_, l, cache).exists()]
+    if not manquantes:
+        return 0
+
+    from PIL import Image  # import différé : inutile quand l'aperçu est déjà en cache
+
+    with Image.open(chemin) as img:
+        img.load()
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        for largeur in sorted(manquantes, reverse=True):
+            rendu = img.copy()
+            rendu.thumbnail((largeur, largeur * 10))  # jamais d'agrandissement
+            cible = _chemin_rendu(hash_, largeur, cache)
+            cible.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cible.with_name(f".{cible.name}.{os.getpid()}.tmp")
+            rendu.save(tmp, format="WEBP", quality=QUALITE_WEBP, method=4)
+            os.replace(tmp, cible)
+    return len(manquantes)
+
+
+def rendu(chemin, taille: str = "apercu", cache=CACHE_DIR) -> Path:
+    """Chemin de la déclinaison WebP demandée (générée au premier appel).
+
+    Si l'image ne peut pas être décodée, renvoie l'original.
+    """
+    cible = _chemin_rendu(empreinte(chemin), LARGEURS[taille], cache)
+    if not cible.exists():
+        try:
+            generer(chemin, cache)
+        except Exception:
+            return Path(chemin)
+    return cible
+
+
+def _generer_silencieux(args):
+    chemin, cache = args
+    try:
+        return generer(chemin, cache)
+    except Exception:
+        return 0
+
+
+def rattraper(racines, cache=CACHE_DIR, workers: int = None) -> dict:
+    """Génère les déclinaisons de toutes les images sous `racines` (multi-processus)."""
+    images = [
+        p for racine in racines if Path(racine).exists()
+        for p in Path(racine).rglob("*") if p.suffix.lower() in EXTENSIONS and p.is_file()
+    ]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        crees = list(pool.map(_generer_silencieux, [(p, cache) for p in images], chunksize=4))
+    return {"images": len(images), "rendus_crees": sum(crees)}
+
+
+if __name__ == "__main__":
+    racines = sys.argv[1:] or ["data", "captures"]
+    print(rattraper(racines))
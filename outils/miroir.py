@@ -0,0 +1,157 @@
+"""Miroir en colonnes des classeurs Excel (lecture rapide, xlsx toujours source).
+
+À côté de chaque classeur, un dossier caché `.miroir_<nom>/` garde une copie
+de chaque feuille au format Feather (Arrow, non compressé) et un manifeste
+qui note la version du xlsx copiée (date de modification, taille) :
+
+- tant que le xlsx n'a pas changé, les feuilles sont relues depuis le
+  miroir par mappage mémoire (quelques millisecondes, pas d'openpyxl) ;
+- dès que le xlsx change — écriture par l'application ou enregistrement
+  dans Excel — la version ne correspond plus : le classeur est réanalysé
+  et le miroir régénéré.
+
+Une feuille qu'Arrow ne sait pas représenter fidèlement (colonne aux types
+mélangés, en-têtes non textuels) est gardée en pickle pandas : le contenu
+relu est toujours identique à `pd.read_excel(..., sheet_name=None)`.
+
+Mesure (temps xlsx vs miroir) ; les contrôles sont dans tests/test_miroir.py :
+    python -m outils.miroir suivi_objectifs.xlsx
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from outils import profilage
+
+MANIFESTE = "manifeste.json"
+
+
+def dossier_miroir(chemin) -> Path:
+    chemin = Path(chemin).resolve()
+    return chemin.parent / f".miroir_{chemin.stem}"
+
+
+def version_fichier(chemin):
+    etat = os.stat(chemin)
+    return [etat.st_mtime_ns, etat.st_size]
+
+
+def lire_miroir(chemin, version=None):
+    """Feuilles `{nom: DataFrame}` du miroir, ou None s'il est absent ou périmé."""
+    import pyarrow.feather as feather
+
+    dossier = dossier_miroir(chemin)
+    try:
+        with open(dossier / MANIFESTE, "r", encoding="utf-8") as f:
+            manifeste = json.load(f)
+        if manifeste["version"] != (version or version_fichier(chemin)):
+            return None
+        feuilles = {}
+        for feuille in manifeste["feuilles"]:
+            fichier = dossier / feuille["fichier"]
+            if feuille["format"] == "feather":
+                feuilles[feuille["nom"]] = feather.read_table(fichier, memory_map=True).to_pandas()
+            else:
+                with open(fichier, "rb") as f:
+                    feuilles[feuille["nom"]] = pickle.load(f)
+        return feuilles
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+        return None  # miroir absent, incomplet ou en cours de remplacement
+
+
+def _ecrire_feather(df: pd.DataFrame, fichier: Path) -> bool:
+    """Écrit la feuille en Feather si la relecture est identique ; False sinon."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    if not all(isinstance(c, str) for c in df.columns) or not isinstance(df.index, pd.RangeIndex):
+        return False
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        return False  # types mélangés dans une colonne
+    if not table.to_pandas().equals(df):
+        return False
+    feather.write_feather(table, fichier, compression="uncompressed")  # non compressé : mappage mémoire direct
+    return True
+
+
+def ecrire_miroir(chemin, feuilles: dict, version):
+    """Remplace le miroir par `feuilles`, copie du xlsx à `version`.
+
+    Fichiers nommés par version, puis manifeste remplacé atomiquement : un
+    lecteur voit l'ancien miroir complet ou le nouveau, jamais un mélange.
+    """
+    dossier = dossier_miroir(chemin)
+    dossier.mkdir(exist_ok=True)
+    prefixe = f"{version[0]}_{version[1]}"
+    entrees = []
+    for i, (nom, df) in enumerate(feuilles.items()):
+        fichier = f"{prefixe}_{i:03d}.feather"
+        if _ecrire_feather(df, dossier / fichier):
+            entrees.append({"nom": nom, "fichier": fichier, "format": "feather"})
+        else:
+            fichier = f"{prefixe}_{i:03d}.pkl"
+            with open(dossier / fichier, "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            entrees.append({"nom": nom, "fichier": fichier, "format": "pickle"})
+
+    tmp = dossier / f"{MANIFESTE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"source": Path(chemin).name, "version": list(version), "feuilles": entrees},
+                  f, ensure_ascii=False, indent=2)
+    os.replace(tmp, dossier / MANIFESTE)
+
+    gardes = {e["fichier"] for e in entrees} | {MANIFESTE}
+    for ancien in dossier.iterdir():
+        if ancien.name not in gardes and not ancien.name.endswith(".tmp"):
+            try:
+                ancien.unlink()
+            except OSError:
+                pass  # encore mappé par un lecteur (Windows) : supprimé au prochain passage
+
+
+def lire(chemin) -> dict:
+    """Toutes les feuilles : depuis le miroir s'il est à jour, sinon depuis le xlsx (miroir régénéré)."""
+    version = version_fichier(chemin)
+    with profilage.span("miroir · lecture Feather"):
+        feuilles = lire_miroir(chemin, version)
+    if feuilles is not None:
+        return feuilles
+    with profilage.span("pd.read_excel · classeur complet"):
+        feuilles = pd.read_excel(chemin, sheet_name=None)
+    try:
+        with profilage.span("miroir · régénération"):
+            ecrire_miroir(chemin, feuilles, version)
+    except OSError:
+        pass  # dossier non inscriptible : lecture directe à chaque fois
+    return feuilles
+
+
+# ---------------------------------------------------------------------------
+# ⏱️ Mesure
+# ---------------------------------------------------------------------------
+def _mesurer(chemin: str, repetitions: int = 5):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        feuilles = pd.read_excel(chemin, sheet_name=None)
+    xlsx = (time.perf_counter() - debut) / repetitions
+    ecrire_miroir(chemin, feuilles, version_fichier(chemin))
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        lire_miroir(chemin)
+    miroir = (time.perf_counter() - debut) / repetitions
+    print(f"{chemin} — {len(feuilles)} feuille(s) : xlsx {1000 * xlsx:.0f} ms, miroir {1000 * miroir:.1f} ms "
+          f"(×{xlsx / miroir:.0f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Miroir Feather des classeurs Excel.")
+    parser.add_argument("classeur", help="Classeur à mesurer")
+    args = parser.parse_args()
+    _mesurer(args.classeur)
@@ -0,0 +1,252 @@
+"""Chronométrage léger des points chauds, rerun par rerun.
+
+    profilage.demarrer("dashboard")          # en tête de script
+    with profilage.span("pd.read_excel · Suivi"):
+        df = pd.read_excel(...)
+    ...
+    profilage.panneau()                      # en fin de script (barre latérale)
+
+Chaque rerun Streamlit s'exécute dans son propre thread : les étapes sont
+donc rangées par thread. `panneau()` affiche, si l'interrupteur « ⏱️
+Profilage » est activé, la répartition du rerun en cours (étapes imbriquées
+indentées, reste du script en « autre »).
+
+`@profilage.fragment("nom")` remplace `@st.fragment` : chaque exécution du
+fragment — seul, lors d'une interaction, ou dans un rerun complet — est
+journalisée avec sa durée, à comparer avec la ligne « rerun » d'un rerun
+complet. Le volume de messages envoyés au navigateur (octets) n'est compté
+qu'après `activer_octets()`, appelé par le banc d'essai seulement : le
+comptage enveloppe une API interne de Streamlit (`ctx._enqueue`).
+
+Toutes les étapes — y compris celles des threads d'arrière-plan (Drive,
+écriture différée) — sont aussi écrites en JSON, une ligne par étape, dans
+`logs/profilage_<app>.log` (rotation quotidienne, 30 jours gardés). L'app
+est une variable de contexte posée par `demarrer` : un thread d'arrière-plan
+lancé dans `contextvars.copy_context().run` journalise sous l'app de la page
+qui l'a créé, même quand plusieurs apps partagent le serveur.
+`python -m outils.profilage` résume ces journaux jour par jour pour repérer
+une régression.
+"""
+import argparse
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from logging.handlers import TimedRotatingFileHandler
+from pathlib import Path
+
+LOG_DIR = Path(__file__).resolve().parents[1] / "logs"
+JOURS_GARDES = 30
+
+_local = threading.local()
+_verrou = threading.Lock()
+_journaux = {}  # app -> logging.Logger
+_app = contextvars.ContextVar("profilage_app", default=None)  # app de la page (ou du thread qu'elle a lancé)
+_octets_actifs = False  # comptage des octets envoyés (banc d'essai uniquement)
+
+
+def _journal(app: str) -> logging.Logger:
+    """Logger de l'application (un fichier par app, rotation à minuit)."""
+    with _verrou:
+        if app not in _journaux:
+            journal = logging.getLogger(f"profilage.{app}")
+            journal.setLevel(logging.INFO)
+            journal.propagate = False
+            if not journal.handlers:
+                try:
+                    LOG_DIR.mkdir(parents=True, exist_ok=True)
+                    handler = TimedRotatingFileHandler(
+                        LOG_DIR / f"profilage_{app}.log", when="midnight",
+                        backupCount=JOURS_GARDES, encoding="utf-8", delay=True,
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    journal.addHandler(handler)
+                except OSError:
+                    journal.addHandler(logging.NullHandler())  # dossier non inscriptible : pas de journal
+            _journaux[app] = journal
+        return _journaux[app]
+
+
+# ---------------------------------------------------------------------------
+# ⏱️ API
+# ---------------------------------------------------------------------------
+def activer_octets():
+    """Compte les octets envoyés au navigateur par chaque rerun (banc d'essai)."""
+    global _octets_actifs
+    _octets_actifs = True
+
+
+def _compter_octets():
+    """Compte dans `_local.octets` la taille des messages envoyés par le rerun courant."""
+    if not _octets_actifs:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is None or getattr(ctx, "_profilage_octets", False):
+            return
+        envoyer = ctx._enqueue
+
+        def compter(msg):
+            _local.octets = getattr(_local, "octets", 0) + msg.ByteSize()
+            envoyer(msg)
+
+        ctx._enqueue, ctx._profilage_octets = compter, True
+    except (ImportError, AttributeError):
+        pass  # hors Streamlit, ou API interne différente : pas de comptage
+
+
+def demarrer(app: str):
+    """Début d'un rerun : remet à zéro les étapes du thread courant."""
+    _app.set(app)
+    _local.debut = time.perf_counter()
+    _local.etapes = []
+    _local.profondeur = 0
+    _local.octets = 0
+    _compter_octets()
+    _journal(app)
+
+
+@contextmanager
+def span(nom: str):
+    """Chronomètre le bloc ; enregistré dans le rerun courant et dans le journal."""
+    etapes = getattr(_local, "etapes", None)
+    profondeur = getattr(_local, "profondeur", 0)
+    _local.profondeur = profondeur + 1
+    octets = getattr(_local, "octets", 0)
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        duree = time.perf_counter() - debut
+        _local.profondeur = profondeur
+        envoyes = getattr(_local, "octets", 0) - octets
+        if etapes is not None:
+            etapes.append({"nom": nom, "ms": 1000 * duree, "profondeur": profondeur, "debut": debut,
+                           "octets": envoyes})
+        app = _app.get()
+        if app:
+            mesure = {"t": datetime.now().isoformat(timespec="milliseconds"), "etape": nom,
+                      "ms": round(1000 * duree, 2), "thread": threading.current_thread().name}
+            if envoyes:
+                mesure["octets"] = envoyes
+            _journal(app).info(json.dumps(mesure, ensure_ascii=False))
+
+
+def chrono(nom: str):
+    """Décorateur : `@chrono("PIL · miniature")` équivaut à un `span` autour de l'appel."""
+    def decorateur(fn):
+        @wraps(fn)
+        def enveloppe(*args, **kwargs):
+            with span(nom):
+                return fn(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+
+def fragment(nom: str, **options):
+    """`st.fragment` chronométré : chaque exécution est une étape « fragment · nom » (durée, octets)."""
+    import streamlit as st
+
+    def decorateur(fn):
+        app = _app.get()  # app du script qui déclare le fragment
+
+        @wraps(fn)
+        def enveloppe(*args, **kwargs):
+            # rerun du fragment seul : `demarrer` n'a pas été appelé
+            if app and _app.get() is None:
+                _app.set(app)
+            _compter_octets()
+            with span(f"fragment · {nom}"):
+                return fn(*args, **kwargs)
+        return st.fragment(enveloppe, **options)
+    return decorateur
+
+
+def etapes_rerun() -> tuple:
+    """(étapes du rerun courant dans l'ordre de début, durée écoulée en ms)."""
+    etapes = sorted(getattr(_local, "etapes", []), key=lambda e: e["debut"])
+    debut = getattr(_local, "debut", None)
+    total = 1000 * (time.perf_counter() - debut) if debut else sum(e["ms"] for e in etapes if not e["profondeur"])
+    return etapes, total
+
+
+def panneau():
+    """Interrupteur « ⏱️ Profilage » et tableau du rerun courant (barre latérale)."""
+    import streamlit as st
+
+    etapes, total = etapes_rerun()
+    app = _app.get()
+    if app:
+        mesure = {"t": datetime.now().isoformat(timespec="milliseconds"), "etape": "rerun", "ms": round(total, 2)}
+        if _octets_actifs:
+            mesure["octets"] = getattr(_local, "octets", 0)
+        _journal(app).info(json.dumps(mesure, ensure_ascii=False))
+    with st.sidebar:
+        if not st.toggle("⏱️ Profilage", key="_profilage"):
+            return
+        mesure = sum(e["ms"] for e in etapes if not e["profondeur"])
+        lignes = [{"Étape": "\u2003" * e["profondeur"] + ("↳ " if e["profondeur"] else "") + e["nom"],
+                   "ms": round(e["ms"], 1),
+                   "%": round(100 * e["ms"] / total, 1) if total else 0.0} for e in etapes]
+        lignes.append({"Étape": "autre (script, widgets)", "ms": round(total - mesure, 1),
+                       "%": round(100 * (total - mesure) / total, 1) if total else 0.0})
+        envoyes = f", {getattr(_local, 'octets', 0) / 1024:.0f} Ko envoyés" if _octets_actifs else ""
+        st.caption(f"Rerun : {total:.0f} ms{envoyes} — {len(etapes)} étape(s) mesurée(s)")
+        st.dataframe(lignes, hide_index=True, use_container_width=True)
+
+
+# ---------------------------------------------------------------------------
+# 📜 Lecture des journaux
+# ---------------------------------------------------------------------------
+def resume(dossier=LOG_DIR, app: str = None) -> dict:
+    """{app: {jour: {étape: {n, mediane_ms, p95_ms}}}} à partir des journaux (archives comprises)."""
+    mesures = {}
+    for fichier in sorted(Path(dossier).glob("profilage_*.log*")):
+        nom_app = fichier.name[len("profilage_"):].split(".log")[0]
+        if app and nom_app != app:
+            continue
+        with open(fichier, "r", encoding="utf-8") as f:
+            for ligne in f:
+                try:
+                    m = json.loads(ligne)
+                except ValueError:
+                    continue
+                jour = m["t"][:10]
+                mesures.setdefault(nom_app, {}).setdefault(jour, {}).setdefault(m["etape"], []).append(
+                    (m["ms"], m.get("octets"))
+                )
+
+    def _stats(valeurs):
+        durees = sorted(ms for ms, _ in valeurs)
+        octets = sorted(o for _, o in valeurs if o is not None)
+        stats = {"n": len(durees), "mediane_ms": durees[len(durees) // 2],
+                 "p95_ms": durees[min(len(durees) - 1, int(0.95 * len(durees)))]}
+        if octets:
+            stats["mediane_octets"] = octets[len(octets) // 2]
+        return stats
+
+    return {
+        a: {j: {e: _stats(v) for e, v in sorted(etapes.items())} for j, etapes in sorted(jours.items())}
+        for a, jours in mesures.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Résumé quotidien des journaux de profilage.")
+    parser.add_argument("--dossier", default=str(LOG_DIR))
+    parser.add_argument("--app", help="Limiter à une application (dashboard, ceo, trading_app…)")
+    parser.add_argument("--jours", type=int, default=7, help="Nombre de jours affichés")
+    args = parser.parse_args()
+    for nom_app, jours in resume(args.dossier, args.app).items():
+        print(f"\n=== {nom_app} ===")
+        for jour, etapes in list(jours.items())[-args.jours:]:
+            print(jour)
+            for etape, s in etapes.items():
+                octets = f"   {s['mediane_octets'] / 1024:>8.1f} Ko" if "mediane_octets" in s else ""
+                print(f"  {etape:<40} n={s['n']:<6} médiane {s['mediane_ms']:>9.1f} ms   p95 {s['p95_ms']:>9.1f} ms{octets}")
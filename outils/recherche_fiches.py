@@ -0,0 +1,170 @@
+"""Recherche plein texte dans les fiches de trading (SQLite FTS5).
+
+Index inversé sur les quatre champs texte (propos, hypothèse, procédure,
+constat) dans `data/recherche_fiches.sqlite`. Le tokenizer `unicode61` avec
+`remove_diacritics 2` ignore accents et casse (« hypothèse » = « hypothese »),
+et les apostrophes séparent les mots (« l'analyse » -> « l », « analyse »).
+Chaque mot cherché est aussi un préfixe (« pullback » trouve « pullbacks »),
+ce qui tient lieu de racinisation légère.
+
+Mise à jour incrémentale : une fiche est (ré)indexée à la sauvegarde ; le
+parcours de `data/` (fiches modifiées ou supprimées hors de la saisie) n'est
+refait qu'une fois par `ACTUALISATION_MIN_S`, pas à chaque rerun de la page.
+
+Syntaxe : mots (tous requis), "expression exacte", `OU` entre deux
+alternatives — ex. `"bol 15 minutes" OU pullback`.
+"""
+import html
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+INDEX_FILE = "recherche_fiches.sqlite"
+ACTUALISATION_MIN_S = 60  # intervalle minimal entre deux parcours de data/
+CHAMPS = ["propos", "hypothese", "procedure", "constat"]
+LIBELLES = {"propos": "🧩 Propos", "hypothese": "💡 Hypothèse", "procedure": "⚙️ Procédure", "constat": "👁 Constat"}
+
+_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS fiches USING fts5(
+    chemin UNINDEXED, date UNINDEXED, {", ".join(CHAMPS)},
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS fichiers (
+    chemin    TEXT PRIMARY KEY,
+    mtime_ns  INTEGER NOT NULL
+);
+"""
+
+
+def requete_fts(texte: str) -> str:
+    """Traduit la saisie utilisateur en requête FTS5 (échappée)."""
+    groupes, courant = [], []
+    for phrase, mot in re.findall(r'"([^"]+)"|(\S+)', texte):
+        if mot.upper() in ("OU", "OR"):
+            if courant:
+                groupes.append(courant)
+            courant = []
+            continue
+        if phrase:
+            termes = phrase.replace('"', " ").split()
+            if termes:
+                courant.append('"' + " ".join(termes) + '"')
+        else:
+            mot = mot.replace('"', "")
+            if mot:
+                courant.append(f'"{mot}"*')
+    if courant:
+        groupes.append(courant)
+    return " OR ".join("(" + " AND ".join(g) + ")" for g in groupes)
+
+
+def _surligner(extrait: str) -> str:
+    """Extrait échappé pour l'HTML, termes trouvés entre <mark>."""
+    return html.escape(extrait).replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+class RechercheFiches:
+    """Index FTS5 des fiches sous `base` (data/)."""
+
+    def __init__(self, base="data"):
+        self.base = Path(base)
+        self.chemin = self.base / INDEX_FILE
+        self._verrou = threading.Lock()
+        self._dernier_parcours = None  # time.monotonic() du dernier actualiser() complet
+
+    def _connexion(self) -> sqlite3.Connection:
+        self.base.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.chemin, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # -- Indexation ---------------------------------------------------------
+    def _inserer(self, conn, fiche_json: Path):
+        cle = fiche_json.parent.relative_to(self.base).as_posix()
+        with open(fiche_json, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        conn.execute("DELETE FROM fiches WHERE chemin = ?", (cle,))
+        conn.execute(
+            f"INSERT INTO fiches (chemin, date, {', '.join(CHAMPS)}) VALUES (?, ?, {', '.join('?' * len(CHAMPS))})",
+            [cle, str(data.get("date", ""))] + [str(data.get(c) or "") for c in CHAMPS],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO fichiers (chemin, mtime_ns) VALUES (?, ?)",
+            (cle, fiche_json.stat().st_mtime_ns),
+        )
+
+    def indexer(self, fiche_dir):
+        """Indexe (ou réindexe) une fiche qui vient d'être sauvegardée."""
+        fiche_json = next(Path(fiche_dir).glob("*.json"), None)
+        if fiche_json is None:
+            return
+        with self._verrou, closing(self._connexion()) as conn, conn:
+            self._inserer(conn, fiche_json)
+
+    def actualiser(self, intervalle_s: float = 0.0) -> dict:
+        """Réindexe les fiches nouvelles ou modifiées, retire les fiches supprimées.
+
+        Avec `intervalle_s`, le parcours est sauté (None renvoyé) s'il a déjà eu
+        lieu il y a moins de `intervalle_s` secondes : les fiches saisies entre
+        temps sont déjà indexées par `indexer`.
+        """
+        maintenant = time.monotonic()
+        with self._verrou:
+            if self._dernier_parcours is not None and maintenant - self._dernier_parcours < intervalle_s:
+                return None
+            self._dernier_parcours = maintenant
+
+        presentes = {}
+        for fiche_json in self.base.glob("*/*/*/*/*/*.json"):
+            presentes[fiche_json.parent.relative_to(self.base).as_posix()] = fiche_json
+
+        with self._verrou, closing(self._connexion()) as conn, conn:
+            connues = dict(conn.execute("SELECT chemin, mtime_ns FROM fichiers"))
+            supprimees = [c for c in connues if c not in presentes]
+            a_indexer = [p for c, p in presentes.items() if connues.get(c) != p.stat().st_mtime_ns]
+            for cle in supprimees:
+                conn.execute("DELETE FROM fiches WHERE chemin = ?", (cle,))
+                conn.execute("DELETE FROM fichiers WHERE chemin = ?", (cle,))
+            for fiche_json in a_indexer:
+                try:
+                    self._inserer(conn, fiche_json)
+                except (OSError, ValueError):
+                    continue  # fiche illisible : ignorée jusqu'à sa prochaine modification
+        return {"fiches": len(presentes), "indexees": len(a_indexer), "retirees": len(supprimees)}
+
+    # -- Recherche ----------------------------------------------------------
+    def chercher(self, texte: str, limite: int = 50) -> list:
+        """Fiches classées par pertinence (BM25), avec extraits surlignés par champ."""
+        requete = requete_fts(texte)
+        if not requete:
+            return []
+        extraits = ", ".join(
+            f"snippet(fiches, {i + 2}, char(2), char(3), '…', 16)" for i in range(len(CHAMPS))
+        )
+        with closing(self._connexion()) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT chemin, date, rank, {extraits}
+                FROM fiches WHERE fiches MATCH ?
+                ORDER BY rank LIMIT ?
+                """,
+                (requete, limite),
+            ).fetchall()
+        return [
+            {
+                "chemin": self.base / chemin,
+                "date": date,
+                "score": -score,
+                "extraits": {c: _surligner(e) for c, e in zip(CHAMPS, ext) if "\x02" in e},
+            }
+            for chemin, date, score, *ext in rows
+        ]
+
+    def __len__(self):
+        with closing(self._connexion()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM fichiers").fetchone()[0]
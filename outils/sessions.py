@@ -0,0 +1,324 @@
+"""Stockage des sessions de trading : Parquet en ajout seul, partitionné par mois.
+
+Arborescence :
+    sessions/annee=2025/mois=10/20251030_170238_1a2b3c4d.parquet
+
+Chaque ajout écrit un petit fichier dans la partition du mois de la session
+(coût constant, pas de réécriture de l'historique, pas d'écrasement entre deux
+sessions navigateur). Les lectures ne parcourent que les partitions utiles.
+
+Dès qu'une partition dépasse `SEUIL_COMPACTAGE` fichiers, l'ajout qui la
+fait déborder la fusionne en un seul fichier : le nombre de fichiers lus
+(et de `stat` à chaque lecture) reste borné, pour un coût amorti constant.
+Avant d'écrire le fichier fusionné, la liste des fichiers qu'il remplace est
+posée à côté (`.compact_<id>.fusionnes`) : un lecteur qui voit les deux ignore
+les originaux, il ne lit jamais une ligne deux fois ni une partition vidée.
+"""
+import calendar
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+SESSIONS_DIR = "sessions"
+VERSION_FILE = "_version"
+SEUIL_COMPACTAGE = 100  # fichiers par partition avant fusion
+VERROU_COMPACTAGE = ".compactage"
+VERROU_IMPORT = ".import"
+SUFFIXE_FUSIONNES = ".fusionnes"  # liste des fichiers remplacés par un compact_*.parquet
+VERROU_PERIME_S = 600  # verrou laissé par un processus arrêté en plein compactage
+
+COLONNES = [
+    "Date",
+    "Respect",
+    "Valeur",
+    "Montant",
+    "Erreur_Clé",
+    "Discipline",
+    "Mood",
+    "Commentaire",
+    "Axe_Opérationnel",
+    "Axe_Financier",
+    "Axe_Humain",
+    "Axe_Alignement",
+    "Capture",
+]
+COLONNES_TEXTE = [c for c in COLONNES if c not in ("Date", "Valeur", "Montant")]
+
+
+# ---------------------------------------------------------------------------
+# 🔧 Helpers internes
+# ---------------------------------------------------------------------------
+def _normaliser(df: pd.DataFrame) -> pd.DataFrame:
+    """Aligne colonnes et types pour que toutes les partitions restent compatibles."""
+    df = df.reindex(columns=COLONNES)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["Valeur"] = pd.to_numeric(df["Valeur"], errors="coerce").fillna(0).astype("int64")
+    df["Montant"] = pd.to_numeric(df["Montant"], errors="coerce").fillna(0.0).astype("float64")
+    for col in COLONNES_TEXTE:
+        df[col] = df[col].where(df[col].notna(), "").astype(str)
+    return df
+
+
+def _dossier_partition(racine, annee: int, mois: int) -> Path:
+    return Path(racine) / f"annee={annee:04d}" / f"mois={mois:02d}"
+
+
+def _ecrire_atomique(df: pd.DataFrame, chemin: Path):
+    """Écrit via un fichier temporaire puis renomme : un lecteur ne voit jamais un fichier partiel."""
+    tmp = chemin.with_name(f".{chemin.name}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, chemin)
+
+
+def _publier_version(racine):
+    """Marque une nouvelle version du stockage (un seul fichier réécrit)."""
+    marqueur = Path(racine) / VERSION_FILE
+    tmp = marqueur.with_name(f".{VERSION_FILE}.tmp")
+    tmp.write_text(uuid.uuid4().hex, encoding="utf-8")
+    for essai in range(5):
+        try:
+            os.replace(tmp, marqueur)
+            return
+        except PermissionError:  # Windows : marqueur ouvert au même instant par `version_sessions`
+            if essai == 4:
+                raise
+            time.sleep(0.01)
+
+
+def _prendre_verrou(verrou: Path) -> bool:
+    """Crée le fichier verrou (création exclusive) ; False s'il est déjà pris.
+
+    Un verrou plus vieux que `VERROU_PERIME_S` (processus arrêté en cours de
+    route) est d'abord retiré.
+    """
+    try:
+        if time.time() - verrou.stat().st_mtime > VERROU_PERIME_S:
+            verrou.unlink(missing_ok=True)
+    except FileNotFoundError:
+        pass
+    try:
+        os.close(os.open(verrou, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+def _lister_partition(dossier: Path):
+    """(fichiers à lire, originaux déjà fusionnés, listes de fusion) d'une partition.
+
+    Les `.parquet` sont listés avant les listes de fusion : un original n'est
+    écarté que si le fichier fusionné qui le remplace figure dans ce listage.
+    """
+    parquets = sorted(dossier.glob("*.parquet"))
+    noms = {f.name for f in parquets}
+    listes, remplaces = sorted(dossier.glob(f".*{SUFFIXE_FUSIONNES}")), set()
+    for liste in listes:
+        compact = liste.name[1:-len(SUFFIXE_FUSIONNES)] + ".parquet"
+        if compact not in noms:
+            continue  # fusion interrompue avant l'écriture du fichier fusionné
+        try:
+            remplaces.update(json.loads(liste.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue  # liste retirée entre-temps : les originaux ont disparu aussi
+    lisibles = [f for f in parquets if f.name not in remplaces]
+    return lisibles, [f for f in parquets if f.name in remplaces], listes
+
+
+def _mois_dans_plage(annee: int, mois: int, debut, fin) -> bool:
+    premier = date(annee, mois, 1)
+    dernier = date(annee, mois, calendar.monthrange(annee, mois)[1])
+    if debut is not None and dernier < debut:
+        return False
+    if fin is not None and premier > fin:
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 📂 Partitions
+# ---------------------------------------------------------------------------
+def version_sessions(racine=SESSIONS_DIR):
+    """Clé de version du stockage : l'identifiant écrit dans le marqueur (32 octets lus).
+
+    Sert de clé de cache : elle change à chaque ajout, import ou compactage,
+    même pour deux ajouts dans le même tick d'horloge (un mtime ne suffit pas).
+    Renvoie None si le stockage n'a encore jamais été écrit.
+    """
+    try:
+        return (Path(racine) / VERSION_FILE).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def partitions(racine=SESSIONS_DIR) -> list:
+    """Liste triée des partitions (année, mois) présentes sur disque."""
+    racine = Path(racine)
+    if not racine.exists():
+        return []
+    trouvees = []
+    for dossier_annee in racine.glob("annee=*"):
+        for dossier_mois in dossier_annee.glob("mois=*"):
+            try:
+                annee = int(dossier_annee.name.split("=", 1)[1])
+                mois = int(dossier_mois.name.split("=", 1)[1])
+            except ValueError:
+                continue
+            if any(dossier_mois.glob("*.parquet")):
+                trouvees.append((annee, mois))
+    return sorted(trouvees)
+
+
+def bornes_dates(racine=SESSIONS_DIR):
+    """Premier et dernier jour couverts par les partitions (sans lire les données)."""
+    parts = partitions(racine)
+    if not parts:
+        return None, None
+    (a0, m0), (a1, m1) = parts[0], parts[-1]
+    return date(a0, m0, 1), date(a1, m1, calendar.monthrange(a1, m1)[1])
+
+
+# ---------------------------------------------------------------------------
+# ✍️ Écriture
+# ---------------------------------------------------------------------------
+def ajouter_session(entree: dict, racine=SESSIONS_DIR) -> Path:
+    """Ajoute une session dans la partition de son mois (coût O(1) amorti)."""
+    df = _normaliser(pd.DataFrame([entree]))
+    quand = df["Date"].iloc[0]
+    if pd.isna(quand):
+        quand = pd.Timestamp(datetime.now())
+        df["Date"] = quand
+    dossier = _dossier_partition(racine, quand.year, quand.month)
+    dossier.mkdir(parents=True, exist_ok=True)
+    chemin = dossier / f"{quand:%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}.parquet"
+    _ecrire_atomique(df, chemin)
+    if sum(1 for _ in dossier.glob("*.parquet")) > SEUIL_COMPACTAGE:
+        _compacter_partition(racine, quand.year, quand.month)
+    _publier_version(racine)
+    return chemin
+
+
+def importer_excel(chemin_excel: str, racine=SESSIONS_DIR) -> int:
+    """Migration initiale : répartit un classeur existant en partitions mensuelles."""
+    return importer_sessions(pd.read_excel(chemin_excel), racine)
+
+
+def migrer_excel(chemin_excel: str, racine=SESSIONS_DIR) -> int:
+    """`importer_excel` une seule fois, même si plusieurs sessions démarrent ensemble.
+
+    Un fichier verrou (création exclusive) sérialise les premiers lancements ;
+    les suivants attendent la fin de l'import puis constatent que le stockage
+    est rempli. Renvoie le nombre de sessions importées (0 si déjà fait).
+    """
+    racine = Path(racine)
+    racine.mkdir(parents=True, exist_ok=True)
+    verrou = racine / VERROU_IMPORT
+    while not _prendre_verrou(verrou):
+        time.sleep(0.2)  # import en cours dans une autre session
+    try:
+        if version_sessions(racine) is not None or partitions(racine):
+            return 0
+        return importer_excel(chemin_excel, racine)
+    finally:
+        verrou.unlink(missing_ok=True)
+
+
+def importer_sessions(df: pd.DataFrame, racine=SESSIONS_DIR) -> int:
+    """Répartit un tableau de sessions en partitions mensuelles (un fichier par mois)."""
+    df = _normaliser(df).dropna(subset=["Date"])
+    for (annee, mois), bloc in df.groupby([df["Date"].dt.year, df["Date"].dt.month]):
+        dossier = _dossier_partition(racine, int(annee), int(mois))
+        dossier.mkdir(parents=True, exist_ok=True)
+        _ecrire_atomique(bloc, dossier / f"import_{uuid.uuid4().hex[:8]}.parquet")
+    Path(racine).mkdir(parents=True, exist_ok=True)
+    _publier_version(racine)
+    return len(df)
+
+
+def _compacter_partition(racine, annee: int, mois: int) -> bool:
+    """Fusionne les fichiers d'une partition en un seul ; False si rien à faire ou déjà en cours.
+
+    Un fichier verrou (création exclusive) empêche deux processus de fusionner
+    la même partition. Les ajouts concurrents restent intacts : seuls les
+    fichiers listés au départ sont fusionnés puis supprimés. La liste de
+    fusion est écrite avant le fichier fusionné et retirée après les
+    originaux (voir `_lister_partition`) ; les restes d'une fusion
+    interrompue sont nettoyés au passage.
+    """
+    dossier = _dossier_partition(racine, annee, mois)
+    verrou = dossier / VERROU_COMPACTAGE
+    if not _prendre_verrou(verrou):
+        return False  # compactage en cours ailleurs
+    try:
+        fichiers, remplaces, listes = _lister_partition(dossier)
+        if len(fichiers) < 2:
+            return False
+        bloc = pd.concat([pd.read_parquet(f) for f in fichiers], ignore_index=True)
+        nom = f"compact_{uuid.uuid4().hex[:8]}"
+        liste = dossier / f".{nom}{SUFFIXE_FUSIONNES}"
+        tmp = liste.with_name(f"{liste.name}.tmp")
+        tmp.write_text(json.dumps([f.name for f in fichiers + remplaces]), encoding="utf-8")
+        os.replace(tmp, liste)
+        _ecrire_atomique(bloc.sort_values("Date", kind="stable"), dossier / f"{nom}.parquet")
+        for f in fichiers + remplaces + listes + [liste]:
+            f.unlink(missing_ok=True)
+        return True
+    finally:
+        verrou.unlink(missing_ok=True)
+
+
+def compacter(racine=SESSIONS_DIR) -> int:
+    """Fusionne les petits fichiers de chaque partition en un seul (toutes les partitions)."""
+    fusionnees = sum(_compacter_partition(racine, annee, mois) for annee, mois in partitions(racine))
+    if fusionnees:
+        _publier_version(racine)
+    return fusionnees
+
+
+# ---------------------------------------------------------------------------
+# 📖 Lecture (filtres poussés jusqu'aux partitions)
+# ---------------------------------------------------------------------------
+def lire_sessions(racine=SESSIONS_DIR, annee=None, mois=None, debut=None, fin=None) -> pd.DataFrame:
+    """Lit les sessions en ne touchant que les partitions correspondant aux filtres.
+
+    `annee` et `mois` sont des entiers (le mois seul filtre ce mois sur toutes
+    les années), `debut` / `fin` des dates incluses.
+    """
+    for essai in range(3):
+        fichiers = []
+        for a, m in partitions(racine):
+            if annee is not None and a != int(annee):
+                continue
+            if mois is not None and m != int(mois):
+                continue
+            if not _mois_dans_plage(a, m, debut, fin):
+                continue
+            fichiers.extend(_lister_partition(_dossier_partition(racine, a, m))[0])
+
+        if not fichiers:
+            return _normaliser(pd.DataFrame(columns=COLONNES))
+        try:
+            df = pd.concat([pd.read_parquet(f) for f in fichiers], ignore_index=True)
+            break
+        except FileNotFoundError:
+            if essai == 2:
+                raise
+            # fichiers fusionnés par un compactage pendant la lecture : on relit la liste
+    if debut is not None:
+        df = df[df["Date"].dt.date >= debut]
+    if fin is not None:
+        df = df[df["Date"].dt.date <= fin]
+    return df.sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def exporter_excel(chemin_excel: str, racine=SESSIONS_DIR) -> int:
+    """Exporte l'historique complet vers un classeur Excel (cible d'export uniquement)."""
+    df = lire_sessions(racine)
+    out = df.copy()
+    out["Date"] = out["Date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    out.to_excel(chemin_excel, index=False)
+    return len(out)
@@ -0,0 +1,130 @@
+"""Stockage des captures adressé par contenu (une seule copie par image).
+
+Chaque capture est écrite une fois dans `captures/_blobs/<hash[:2]>/<sha256>.<ext>`.
+L'arborescence datée (`captures/2025/October/Semaine_43/Jour_27/...`) ne
+contient que des références : un lien physique vers le blob (aucun octet
+dupliqué, chemin lisible tel quel), ou à défaut un petit fichier `.ref`
+contenant le chemin du blob — `resoudre()` gère les deux cas.
+
+L'écriture se fait par blocs (hachage au fil de l'eau dans un fichier
+temporaire), sans charger l'image entière en mémoire.
+
+Dédoublonnage des captures existantes :
+    python -m outils.stockage_captures captures
+"""
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+BLOBS = "_blobs"
+TAILLE_BLOC = 1 << 20
+EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+
+def _chemin_blob(racine: Path, hash_: str, ext: str) -> Path:
+    return Path(racine) / BLOBS / hash_[:2] / f"{hash_}{ext.lower()}"
+
+
+def _hash_fichier(chemin) -> str:
+    h = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def stocker(flux, racine="captures", ext: str = ".png") -> Path:
+    """Copie un flux binaire par blocs dans le magasin ; renvoie le chemin du blob.
+
+    Si un blob identique existe déjà, rien n'est conservé du flux.
+    """
+    dossier_blobs = Path(racine) / BLOBS
+    dossier_blobs.mkdir(parents=True, exist_ok=True)
+    h = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(prefix=".~", dir=dossier_blobs)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for bloc in iter(lambda: flux.read(TAILLE_BLOC), b""):
+                h.update(bloc)
+                out.write(bloc)
+        blob = _chemin_blob(racine, h.hexdigest(), ext)
+        if blob.exists():
+            os.remove(tmp)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(tmp, 0o644)  # mkstemp crée le fichier en 0600
+            os.replace(tmp, blob)
+        return blob
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def referencer(blob, cible) -> Path:
+    """Crée la référence `cible` vers `blob` : lien physique, sinon fichier `.ref`."""
+    cible = Path(cible)
+    cible.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cible.with_name(f".{cible.name}.{os.getpid()}.tmp")
+    try:
+        os.link(blob, tmp)
+        os.replace(tmp, cible)
+        return cible
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    ref = cible.with_name(cible.name + ".ref")
+    ref.write_text(os.path.relpath(blob, ref.parent), encoding="utf-8")
+    if cible.exists():
+        cible.unlink()
+    return ref
+
+
+def enregistrer_capture(flux, cible, racine="captures") -> Path:
+    """Stocke une capture envoyée et la référence à son emplacement daté."""
+    blob = stocker(flux, racine, Path(cible).suffix or ".png")
+    return referencer(blob, cible)
+
+
+def resoudre(chemin):
+    """Fichier réellement lisible pour une capture (référence `.ref` suivie) ; None sinon."""
+    if not chemin:
+        return None
+    chemin = Path(chemin)
+    if chemin.suffix != ".ref" and chemin.exists():
+        return chemin
+    ref = chemin if chemin.suffix == ".ref" else chemin.with_name(chemin.name + ".ref")
+    if ref.exists():
+        blob = (ref.parent / ref.read_text(encoding="utf-8").strip()).resolve()
+        return blob if blob.exists() else None
+    return None
+
+
+def dedupliquer(racine="captures") -> dict:
+    """Déplace les captures existantes dans le magasin et les remplace par des références."""
+    racine = Path(racine)
+    stats = {"fichiers": 0, "blobs_crees": 0, "octets_liberes": 0}
+    fichiers = [
+        p for p in racine.rglob("*")
+        if p.is_file() and p.suffix.lower() in EXTENSIONS and BLOBS not in p.relative_to(racine).parts
+    ]
+    for fichier in fichiers:
+        stats["fichiers"] += 1
+        st = fichier.stat()
+        blob = _chemin_blob(racine, _hash_fichier(fichier), fichier.suffix)
+        if blob.exists():
+            if os.path.samefile(blob, fichier):
+                continue  # déjà une référence
+            stats["octets_liberes"] += st.st_size
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(fichier, blob)
+            stats["blobs_crees"] += 1
+        referencer(blob, fichier)
+    return stats
+
+
+if __name__ == "__main__":
+    print(dedupliquer(sys.argv[1] if len(sys.argv) > 1 else "captures"))
@@ -0,0 +1,125 @@
+"""Petit stockage clé / valeur JSON sur Google Drive (un fichier `<clé>.json` par clé).
+
+- L'identifiant Drive de chaque fichier est résolu une fois (requête
+  `ListFile`, création si absent) puis gardé en cache pendant `ttl_id`
+  secondes ; lectures et écritures vont ensuite directement au fichier.
+- Les écritures sont directes et bloquantes : l'écriture différée, avec
+  réessais et persistance, passe par `outils.synchro.MoteurSynchro`
+  (`CibleDrive`).
+- Chaque opération Drive est chronométrée (`latences()`).
+
+Pensé pour de petits états (compteurs, préférences), pas pour des fichiers
+volumineux.
+"""
+import json
+import threading
+import time
+from outils import profilage
+
+OPERATIONS = ("resolution_id", "lecture", "ecriture")
+
+
+class StockDrive:
+    """Clés / valeurs JSON dans un dossier Drive (PyDrive2)."""
+
+    def __init__(self, drive, dossier_id: str, ttl_id: float = 600.0):
+        if not dossier_id:
+            raise RuntimeError("drive_parent_folder_id manquant dans st.secrets[gcp_service_account].")
+        self.drive = drive
+        self.dossier_id = dossier_id
+        self.ttl_id = ttl_id
+        self._ids = {}  # clé -> (id Drive, expiration monotonic)
+        self._verrou = threading.Lock()
+        self._mesures = {op: {"n": 0, "total_s": 0.0, "max_s": 0.0, "derniere_s": None} for op in OPERATIONS}
+
+    # -- Mesures ------------------------------------------------------------
+    def _chrono(self, op: str, fn, *args):
+        debut = time.perf_counter()
+        try:
+            with profilage.span(f"Drive · {op}"):
+                return fn(*args)
+        finally:
+            duree = time.perf_counter() - debut
+            with self._verrou:
+                m = self._mesures[op]
+                m["n"] += 1
+                m["total_s"] += duree
+                m["max_s"] = max(m["max_s"], duree)
+                m["derniere_s"] = duree
+
+    def latences(self) -> dict:
+        """{opération: {n, moyenne_ms, max_ms, derniere_ms}}."""
+        with self._verrou:
+            return {
+                op: {
+                    "n": m["n"],
+                    "moyenne_ms": 1000 * m["total_s"] / m["n"] if m["n"] else None,
+                    "max_ms": 1000 * m["max_s"] if m["n"] else None,
+                    "derniere_ms": None if m["derniere_s"] is None else 1000 * m["derniere_s"],
+                }
+                for op, m in self._mesures.items()
+            }
+
+    # -- Résolution des fichiers -------------------------------------------
+    def _trouver_ou_creer(self, cle: str, defaut) -> str:
+        titre = f"{cle}.json"
+        q = f"title = '{titre}' and trashed = false and '{self.dossier_id}' in parents"
+        resultats = self.drive.ListFile({"q": q}).GetList()
+        if resultats:
+            return resultats[0]["id"]
+        f = self.drive.CreateFile({
+            "title": titre,
+            "parents": [{"id": self.dossier_id}],
+            "mimeType": "application/json",
+        })
+        f.SetContentString(json.dumps(defaut, ensure_ascii=False))
+        f.Upload()
+        return f["id"]
+
+    def _id(self, cle: str, defaut=None) -> str:
+        with self._verrou:
+            id_, expiration = self._ids.get(cle, (None, 0.0))
+        if id_ and time.monotonic() < expiration:
+            return id_
+        id_ = self._chrono("resolution_id", self._trouver_ou_creer, cle, defaut)
+        with self._verrou:
+            self._ids[cle] = (id_, time.monotonic() + self.ttl_id)
+        return id_
+
+    def _oublier(self, cle: str):
+        with self._verrou:
+            self._ids.pop(cle, None)
+
+    def _avec_id(self, cle: str, defaut, action):
+        """Exécute `action(id)` ; si le fichier a disparu, résout l'id à nouveau une fois."""
+        try:
+            return action(self._id(cle, defaut))
+        except Exception:
+            self._oublier(cle)
+            return action(self._id(cle, defaut))
+
+    # -- API ----------------------------------------------------------------
+    def lire(self, cle: str, defaut=None):
+        """Valeur JSON de la clé."""
+        def _lire(id_):
+            return json.loads(self.drive.CreateFile({"id": id_}).GetContentString())
+
+        return self._chrono("lecture", self._avec_id, cle, defaut, _lire)
+
+    def ecrire(self, cle: str, valeur):
+        """Envoi immédiat (bloquant)."""
+        def _ecrire(id_):
+            f = self.drive.CreateFile({"id": id_})
+            f.SetContentString(json.dumps(valeur, ensure_ascii=False))
+            f.Upload()
+
+        self._chrono("ecriture", self._avec_id, cle, valeur, _ecrire)
+
+    def version(self, cle: str, defaut=None) -> str:
+        """Numéro de version Drive du fichier (change à chaque envoi, d'où qu'il vienne)."""
+        def _version(id_):
+            f = self.drive.CreateFile({"id": id_})
+            f.FetchMetadata(fields="version")
+            return str(f["version"])
+
+        return self._chrono("lecture", self._avec_id, cle, defaut, _version)
@@ -0,0 +1,310 @@
+"""Supervision des serveurs Streamlit lancés par le Launcher.
+
+Pour chaque serveur : PID et port suivis, sortie redirigée vers
+`logs/serveur_<nom>.log`, contrôle de santé HTTP (`/_stcore/health`),
+redémarrage automatique s'il s'arrête ou ne répond plus (délai croissant,
+abandon après `MAX_REDEMARRAGES` en 10 minutes), mémoire (RSS) et CPU
+mesurés en continu. `arreter_tout()` arrête proprement les serveurs à la
+fermeture du Launcher (signal d'arrêt, puis kill après délai).
+
+Sous Windows, `terminate()` est un arrêt brutal (TerminateProcess) : les
+serveurs sont donc lancés dans leur propre groupe de processus et reçoivent
+d'abord CTRL_BREAK, que Streamlit traite comme SIGTERM (handlers atexit
+exécutés). Si l'événement ne peut pas être remis (Launcher sans console),
+l'arrêt reste brutal : les écritures en attente du CEO sont journalisées sur
+disque (`outils.ecriture_differee`) et rejouées au démarrage suivant.
+
+Les PID sont notés dans `logs/superviseur.json` : un Launcher relancé
+après un plantage reprend la supervision des serveurs encore vivants au
+lieu d'en démarrer de nouveaux. Un serveur qui répond sur le port sans
+avoir été lancé par le Launcher est signalé « externe » et n'est jamais
+arrêté.
+"""
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+LOG_DIR = Path(__file__).resolve().parents[1] / "logs"
+FICHIER_PIDS = LOG_DIR / "superviseur.json"
+INTERVALLE = 3.0  # s entre deux contrôles
+DELAI_DEMARRAGE = 60.0  # s laissées au serveur pour répondre après lancement
+ECHECS_AVANT_REDEMARRAGE = 3  # contrôles de santé ratés d'affilée
+MAX_REDEMARRAGES = 5  # par fenêtre de 10 minutes
+TAILLE_MAX_LOG = 5 * 2**20
+
+
+def sante(port: int, timeout: float = 1.0) -> bool:
+    """Le serveur Streamlit du port répond-il à /_stcore/health ?"""
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=timeout) as reponse:
+            return reponse.status == 200
+    except OSError:
+        return False
+
+
+class ServeurSupervise:
+    """Un serveur `streamlit run <script>` sur un port donné."""
+
+    def __init__(self, nom: str, script, port: int, cwd=None):
+        self.nom = nom
+        self.script = Path(script)
+        self.port = port
+        self.cwd = Path(cwd or self.script.parent)
+        self.proc = None  # psutil.Popen (lancé ici) ou psutil.Process (repris)
+        self._groupe = False  # lancé ici dans son propre groupe de processus (CTRL_BREAK possible)
+        self.etat = "arrêté"  # arrêté | démarrage | actif | externe | bloqué | en échec
+        self.lance_le = None
+        self.echecs = 0
+        self.redemarrages = []  # instants (monotonic) des redémarrages automatiques
+        self.rss_mo = None
+        self.cpu = None
+        self.derniere_erreur = None
+        self._verrou = threading.RLock()
+        self._stop = threading.Event()  # interrompt l'attente avant un redémarrage
+
+    # -- Cycle de vie -------------------------------------------------------
+    @property
+    def pid(self):
+        return self.proc.pid if self.proc else None
+
+    def vivant(self) -> bool:
+        if self.proc is None:
+            return False
+        if isinstance(self.proc, subprocess.Popen) and self.proc.poll() is not None:
+            return False
+        try:
+            return self.proc.is_running() and self.proc.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+
+    def _journal(self):
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        chemin = LOG_DIR / f"serveur_{self.nom}.log"
+        if chemin.exists() and chemin.stat().st_size > TAILLE_MAX_LOG:
+            os.replace(chemin, chemin.with_suffix(".log.1"))
+        journal = open(chemin, "a", encoding="utf-8")
+        journal.write(f"\n=== {datetime.now():%Y-%m-%d %H:%M:%S} — lancement {self.script.name} :{self.port} ===\n")
+        journal.flush()
+        return journal
+
+    def demarrer(self):
+        """Lance le serveur (ou constate qu'un autre processus sert déjà le port)."""
+        with self._verrou:
+            if self.vivant():
+                return
+            self._stop.clear()
+            if sante(self.port):
+                self.proc, self.etat = None, "externe"
+                return
+            cmd = [
+                sys.executable, "-m", "streamlit", "run", str(self.script),
+                "--server.port", str(self.port),
+                "--server.headless", "true",  # c'est le Launcher qui ouvre le navigateur
+            ]
+            # Sous Windows : pas de fenêtre console, groupe de processus propre (arrêt par CTRL_BREAK)
+            creation_flags = 0
+            if platform.system() == "Windows":
+                creation_flags = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+            journal = self._journal()
+            try:
+                self.proc = psutil.Popen(
+                    cmd, cwd=self.cwd, shell=False, creationflags=creation_flags,
+                    stdin=subprocess.DEVNULL, stdout=journal, stderr=subprocess.STDOUT,
+                )
+            finally:
+                journal.close()  # le processus enfant garde sa propre copie du descripteur
+            self.etat, self.lance_le, self.echecs = "démarrage", time.monotonic(), 0
+            self._groupe = platform.system() == "Windows"
+            self.proc.cpu_percent(None)  # amorce la mesure CPU
+
+    def reprendre(self, pid: int) -> bool:
+        """Reprend la supervision d'un serveur lancé par un Launcher précédent."""
+        try:
+            proc = psutil.Process(pid)
+            if str(self.script) not in " ".join(proc.cmdline()):
+                return False
+        except psutil.Error:
+            return False
+        with self._verrou:
+            self.proc, self.etat, self.lance_le, self.echecs = proc, "démarrage", time.monotonic(), 0
+            self._groupe = False  # groupe de processus inconnu : pas de CTRL_BREAK
+            proc.cpu_percent(None)
+        return True
+
+    def arreter(self, delai: float = 10.0):
+        """Arrêt propre (SIGTERM ; CTRL_BREAK sous Windows), puis kill du processus et de ses enfants après `delai`."""
+        self._stop.set()
+        with self._verrou:
+            proc, self.proc = self.proc, None
+            self.etat = "arrêté"
+        self._terminer(proc, delai, self._groupe)
+
+    @staticmethod
+    def _signal_arret(proc, groupe: bool):
+        """Demande d'arrêt que Streamlit intercepte (arrêt du serveur et handlers atexit)."""
+        if platform.system() == "Windows":
+            if groupe:
+                try:
+                    proc.send_signal(signal.CTRL_BREAK_EVENT)
+                    return
+                except (OSError, ValueError, psutil.Error):
+                    pass  # pas de console commune avec le serveur
+            # TerminateProcess : arrêt brutal, les écritures en attente sont rejouées au démarrage
+        proc.terminate()
+
+    @classmethod
+    def _terminer(cls, proc, delai: float, groupe: bool = False):
+        if proc is None:
+            return
+        try:
+            enfants = proc.children(recursive=True)
+            cls._signal_arret(proc, groupe)
+            _, restants = psutil.wait_procs([proc], timeout=delai)
+            for p in restants + enfants:
+                try:
+                    p.kill()
+                except psutil.Error:
+                    pass
+            psutil.wait_procs(restants + enfants, timeout=5)
+        except (psutil.Error, OSError):
+            pass
+
+    # -- Surveillance -------------------------------------------------------
+    def _redemarrer(self, raison: str):
+        maintenant = time.monotonic()
+        self.redemarrages = [t for t in self.redemarrages if maintenant - t < 600]
+        proc, self.proc = self.proc, None
+        self._terminer(proc, delai=5.0, groupe=self._groupe)  # y compris avant abandon : un serveur bloqué garde sa RAM
+        if len(self.redemarrages) >= MAX_REDEMARRAGES:
+            self.etat = "en échec"
+            self.derniere_erreur = f"{datetime.now():%H:%M:%S} — {raison} ; trop de redémarrages, abandon"
+            return
+        self.derniere_erreur = f"{datetime.now():%H:%M:%S} — {raison}"
+        self.etat = "démarrage"
+        if self._stop.wait(min(30, 2 ** len(self.redemarrages))):  # 1, 2, 4, 8, 16 s
+            return  # arrêt demandé pendant l'attente
+        self.redemarrages.append(time.monotonic())
+        self.demarrer()
+
+    def controler(self):
+        """Un passage de surveillance : santé, redémarrage si besoin, mesures."""
+        with self._verrou:
+            if self.etat in ("arrêté", "en échec"):
+                return
+            if self.etat == "externe":
+                if not sante(self.port):
+                    self.etat = "arrêté"  # le serveur externe s'est arrêté : on ne le relance pas de force
+                return
+            if not self.vivant():
+                code = self.proc.poll() if isinstance(self.proc, subprocess.Popen) else None
+                self._redemarrer("processus arrêté" + (f" (code {code})" if code is not None else ""))
+                return
+            if sante(self.port):
+                self.etat, self.echecs = "actif", 0
+            elif self.etat == "démarrage" and time.monotonic() - self.lance_le < DELAI_DEMARRAGE:
+                pass  # encore en train de démarrer
+            else:
+                self.echecs += 1
+                self.etat = "bloqué"
+                if self.echecs >= ECHECS_AVANT_REDEMARRAGE:
+                    self._redemarrer("ne répond plus")
+                    return
+            self._mesurer()
+
+    def _mesurer(self):
+        try:
+            procs = [self.proc] + self.proc.children(recursive=True)
+            self.rss_mo = sum(p.memory_info().rss for p in procs) / 2**20
+            self.cpu = self.proc.cpu_percent(None)
+        except psutil.Error:
+            self.rss_mo = self.cpu = None
+
+    def resume(self) -> dict:
+        """Instantané pour l'affichage (sans verrou : ne bloque jamais l'interface)."""
+        return {
+            "nom": self.nom, "etat": self.etat, "pid": self.pid, "port": self.port,
+            "rss_mo": self.rss_mo, "cpu": self.cpu, "redemarrages": len(self.redemarrages),
+            "erreur": self.derniere_erreur,
+        }
+
+
+class Superviseur:
+    """Ensemble de serveurs surveillés par un thread d'arrière-plan."""
+
+    def __init__(self, serveurs, intervalle: float = INTERVALLE):
+        self.serveurs = {s.nom: s for s in serveurs}
+        self.intervalle = intervalle
+        self._arret = threading.Event()
+        self._reprendre()
+        self._thread = threading.Thread(target=self._boucle, name="superviseur", daemon=True)
+        self._thread.start()
+
+    def _reprendre(self):
+        try:
+            with open(FICHIER_PIDS, "r", encoding="utf-8") as f:
+                pids = json.load(f)
+        except (OSError, ValueError):
+            return
+        for nom, info in pids.items():
+            serveur = self.serveurs.get(nom)
+            if serveur and info.get("port") == serveur.port:
+                serveur.reprendre(info["pid"])
+
+    def _noter_pids(self):
+        pids = {s.nom: {"pid": s.pid, "port": s.port} for s in self.serveurs.values() if s.pid}
+        try:
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = FICHIER_PIDS.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(pids, f)
+            os.replace(tmp, FICHIER_PIDS)
+        except OSError:
+            pass
+
+    def assurer(self, nom: str, attendre: float = DELAI_DEMARRAGE) -> bool:
+        """Démarre le serveur si besoin et attend qu'il réponde ; True s'il est joignable."""
+        serveur = self.serveurs[nom]
+        if serveur.etat == "en échec":
+            serveur.redemarrages.clear()  # relance manuelle : nouvelle chance
+        serveur.demarrer()
+        self._noter_pids()
+        limite = time.monotonic() + attendre
+        while time.monotonic() < limite:
+            if sante(serveur.port):
+                return True
+            if not serveur.vivant() and serveur.etat != "externe":
+                return False
+            time.sleep(0.5)
+        return False
+
+    def etat(self) -> list:
+        return [s.resume() for s in self.serveurs.values()]
+
+    def arreter_tout(self, delai: float = 10.0):
+        """Arrête la surveillance puis chaque serveur lancé par le Launcher."""
+        self._arret.set()
+        for serveur in self.serveurs.values():
+            serveur.arreter(delai)
+        try:
+            FICHIER_PIDS.unlink()
+        except OSError:
+            pass
+
+    def _boucle(self):
+        while not self._arret.wait(self.intervalle):
+            for serveur in self.serveurs.values():
+                try:
+                    serveur.controler()
+                except Exception as e:  # la surveillance ne doit jamais s'arrêter
+                    serveur.derniere_erreur = f"{datetime.now():%H:%M:%S} — {e}"
+            self._noter_pids()
@@ -0,0 +1,237 @@
+"""Synchronisation incrémentale d'un DataFrame vers une feuille Google Sheets.
+
+Au lieu de `clear()` + `update()` du tableau complet (requête qui grossit avec
+l'historique, et feuille vide si l'update échoue), on garde l'image de ce qui
+a déjà été envoyé et on n'envoie que la différence :
+
+- les nouvelles lignes par `append_rows` ;
+- les lignes modifiées par un seul `batch_update` (plages contiguës) ;
+- les lignes en trop par `batch_clear`.
+
+En lecture, `LecteurIncremental` garde le tableau en mémoire et ne
+télécharge que les lignes situées après la dernière ligne connue : une page
+vue sans nouvelle session coûte une requête presque vide au lieu de
+`get_all_records()` sur toute la feuille. La date de modification du
+classeur (Drive `modifiedTime`) est relue à chaque fois : si elle a changé
+sans qu'aucune ligne n'ait été ajoutée, des lignes existantes ont été
+modifiées ou supprimées et la feuille est relue entièrement.
+
+Seule une petite partie de l'API gspread est utilisée (`Worksheet` : `get`,
+`get_all_values`, `update`, `append_rows`, `batch_update`, `batch_clear` ;
+`Spreadsheet.get_lastUpdateTime`) : `tests/doublures.py` l'implémente en
+mémoire pour les essais hors ligne.
+"""
+import math
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+
+
+def _lettre_colonne(n: int) -> str:
+    """1 -> A, 27 -> AA (notation A1)."""
+    lettres = ""
+    while n:
+        n, reste = divmod(n - 1, 26)
+        lettres = chr(65 + reste) + lettres
+    return lettres
+
+
+def _plage(ligne_debut: int, ligne_fin: int, nb_colonnes: int) -> str:
+    return f"A{ligne_debut}:{_lettre_colonne(max(nb_colonnes, 1))}{ligne_fin}"
+
+
+def _cellule(v):
+    """Valeur pandas -> valeur JSON acceptée par l'API Sheets."""
+    if v is None or v is pd.NaT:
+        return ""
+    if isinstance(v, (pd.Timestamp, datetime)):
+        return v.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(v, date):
+        return v.isoformat()
+    if hasattr(v, "item"):  # types NumPy
+        v = v.item()
+    if isinstance(v, float):
+        if math.isnan(v):
+            return ""
+        if v.is_integer():
+            return int(v)
+    return v
+
+
+def _texte(v) -> str:
+    """Forme de comparaison (Sheets renvoie toujours du texte)."""
+    return "" if v is None else str(v)
+
+
+class SyncFeuille:
+    """Envoie vers une feuille uniquement ce qui a changé depuis la dernière synchro.
+
+    Partagée entre sessions (`st.cache_resource`) : un verrou sérialise les
+    envois, chacun calculant sa différence depuis l'état laissé par le précédent.
+    """
+
+    def __init__(self, feuille):
+        self.feuille = feuille
+        self._entete = None
+        self._lignes = None  # lignes de données déjà envoyées (forme texte)
+        self._verrou = threading.Lock()
+        self.requetes = 0
+
+    @property
+    def lignes_synchro(self) -> int:
+        """Nombre de lignes de données présentes côté Sheets."""
+        return len(self._lignes or [])
+
+    def _amorcer(self):
+        # Une seule lecture complète par processus, pour connaître l'état distant
+        valeurs = self.feuille.get_all_values()
+        self.requetes += 1
+        self._entete = valeurs[0] if valeurs else []
+        self._lignes = [list(l) for l in valeurs[1:]]
+
+    def synchroniser(self, df: pd.DataFrame) -> dict:
+        """Aligne la feuille sur `df` ; renvoie le détail de ce qui a été envoyé.
+
+        En cas d'erreur, l'état distant est relu à la synchro suivante.
+        """
+        with self._verrou:
+            if self._lignes is None:
+                self._amorcer()
+            try:
+                return self._envoyer(df)
+            except Exception:
+                self._entete = self._lignes = None
+                raise
+
+    def ajouter(self, df: pd.DataFrame) -> dict:
+        """Ajoute des lignes en fin de feuille (un seul `append_rows`), sans relire le reste."""
+        with self._verrou:
+            if self._lignes is None:
+                self._amorcer()
+            try:
+                return self._ajouter(df)
+            except Exception:
+                self._entete = self._lignes = None
+                raise
+
+    def _ajouter(self, df: pd.DataFrame) -> dict:
+        # Colonnes inconnues de la feuille : ajoutées à droite de l'en-tête
+        stats = {"entete": False, "ajoutees": 0}
+        nouvelles = [str(c) for c in df.columns if str(c) not in (self._entete or [])]
+        if nouvelles:
+            stats["entete"] = True
+            self._entete = (self._entete or []) + nouvelles
+            self.feuille.update(values=[self._entete], range_name="A1")
+            self.requetes += 1
+        lignes = [
+            [_cellule(ligne.get(c)) for c in self._entete]
+            for ligne in df.to_dict("records")
+        ]
+        if lignes:
+            self.feuille.append_rows(lignes, value_input_option="RAW", table_range="A1")
+            self.requetes += 1
+            self._lignes += [[_texte(v) for v in l] for l in lignes]
+        stats["ajoutees"] = len(lignes)
+        return stats
+
+    def _envoyer(self, df: pd.DataFrame) -> dict:
+        entete = [str(c) for c in df.columns]
+        largeur = len(entete)
+        lignes = [[_cellule(v) for v in ligne] for ligne in df.itertuples(index=False, name=None)]
+        textes = [[_texte(v) for v in ligne] for ligne in lignes]
+        stats = {"entete": False, "ajoutees": 0, "modifiees": 0, "effacees": 0}
+
+        if entete != self._entete:
+            self.feuille.update(values=[entete], range_name="A1")
+            self.requetes += 1
+            self._entete = entete
+            stats["entete"] = True
+
+        # Lignes existantes modifiées, regroupées en plages contiguës
+        communes = min(len(textes), len(self._lignes))
+        modifiees = [
+            i for i in range(communes)
+            if textes[i] != (self._lignes[i] + [""] * largeur)[:largeur]
+        ]
+        plages, bloc = [], []
+        for i in modifiees:
+            if bloc and i != bloc[-1] + 1:
+                plages.append(bloc)
+                bloc = []
+            bloc.append(i)
+        if bloc:
+            plages.append(bloc)
+        if plages:
+            self.feuille.batch_update([
+                {"range": _plage(b[0] + 2, b[-1] + 2, largeur), "values": [lignes[i] for i in b]}
+                for b in plages
+            ])
+            self.requetes += 1
+            stats["modifiees"] = len(modifiees)
+
+        # Lignes en trop côté Sheets (suppression locale)
+        if len(self._lignes) > len(textes):
+            largeur_max = max([largeur] + [len(l) for l in self._lignes])
+            self.feuille.batch_clear([_plage(len(textes) + 2, len(self._lignes) + 1, largeur_max)])
+            self.requetes += 1
+            stats["effacees"] = len(self._lignes) - len(textes)
+
+        # Nouvelles lignes
+        if len(lignes) > len(self._lignes):
+            nouvelles = lignes[len(self._lignes):]
+            self.feuille.append_rows(nouvelles, value_input_option="RAW", table_range="A1")
+            self.requetes += 1
+            stats["ajoutees"] = len(nouvelles)
+
+        self._lignes = textes
+        return stats
+
+
+class LecteurIncremental:
+    """Copie locale d'une feuille, complétée par les seules lignes nouvelles."""
+
+    def __init__(self, feuille):
+        self.feuille = feuille
+        self._entete = None
+        self._lignes = []
+        self._modifie = None  # `modifiedTime` du classeur lors de la dernière lecture
+        self._verrou = threading.Lock()
+        self.requetes = 0
+
+    def invalider(self):
+        """Force une relecture complète (lignes existantes modifiées ou supprimées)."""
+        with self._verrou:
+            self._entete, self._lignes = None, []
+
+    def _horodatage(self):
+        """Date de modification du classeur (Drive) ; None si l'objet n'en fournit pas."""
+        classeur = getattr(self.feuille, "spreadsheet", None)
+        if classeur is None:
+            return None
+        self.requetes += 1
+        return classeur.get_lastUpdateTime()
+
+    def _get(self, plage: str) -> list:
+        self.requetes += 1
+        return [list(l) for l in self.feuille.get(plage, value_render_option="UNFORMATTED_VALUE")]
+
+    def lire(self) -> pd.DataFrame:
+        """Tableau complet (copie), après récupération des lignes ajoutées depuis la dernière lecture."""
+        with self._verrou:
+            modifie = self._horodatage()
+            relire = not self._entete
+            if not relire:
+                debut = len(self._lignes) + 2
+                suite = self._get(f"A{debut}:{_lettre_colonne(len(self._entete))}")
+                self._lignes += suite
+                # Classeur modifié sans ligne nouvelle : lignes existantes modifiées ou supprimées
+                relire = not suite and modifie != self._modifie
+            if relire:
+                valeurs = self._get("A1:ZZ")
+                self._entete = [str(c) for c in valeurs[0]] if valeurs else []
+                self._lignes = valeurs[1:]
+            self._modifie = modifie
+            largeur = len(self._entete)
+            lignes = [(l + [""] * largeur)[:largeur] for l in self._lignes if any(v != "" for v in l)]
+            return pd.DataFrame(lignes, columns=self._entete)
@@ -0,0 +1,349 @@
+"""Moteur de synchronisation local d'abord (Drive / Google Sheets).
+
+Toute écriture est d'abord inscrite dans un journal SQLite local, puis
+l'appel rend la main : l'interface ne dépend jamais du réseau et une
+écriture n'est jamais perdue si Drive ou Sheets sont injoignables.
+
+Un thread d'arrière-plan :
+- pousse les opérations en attente, regroupées par (cible, clé), avec
+  réessais et attente exponentielle en cas d'échec ;
+- tire les changements distants quand leur version (numéro de version
+  Drive, taille / en-tête de la feuille) a changé, et les garde dans le
+  journal pour une lecture hors ligne.
+
+Deux sortes d'opérations :
+- `ecrire(cible, cle, valeur)` : remplace la valeur (seule la dernière
+  est envoyée) ;
+- `ajouter(cible, cle, ligne)` : ajoute une ligne (toutes sont envoyées,
+  dans l'ordre).
+
+Une cible expose `pousser(cle, operations)` (renvoie le nombre
+d'opérations envoyées, ou lève `EnvoiPartiel` si un échec survient après
+un premier lot parti) et `tirer(cle, version)` ; `CibleDrive` et
+`CibleSheets` adaptent `StockDrive` et `SyncFeuille`.
+
+Une opération envoyée quitte le journal aussitôt, dans sa propre
+transaction, avant toute relecture distante : si la relecture échoue, elle
+n'est jamais renvoyée (pas de ligne ajoutée deux fois).
+
+Tests de bout en bout contre les doublures en mémoire :
+    python -m pytest tests/test_synchro.py
+"""
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+REMPLACER, AJOUTER = "remplacer", "ajouter"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    cible        TEXT    NOT NULL,
+    cle          TEXT    NOT NULL,
+    type         TEXT    NOT NULL,
+    valeur       TEXT    NOT NULL,
+    cree         TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_operations_cle ON operations (cible, cle, id);
+CREATE TABLE IF NOT EXISTS distant (
+    cible        TEXT    NOT NULL,
+    cle          TEXT    NOT NULL,
+    version      TEXT,
+    valeur       TEXT,
+    tire         TEXT,
+    PRIMARY KEY (cible, cle)
+);
+"""
+
+
+def _appliquer(valeur, operations):
+    """Valeur après application des opérations [(type, valeur)] dans l'ordre."""
+    for type_, v in operations:
+        if type_ == REMPLACER:
+            valeur = v
+        else:
+            valeur = (list(valeur) if isinstance(valeur, list) else []) + [v]
+    return valeur
+
+
+class EnvoiPartiel(Exception):
+    """Échec au milieu d'un envoi : les `envoyees` premières opérations sont parties."""
+
+    def __init__(self, envoyees: int, cause: Exception):
+        super().__init__(str(cause))
+        self.envoyees = envoyees
+        self.cause = cause
+
+
+# ---------------------------------------------------------------------------
+# 🎯 Cibles distantes
+# ---------------------------------------------------------------------------
+class CibleDrive:
+    """Valeurs JSON dans Drive, via `StockDrive` (version = numéro de version du fichier)."""
+
+    def __init__(self, stock):
+        self.stock = stock
+
+    def pousser(self, cle: str, operations: list) -> int:
+        # Remplacements uniquement : la dernière valeur suffit
+        self.stock.ecrire(cle, operations[-1][1])
+        return len(operations)
+
+    def tirer(self, cle: str, version):
+        distante = self.stock.version(cle)
+        if distante == version:
+            return None
+        return distante, self.stock.lire(cle)
+
+
+class CibleSheets:
+    """Feuille Google Sheets, via `SyncFeuille` (ajouts) et `LecteurIncremental` (lecture)."""
+
+    def __init__(self, sync, lecteur):
+        self.sync = sync
+        self.lecteur = lecteur
+
+    def pousser(self, cle: str, operations: list) -> int:
+        # Les ajouts consécutifs partent en un seul append_rows ; un remplacement
+        # envoie la différence avec l'état connu de la feuille.
+        envoyees, lot = 0, []
+        try:
+            for type_, valeur in operations + [(None, None)]:
+                if type_ == AJOUTER:
+                    lot.append(valeur)
+                    continue
+                if lot:
+                    if self.sync.ajouter(pd.DataFrame(lot))["entete"]:
+                        self.lecteur.invalider()  # nouvelles colonnes : relecture complète
+                    envoyees, lot = envoyees + len(lot), []
+                if type_ == REMPLACER:
+                    self.sync.synchroniser(pd.DataFrame(valeur))
+                    self.lecteur.invalider()
+                    envoyees += 1
+        except Exception as e:
+            if envoyees:
+                raise EnvoiPartiel(envoyees, e) from e
+            raise
+        return envoyees
+
+    def tirer(self, cle: str, version):
+        df = self.lecteur.lire()
+        contenu = df.to_json(orient="records", force_ascii=False)
+        # Empreinte du contenu : une cellule modifiée change la version, pas seulement une ligne ajoutée
+        distante = f"{len(df)}:{hashlib.sha1(contenu.encode('utf-8')).hexdigest()}"
+        if distante == version:
+            return None
+        return distante, json.loads(contenu)
+
+
+# ---------------------------------------------------------------------------
+# ⚙️ Moteur
+# ---------------------------------------------------------------------------
+class MoteurSynchro:
+    """Journal local + synchronisation d'arrière-plan vers des cibles distantes."""
+
+    def __init__(self, journal: str, cibles: dict, intervalle: float = 30.0,
+                 delai_max: float = 300.0, demarrer: bool = True):
+        self.journal = journal
+        self.cibles = cibles
+        self.intervalle = intervalle
+        self.delai_max = delai_max
+        self._suivies = set()  # (cible, clé) à tirer périodiquement
+        self._echecs = {}  # cible -> (nb échecs consécutifs, prochain essai monotonic)
+        self._verrou = threading.Lock()
+        self._cond = threading.Condition()
+        self.derniere_synchro = None
+        self.dernieres_erreurs = {}
+
+        with closing(self._connexion()) as conn:
+            conn.executescript(_SCHEMA)
+        self._thread = None
+        if demarrer:
+            # Contexte copié : les étapes Drive / Sheets sont journalisées sous l'app qui a créé le moteur
+            self._thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(self._boucle,), name="synchro", daemon=True
+            )
+            self._thread.start()
+
+    def _connexion(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.journal, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # -- Écritures (locales, immédiates) ------------------------------------
+    def _inscrire(self, cible: str, cle: str, type_: str, valeur):
+        if cible not in self.cibles:
+            raise KeyError(f"Cible inconnue : {cible}")
+        with self._verrou, closing(self._connexion()) as conn, conn:
+            conn.execute(
+                "INSERT INTO operations (cible, cle, type, valeur, cree) VALUES (?, ?, ?, ?, ?)",
+                (cible, cle, type_, json.dumps(valeur, ensure_ascii=False, default=str),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+        self._suivies.add((cible, cle))
+        with self._cond:
+            self._cond.notify()
+
+    def ecrire(self, cible: str, cle: str, valeur):
+        """Remplace la valeur de `cle` (envoi en arrière-plan)."""
+        self._inscrire(cible, cle, REMPLACER, valeur)
+
+    def ajouter(self, cible: str, cle: str, ligne: dict):
+        """Ajoute une ligne à `cle` (envoi en arrière-plan)."""
+        self._inscrire(cible, cle, AJOUTER, ligne)
+
+    # -- Lecture locale -----------------------------------------------------
+    def version_distante(self, cible: str, cle: str):
+        """Version de la dernière valeur distante tirée (None si jamais tirée).
+
+        Pour une clé jamais tirée, une première lecture distante est tentée
+        (sans bloquer sur une erreur réseau).
+        """
+        self._suivies.add((cible, cle))
+        with closing(self._connexion()) as conn:
+            row = conn.execute(
+                "SELECT version FROM distant WHERE cible = ? AND cle = ?", (cible, cle)
+            ).fetchone()
+        if row is None:
+            try:
+                self._tirer(cible, cle)
+            except Exception as e:
+                self.dernieres_erreurs[cible] = f"{datetime.now():%H:%M:%S} — {e}"
+            with closing(self._connexion()) as conn:
+                row = conn.execute(
+                    "SELECT version FROM distant WHERE cible = ? AND cle = ?", (cible, cle)
+                ).fetchone()
+        return row[0] if row else None
+
+    def lire_distant(self, cible: str, cle: str, defaut=None):
+        """Dernière valeur distante connue, sans les opérations en attente."""
+        self.version_distante(cible, cle)  # premier tirage si besoin
+        with closing(self._connexion()) as conn:
+            distant = conn.execute(
+                "SELECT valeur FROM distant WHERE cible = ? AND cle = ?", (cible, cle)
+            ).fetchone()
+        return json.loads(distant[0]) if distant and distant[0] is not None else defaut
+
+    def operations_en_attente(self, cible: str, cle: str) -> list:
+        """Opérations pas encore envoyées pour `cle` : [(type, valeur)] dans l'ordre."""
+        with closing(self._connexion()) as conn:
+            en_attente = conn.execute(
+                "SELECT type, valeur FROM operations WHERE cible = ? AND cle = ? ORDER BY id", (cible, cle)
+            ).fetchall()
+        return [(type_, json.loads(v)) for type_, v in en_attente]
+
+    def lire(self, cible: str, cle: str, defaut=None):
+        """Vue locale : dernière valeur distante connue + opérations pas encore envoyées."""
+        return _appliquer(self.lire_distant(cible, cle, defaut), self.operations_en_attente(cible, cle))
+
+    # -- Synchronisation ----------------------------------------------------
+    def _pousser(self, cible: str, bilan: dict):
+        with closing(self._connexion()) as conn:
+            rows = conn.execute(
+                "SELECT id, cle, type, valeur FROM operations WHERE cible = ? ORDER BY id", (cible,)
+            ).fetchall()
+        par_cle = {}
+        for id_, cle, type_, valeur in rows:
+            par_cle.setdefault(cle, []).append((id_, type_, json.loads(valeur)))
+
+        for cle, ops in par_cle.items():
+            try:
+                n = self.cibles[cible].pousser(cle, [(t, v) for _, t, v in ops])
+            except EnvoiPartiel as e:
+                self._retirer(cible, cle, ops[:e.envoyees])
+                bilan["envoyees"] += e.envoyees
+                raise e.cause
+            self._retirer(cible, cle, ops[:n])
+            bilan["envoyees"] += n
+            self._tirer(cible, cle)
+
+    def _retirer(self, cible: str, cle: str, ops: list):
+        """Retire du journal des opérations envoyées, dans leur propre transaction.
+
+        Elles sont reportées dans la copie distante locale, sous une version
+        locale : la vue reste stable jusqu'à la prochaine relecture, qui la
+        remplacera (la version ne correspond plus à la version distante).
+        """
+        if not ops:
+            return
+        with self._verrou, closing(self._connexion()) as conn, conn:
+            row = conn.execute(
+                "SELECT version, valeur FROM distant WHERE cible = ? AND cle = ?", (cible, cle)
+            ).fetchone()
+            version, valeur = row if row else (None, None)
+            valeur = _appliquer(json.loads(valeur) if valeur is not None else None, [(t, v) for _, t, v in ops])
+            conn.execute(
+                "INSERT OR REPLACE INTO distant (cible, cle, version, valeur, tire) VALUES (?, ?, ?, ?, ?)",
+                (cible, cle, f"{version}+local{ops[-1][0]}", json.dumps(valeur, ensure_ascii=False, default=str),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            conn.executemany("DELETE FROM operations WHERE id = ?", [(i,) for i, _, _ in ops])
+
+    def _tirer(self, cible: str, cle: str) -> bool:
+        with closing(self._connexion()) as conn:
+            row = conn.execute(
+                "SELECT version FROM distant WHERE cible = ? AND cle = ?", (cible, cle)
+            ).fetchone()
+        resultat = self.cibles[cible].tirer(cle, row[0] if row else None)
+        if resultat is None:
+            return False
+        version, valeur = resultat
+        with self._verrou, closing(self._connexion()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO distant (cible, cle, version, valeur, tire) VALUES (?, ?, ?, ?, ?)",
+                (cible, cle, version, json.dumps(valeur, ensure_ascii=False, default=str),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+        return True
+
+    def synchroniser(self, forcer: bool = False) -> dict:
+        """Une passe complète : pousser puis tirer chaque cible disponible."""
+        bilan = {"envoyees": 0, "tirees": 0, "erreurs": 0}
+        for cible in self.cibles:
+            echecs, prochain = self._echecs.get(cible, (0, 0.0))
+            if not forcer and time.monotonic() < prochain:
+                continue  # en attente avant un nouvel essai
+            try:
+                self._pousser(cible, bilan)
+                for c, cle in sorted(self._suivies):
+                    if c == cible:
+                        bilan["tirees"] += self._tirer(cible, cle)
+                self._echecs.pop(cible, None)
+                self.dernieres_erreurs.pop(cible, None)
+            except Exception as e:
+                echecs += 1
+                attente = min(self.delai_max, 2 ** echecs)
+                self._echecs[cible] = (echecs, time.monotonic() + attente)
+                self.dernieres_erreurs[cible] = f"{datetime.now():%H:%M:%S} — {e}"
+                bilan["erreurs"] += 1
+        self.derniere_synchro = datetime.now()
+        return bilan
+
+    def en_attente(self) -> dict:
+        """Nombre d'opérations non envoyées par cible."""
+        with closing(self._connexion()) as conn:
+            return dict(conn.execute("SELECT cible, COUNT(*) FROM operations GROUP BY cible").fetchall())
+
+    def etat(self) -> dict:
+        return {
+            "en_attente": self.en_attente(),
+            "derniere_synchro": self.derniere_synchro,
+            "erreurs": dict(self.dernieres_erreurs),
+        }
+
+    def _boucle(self):
+        while True:
+            with self._cond:
+                self._cond.wait(timeout=self.intervalle)
+            time.sleep(0.5)  # regroupe les écritures rapprochées
+            try:
+                self.synchroniser()
+            except Exception:
+                pass
@@ -0,0 +1,160 @@
+"""Doublures en mémoire des services Google (essais hors ligne et banc d'essai).
+
+- `FeuilleFactice` : la partie de l'API gspread `Worksheet` utilisée par
+  `outils.sync_sheets`, et son classeur (`spreadsheet.get_lastUpdateTime`) ;
+- `DriveFactice` : la partie de PyDrive2 utilisée par `outils.stockage_drive`
+  (ListFile / CreateFile / versions), avec un interrupteur `panne`.
+"""
+from outils.sync_sheets import _texte
+
+
+class _ClasseurFactice:
+    """`Spreadsheet` gspread réduit à la date de modification (compteur de modifications)."""
+
+    def __init__(self):
+        self.modifications = 0
+
+    def get_lastUpdateTime(self):
+        return f"2025-01-01T00:00:00.{self.modifications:06d}Z"
+
+
+class FeuilleFactice:
+    """Feuille gspread en mémoire (mêmes méthodes, journal des appels)."""
+
+    def __init__(self, valeurs=None):
+        self.valeurs = [list(map(_texte, l)) for l in (valeurs or [])]
+        self.appels = []
+        self.spreadsheet = _ClasseurFactice()
+
+    # -- Outils ------------------------------------------------------------
+    @staticmethod
+    def _coord(a1: str):
+        lettres = "".join(c for c in a1 if c.isalpha())
+        ligne = int("".join(c for c in a1 if c.isdigit()) or 1)
+        col = 0
+        for c in lettres.upper():
+            col = col * 26 + ord(c) - 64
+        return ligne, col
+
+    def _ecrire(self, ligne: int, col: int, valeurs):
+        self.spreadsheet.modifications += 1
+        for i, rang in enumerate(valeurs):
+            r = ligne - 1 + i
+            while len(self.valeurs) <= r:
+                self.valeurs.append([])
+            cible = self.valeurs[r]
+            for j, v in enumerate(rang):
+                c = col - 1 + j
+                while len(cible) <= c:
+                    cible.append("")
+                cible[c] = _texte(v)
+
+    def _tronquer(self):
+        while self.valeurs and not any(self.valeurs[-1]):
+            self.valeurs.pop()
+
+    # -- API gspread ---------------------------------------------------------
+    def row_values(self, ligne: int):
+        self.appels.append(("row_values", ligne))
+        return list(self.valeurs[ligne - 1]) if ligne <= len(self.valeurs) else []
+
+    def get_all_values(self):
+        self.appels.append(("get_all_values",))
+        return [list(l) for l in self.valeurs]
+
+    def get_all_records(self):
+        self.appels.append(("get_all_records",))
+        if not self.valeurs:
+            return []
+        entete = self.valeurs[0]
+        return [dict(zip(entete, l + [""] * (len(entete) - len(l)))) for l in self.valeurs[1:]]
+
+    def get(self, range_name, **kwargs):
+        self.appels.append(("get", range_name))
+        (l1, c1), fin = self._coord(range_name.split(":")[0]), range_name.split(":")[-1]
+        c2 = self._coord(fin)[1] or max([len(l) for l in self.valeurs] + [0])
+        return [list(l[c1 - 1:c2]) for l in self.valeurs[l1 - 1:]]
+
+    def update(self, values, range_name="A1", **kwargs):
+        self.appels.append(("update", range_name, len(values)))
+        self._ecrire(*self._coord(range_name.split(":")[0]), values)
+
+    def append_rows(self, valeurs, value_input_option=None, table_range=None, **kwargs):
+        self.appels.append(("append_rows", len(valeurs)))
+        self._tronquer()
+        self._ecrire(len(self.valeurs) + 1, 1, valeurs)
+
+    def batch_update(self, donnees, **kwargs):
+        self.appels.append(("batch_update", [d["range"] for d in donnees]))
+        for d in donnees:
+            self._ecrire(*self._coord(d["range"].split(":")[0]), d["values"])
+
+    def batch_clear(self, plages):
+        self.appels.append(("batch_clear", list(plages)))
+        self.spreadsheet.modifications += 1
+        for plage in plages:
+            (l1, c1), (l2, c2) = (self._coord(p) for p in plage.split(":"))
+            for r in range(l1 - 1, min(l2, len(self.valeurs))):
+                for c in range(c1 - 1, min(c2, len(self.valeurs[r]))):
+                    self.valeurs[r][c] = ""
+        self._tronquer()
+
+    def clear(self):
+        self.appels.append(("clear",))
+        self.spreadsheet.modifications += 1
+        self.valeurs = []
+
+
+class DriveFactice:
+    """Drive PyDrive2 en mémoire (ListFile / CreateFile / versions), pour les essais hors ligne."""
+
+    def __init__(self):
+        self.fichiers = {}  # id -> {"title", "parents", "contenu", "version"}
+        self.appels = []
+        self.panne = False  # True : chaque appel lève une erreur (réseau coupé)
+
+    def _appel(self, nom):
+        self.appels.append(nom)
+        if self.panne:
+            raise ConnectionError("Drive injoignable")
+
+    def ListFile(self, params):
+        drive = self
+        titre = params["q"].split("title = '")[1].split("'")[0]
+
+        class _Liste:
+            def GetList(self):
+                drive._appel("ListFile")
+                return [{"id": i, "title": f["title"]} for i, f in drive.fichiers.items() if f["title"] == titre]
+
+        return _Liste()
+
+    def CreateFile(self, meta):
+        return _FichierFactice(self, dict(meta))
+
+
+class _FichierFactice(dict):
+    def __init__(self, drive, meta):
+        super().__init__(meta)
+        self._drive = drive
+        self._contenu = None
+
+    def SetContentString(self, contenu):
+        self._contenu = contenu
+
+    def Upload(self):
+        self._drive._appel("Upload")
+        if "id" not in self:
+            self["id"] = f"f{len(self._drive.fichiers) + 1}"
+            self._drive.fichiers[self["id"]] = {"title": self.get("title"), "contenu": None, "version": 0}
+        f = self._drive.fichiers[self["id"]]
+        f["contenu"] = self._contenu
+        f["version"] += 1
+
+    def GetContentString(self):
+        self._drive._appel("GetContentString")
+        return self._drive.fichiers[self["id"]]["contenu"]
+
+    def FetchMetadata(self, fields=None):
+        self._drive._appel("FetchMetadata")
+        self["version"] = self._drive.fichiers[self["id"]]["version"]
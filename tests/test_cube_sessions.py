@@ -0,0 +1,68 @@
+"""Cube OLAP des sessions : agrégats identiques à ceux des sessions brutes."""
+import random
+
+import numpy as np
+import pytest
+
+from outils.cube_sessions import CubeSessions, correlation_binaire
+from outils.donnees_synthetiques import generer_sessions
+
+
+@pytest.fixture(scope="module")
+def df():
+    return generer_sessions(3000, random.Random(1))
+
+
+@pytest.fixture(scope="module")
+def cube(df):
+    """Cube reconstruit sur 2000 sessions puis complété session par session."""
+    cube = CubeSessions()
+    cube.reconstruire(df.iloc[:2000])
+    for entree in df.iloc[2000:].to_dict("records"):
+        cube.ajouter(entree)
+    return cube
+
+
+def test_mesures_par_dimension(df, cube):
+    attendu = df.groupby("Mood")["Montant"].agg(["count", "sum", "mean", "std"])
+    obtenu = cube.agreger(["Mood"]).set_index("Mood")
+    assert (obtenu["n"] == attendu["count"]).all()
+    assert np.allclose(obtenu["somme"], attendu["sum"])
+    assert np.allclose(obtenu["moyenne"], attendu["mean"])
+    assert np.allclose(obtenu["ecart_type"], attendu["std"] * np.sqrt((attendu["count"] - 1) / attendu["count"]))
+
+
+def test_filtres_plage_et_egalite(df, cube):
+    debut, fin = df["Date"].iloc[500].date(), df["Date"].iloc[2500].date()
+    brut = df[(df["Date"].dt.date >= debut) & (df["Date"].dt.date <= fin) & (df["Discipline"] == "Bonne")]
+    filtre = cube.agreger(["Erreur_Clé"], debut=debut, fin=fin, Discipline="Bonne").set_index("Erreur_Clé")["n"]
+    assert filtre.sort_index().to_dict() == brut["Erreur_Clé"].value_counts().sort_index().to_dict()
+
+
+def test_pnl_journalier(df, cube):
+    annee = int(df["Date"].dt.year.iloc[-1])
+    pnl = df[df["Date"].dt.year == annee].groupby(df["Date"].dt.normalize())["Montant"].sum()
+    assert np.allclose(cube.pnl_journalier(annee=annee).to_numpy(), pnl.sort_index().to_numpy())
+
+
+def test_correlation_binaire(df, cube):
+    groupes = cube.agreger(["Respect"])
+    r = correlation_binaire(groupes, groupes["Respect"].str.contains("✅"))
+    assert np.isclose(r, np.corrcoef(df["Montant"], df["Respect"].str.contains("✅").astype(float))[0, 1])
+
+
+def test_ajout_sur_version_perimee_ignore(df):
+    # Course entre deux sessions : B reconstruit (ligne de A incluse) avant que A n'ajoute
+    cube = CubeSessions()
+    cube.reconstruire(df.iloc[:11], version="v2")
+    cube.ajouter(df.iloc[10].to_dict(), "v1", "v2")
+    assert cube.version is None
+    assert cube.agreger()["n"].iloc[0] == 11
+
+
+def test_ajout_sur_bonne_version_applique(df):
+    cube = CubeSessions()
+    cube.reconstruire(df.iloc[:10], version="v1")
+    cube.ajouter(df.iloc[10].to_dict(), "v1", "v2")
+    assert cube.version == "v2"
+    assert cube.agreger()["n"].iloc[0] == 11
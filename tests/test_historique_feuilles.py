@@ -0,0 +1,33 @@
+"""Historique des feuilles CEO : différences de cellules et vues à une date."""
+import pandas as pd
+
+from outils import historique_feuilles as historique
+
+
+def test_vue_a_une_date(tmp_path):
+    db = str(tmp_path / "h.sqlite")
+    df = pd.DataFrame({"A": [1, 2, 3], "B": ["x", "y", "z"]})
+    assert historique.enregistrer(db, "S", df, "2025-01-01 10:00:00") == 6
+    df2 = df.copy()
+    df2.loc[1, "A"] = 9
+    assert historique.enregistrer(db, "S", df2, "2025-01-02 10:00:00") == 1  # seule la cellule modifiée
+    assert historique.enregistrer(db, "S", df2, "2025-01-02 11:00:00") == 0  # rien de neuf : pas de version
+    df3 = df2.iloc[:2].assign(C=[None, 5])
+    historique.enregistrer(db, "S", df3, "2025-01-03 10:00:00")
+
+    assert historique.horodatages(db, "S") == ["2025-01-01 10:00:00", "2025-01-02 10:00:00", "2025-01-03 10:00:00"]
+    assert historique.etat_a(db, "S", "2025-01-01 12:00:00")[1]["A"].tolist() == [1, 2, 3]
+    assert historique.etat_a(db, "S", "2025-01-02 12:00:00")[1]["A"].tolist() == [1, 9, 3]
+    version, dernier = historique.etat_a(db, "S")
+    assert version == "2025-01-03 10:00:00"
+    assert list(dernier.columns) == ["A", "B", "C"] and dernier["C"].tolist()[1] == 5
+    assert historique.etat_a(db, "S", "2024-12-31 00:00:00") == (None, None)
+
+
+def test_import_garde_les_colonnes_vides(tmp_path):
+    db = str(tmp_path / "h.sqlite")
+    ancienne = pd.DataFrame({"Horodatage": ["2024-01-01 09:00:00"] * 2 + ["2024-02-01 09:00:00"],
+                             "A": [1, 2, 3], "Note": [None, None, "ok"]})
+    assert historique.importer_snapshots(db, "L", ancienne) == 2
+    _, janvier = historique.etat_a(db, "L", "2024-01-15 00:00:00")
+    assert list(janvier.columns) == ["A", "Note"] and janvier["Note"].isna().all()
@@ -0,0 +1,92 @@
+"""Indicateurs des sessions : calcul vectorisé, mise à jour incrémentale, versions."""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from outils.cube_sessions import CubeSessions
+from outils.donnees_synthetiques import generer_sessions
+from outils.metriques import MetriquesSessions, calculer, glissant
+
+
+def _naif(montants, valeurs, capital):
+    """Référence en Python pur (boucle)."""
+    equite, pic, dd_max, dd_max_pct, courant, records = capital, capital, 0.0, 0.0, {}, {}
+    for m, v in zip(montants, valeurs):
+        equite += m
+        pic = max(pic, equite)
+        dd_max = max(dd_max, pic - equite)
+        if pic > 0:
+            dd_max_pct = max(dd_max_pct, (pic - equite) / pic)
+        for nom, vrai in (("gains", m > 0), ("pertes", m < 0), ("respect", v > 0)):
+            courant[nom] = courant.get(nom, 0) + 1 if vrai else 0
+            records[nom] = max(records.get(nom, 0), courant[nom])
+    gains = sum(m for m in montants if m > 0)
+    pertes = -sum(m for m in montants if m < 0)
+    return {"drawdown_max": dd_max, "drawdown_max_pct": dd_max_pct, "profit_factor": gains / pertes,
+            **{f"serie_{k}": c for k, c in courant.items()}, **{f"serie_{k}_max": r for k, r in records.items()}}
+
+
+@pytest.fixture(scope="module")
+def df():
+    return generer_sessions(5000, random.Random(2)).sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def complet(df):
+    return calculer(df["Montant"].to_numpy(), df["Valeur"].to_numpy(), 5000.0)
+
+
+def test_calcul_vectorise_egal_a_la_boucle(df, complet):
+    montants, valeurs = df["Montant"].to_numpy(), df["Valeur"].to_numpy()
+    for cle, attendu in _naif(montants, valeurs, 5000.0).items():
+        assert np.isclose(complet[cle], attendu), cle
+    assert np.isclose(complet["esperance"], montants.mean())
+    assert np.isclose(complet["win_rate"], (montants > 0).mean())
+    assert np.isclose(complet["discipline"], (valeurs > 0).mean())
+
+
+def test_ajouter_incremental_egal_au_calcul_complet(df, complet):
+    moteur = MetriquesSessions(5000.0)
+    moteur.reconstruire(df.iloc[:3000], version="v1")
+    for i, entree in enumerate(df.iloc[3000:].to_dict("records")):
+        moteur.ajouter(entree, f"v{i + 1}", f"v{i + 2}")
+    assert moteur.version == "v2001" and len(moteur) == len(df)
+    incremental = moteur.resume()
+    for cle, valeur in complet.items():
+        assert np.isclose(incremental[cle], valeur, equal_nan=True), cle
+
+    annee = int(df["Date"].dt.year.iloc[-1])
+    assert moteur.calculer(annee=annee)["sessions"] == int((df["Date"].dt.year == annee).sum())
+
+    moteur.ajouter({"Date": df["Date"].iloc[0], "Montant": 1.0}, "v2001", "v2002")
+    assert moteur.version is None  # session hors ordre : reconstruction demandée
+
+
+def test_ajout_sur_version_perimee_ignore(df):
+    # Course entre deux sessions : B reconstruit (ligne de A incluse) avant que A n'ajoute
+    moteur = MetriquesSessions(5000.0)
+    moteur.reconstruire(df.iloc[:11], version="v2")
+    moteur.ajouter(df.iloc[10].to_dict(), "v1", "v2")
+    assert moteur.version is None and moteur.resume()["sessions"] == 11
+
+
+def test_cube_et_metriques_sur_versions_differentes(df):
+    # Le cube suit encore v1, les métriques ont été reconstruites sur v2 (ligne incluse)
+    cube, moteur = CubeSessions(), MetriquesSessions(5000.0)
+    cube.reconstruire(df.iloc[:10], version="v1")
+    moteur.reconstruire(df.iloc[:11], version="v2")
+    entree = df.iloc[10].to_dict()
+    cube.ajouter(entree, "v1", "v2")
+    moteur.ajouter(entree, "v1", "v2")
+    assert cube.version == "v2" and cube.agreger()["n"].iloc[0] == 11
+    assert moteur.version is None and moteur.resume()["sessions"] == 11
+
+
+def test_glissant(df):
+    montants = df["Montant"].to_numpy()
+    roulant = glissant(montants, 50)
+    s = pd.Series(montants)
+    assert np.allclose(roulant["pnl"], s.rolling(50).sum(), equal_nan=True)
+    assert np.allclose(roulant["win_rate"], (s > 0).rolling(50).mean(), equal_nan=True)
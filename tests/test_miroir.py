@@ -0,0 +1,48 @@
+"""Miroir Feather des classeurs : relecture identique à pd.read_excel, invalidation."""
+import json
+import time
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from outils.classeur import ecrire_feuilles
+from outils.miroir import MANIFESTE, dossier_miroir, lire, lire_miroir
+
+
+@pytest.fixture
+def classeur(tmp_path):
+    chemin = str(tmp_path / "test.xlsx")
+    ecrire_feuilles(chemin, {
+        "Nombres": pd.DataFrame({"Mois": ["Jan", "Fév"], "Montant": [1200.5, -300.0], "N": [3, 4]}),
+        "Mixte": pd.DataFrame({"Indicateur": ["DD", "Runway"], "Valeur": ["—", 16800]}),
+        "Vide": pd.DataFrame(),
+    })
+    return chemin
+
+
+def test_relecture_identique_au_xlsx(classeur):
+    attendu = pd.read_excel(classeur, sheet_name=None)
+    premiere = lire(classeur)
+    assert dossier_miroir(classeur).exists() and lire_miroir(classeur) is not None
+    relue = lire(classeur)
+    for nom, df in attendu.items():
+        assert premiere[nom].equals(df) and relue[nom].equals(df), nom
+
+
+def test_types_melanges_gardes_en_pickle(classeur):
+    lire(classeur)
+    with open(dossier_miroir(classeur) / MANIFESTE, encoding="utf-8") as f:
+        formats = {e["nom"]: e["format"] for e in json.load(f)["feuilles"]}
+    assert formats["Mixte"] == "pickle" and formats["Nombres"] != "pickle"
+
+
+def test_modification_hors_application_perime_le_miroir(classeur):
+    lire(classeur)
+    # Modification faite « dans Excel » (hors application)
+    wb = load_workbook(classeur)
+    wb["Nombres"]["B2"] = 999
+    time.sleep(0.01)
+    wb.save(classeur)
+    assert lire_miroir(classeur) is None
+    assert lire(classeur)["Nombres"].loc[0, "Montant"] == 999
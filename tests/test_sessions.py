@@ -0,0 +1,68 @@
+"""Stockage Parquet des sessions : versions, compactage, lectures concurrentes."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from outils.sessions import (
+    SEUIL_COMPACTAGE,
+    VERROU_COMPACTAGE,
+    _compacter_partition,
+    ajouter_session,
+    lire_sessions,
+    migrer_excel,
+    version_sessions,
+)
+
+
+def _session(i):
+    return {"Date": pd.Timestamp("2025-03-01 10:00") + pd.Timedelta(minutes=i), "Montant": float(i), "Valeur": 1}
+
+
+def test_version_change_a_chaque_ajout(tmp_path):
+    assert version_sessions(tmp_path) is None
+    versions = set()
+    for i in range(20):  # ajouts rapprochés : souvent dans le même tick de mtime
+        ajouter_session(_session(i), tmp_path)
+        versions.add(version_sessions(tmp_path))
+    assert len(versions) == 20
+    assert len(lire_sessions(tmp_path)) == 20
+
+
+def test_compactage_au_seuil(tmp_path):
+    for i in range(SEUIL_COMPACTAGE + 50):
+        ajouter_session(_session(i), tmp_path)
+    dossier = next(tmp_path.glob("annee=*/mois=*"))
+    assert len(list(dossier.glob("*.parquet"))) <= SEUIL_COMPACTAGE
+    assert lire_sessions(tmp_path)["Montant"].tolist() == [float(i) for i in range(SEUIL_COMPACTAGE + 50)]
+
+
+def test_fichier_fusionne_et_originaux_lus_une_seule_fois(tmp_path, monkeypatch):
+    for i in range(8):
+        ajouter_session(_session(i), tmp_path)
+    dossier = next(tmp_path.glob("annee=*/mois=*"))
+    originaux = sorted(dossier.glob("*.parquet"))
+
+    # Fusion figée après l'écriture du fichier fusionné (lecteur concurrent, ou arrêt brutal)
+    monkeypatch.setattr(Path, "unlink", lambda self, missing_ok=False: None)
+    assert _compacter_partition(tmp_path, 2025, 3)
+    monkeypatch.undo()
+    assert all(f.exists() for f in originaux)
+    assert len(lire_sessions(tmp_path)) == 8
+
+    # Le compactage suivant (verrou abandonné périmé) nettoie les restes
+    (dossier / VERROU_COMPACTAGE).unlink()
+    ajouter_session(_session(8), tmp_path)
+    assert _compacter_partition(tmp_path, 2025, 3)
+    assert len(list(dossier.glob("*.parquet"))) == 1 and not list(dossier.glob(".*.fusionnes"))
+    assert lire_sessions(tmp_path)["Montant"].tolist() == [float(i) for i in range(9)]
+
+
+def test_migration_excel_une_seule_fois(tmp_path):
+    classeur = tmp_path / "discipline.xlsx"
+    pd.DataFrame([_session(i) for i in range(10)]).to_excel(classeur, index=False)
+    racine = tmp_path / "sessions"
+    with ThreadPoolExecutor(4) as pool:
+        importees = list(pool.map(lambda _: migrer_excel(str(classeur), racine), range(4)))
+    assert sorted(importees) == [0, 0, 0, 10]
+    assert len(lire_sessions(racine)) == 10
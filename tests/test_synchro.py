@@ -0,0 +1,140 @@
+"""Moteur de synchronisation local d'abord, contre les doublures Drive / Sheets."""
+import json
+
+import pytest
+
+from outils.stockage_drive import StockDrive
+from outils.sync_sheets import LecteurIncremental, SyncFeuille
+from outils.synchro import CibleDrive, CibleSheets, MoteurSynchro
+from tests.doublures import DriveFactice, FeuilleFactice
+
+
+@pytest.fixture
+def drive():
+    return DriveFactice()
+
+
+@pytest.fixture
+def feuille():
+    return FeuilleFactice([["Date", "Montant"], ["2025-01-01 10:00:00", "10"]])
+
+
+@pytest.fixture
+def nouveau_moteur(tmp_path, drive, feuille):
+    """Fabrique de moteurs sur un même journal (un appel = un redémarrage du processus)."""
+    journal = str(tmp_path / "journal.sqlite")
+
+    def fabriquer(lecteur=None):
+        return MoteurSynchro(
+            journal,
+            {
+                "drive": CibleDrive(StockDrive(drive, "dossier")),
+                "sheets": CibleSheets(SyncFeuille(feuille), lecteur or LecteurIncremental(feuille)),
+            },
+            demarrer=False,
+        )
+
+    return fabriquer
+
+
+def _montants(moteur):
+    return [str(l["Montant"]) for l in moteur.lire("sheets", "sessions")]
+
+
+def test_premiere_lecture_tire_la_feuille(nouveau_moteur):
+    m = nouveau_moteur()
+    assert m.lire("sheets", "sessions") == [{"Date": "2025-01-01 10:00:00", "Montant": "10"}]
+
+
+def test_hors_ligne_puis_reprise_apres_redemarrage(nouveau_moteur, drive, feuille):
+    m = nouveau_moteur()
+    m.lire("sheets", "sessions")
+
+    # Hors ligne : les écritures restent dans le journal et la vue locale les montre
+    drive.panne = True
+    m.ecrire("drive", "mandala", {"value": 3})
+    m.ecrire("drive", "mandala", {"value": 4})
+    m.ajouter("sheets", "sessions", {"Date": "2025-01-02 10:00:00", "Montant": -5})
+    assert m.synchroniser()["erreurs"] == 1
+    assert m.en_attente() == {"drive": 2}
+    assert m.lire("drive", "mandala") == {"value": 4}
+    assert len(feuille.valeurs) == 3
+
+    # Redémarrage du processus : le journal survit, la synchro reprend
+    drive.panne = False
+    m = nouveau_moteur()
+    m._suivies.add(("drive", "mandala"))
+    bilan = m.synchroniser(forcer=True)
+    assert bilan["envoyees"] == 2 and bilan["erreurs"] == 0
+    assert m.en_attente() == {}
+    assert json.loads(next(f["contenu"] for f in drive.fichiers.values())) == {"value": 4}
+
+
+def test_changement_distant_tire_a_la_passe_suivante(nouveau_moteur, feuille):
+    m = nouveau_moteur()
+    m.ajouter("sheets", "sessions", {"Date": "2025-01-02 10:00:00", "Montant": -5})
+    m.synchroniser()
+
+    feuille.append_rows([["2025-01-03 10:00:00", "7"]])  # autre poste
+    assert m.synchroniser()["tirees"] == 1
+    assert _montants(m) == ["10", "-5", "7"]
+
+
+def test_ligne_existante_modifiee_a_distance(nouveau_moteur, feuille):
+    m = nouveau_moteur()
+    m.lire("sheets", "sessions")
+    assert m.synchroniser()["tirees"] == 0
+
+    feuille.update(values=[["2025-01-01 10:00:00", "12"]], range_name="A2")  # correction à la main
+    assert m.synchroniser()["tirees"] == 1
+    assert _montants(m) == ["12"]
+
+
+def test_relecture_en_echec_apres_envoi_ne_renvoie_pas(nouveau_moteur, feuille):
+    lecteur = LecteurIncremental(feuille)
+    m = nouveau_moteur(lecteur)
+    m.lire("sheets", "sessions")
+
+    lire = lecteur.lire
+
+    def quota_depasse():
+        raise ConnectionError("quota dépassé")
+
+    lecteur.lire = quota_depasse
+    m.ajouter("sheets", "sessions", {"Date": "2025-01-02", "Montant": 5})
+    bilan = m.synchroniser()
+    assert bilan["envoyees"] == 1 and bilan["erreurs"] == 1
+    assert m.en_attente() == {}
+    assert _montants(m) == ["10", "5"]  # la vue locale garde la ligne envoyée
+
+    lecteur.lire = lire
+    bilan = m.synchroniser(forcer=True)
+    assert bilan["envoyees"] == 0 and bilan["erreurs"] == 0
+    assert feuille.valeurs[1:] == [["2025-01-01 10:00:00", "10"], ["2025-01-02", "5"]]
+    assert _montants(m) == ["10", "5"]
+
+
+def test_envoi_partiel_ne_renvoie_pas_les_lots_partis(nouveau_moteur, feuille):
+    m = nouveau_moteur()
+    m.lire("sheets", "sessions")
+
+    m.ajouter("sheets", "sessions", {"Date": "2025-01-02 10:00:00", "Montant": 5})
+    m.ecrire("sheets", "sessions", [
+        {"Date": "2025-01-01 10:00:00", "Montant": 12},
+        {"Date": "2025-01-02 10:00:00", "Montant": 5},
+    ])
+    batch_update = feuille.batch_update
+
+    def panne(*args, **kwargs):
+        raise ConnectionError("réseau coupé")
+
+    feuille.batch_update = panne  # le remplacement (lignes modifiées) échoue après l'ajout
+    bilan = m.synchroniser()
+    assert bilan["envoyees"] == 1 and bilan["erreurs"] == 1
+    assert m.en_attente() == {"sheets": 1}
+    assert len(feuille.valeurs) == 3
+
+    feuille.batch_update = batch_update
+    assert m.synchroniser(forcer=True)["envoyees"] == 1
+    assert m.en_attente() == {}
+    assert feuille.valeurs[1:] == [["2025-01-01 10:00:00", "12"], ["2025-01-02 10:00:00", "5"]]
@@ -1,11 +1,20 @@
 import streamlit as st
 import os
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
 
+# Modules communs (dossier outils/ à la racine du projet)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from outils import profilage
+from outils.index_fiches import IndexFiches
+from outils.miniatures import generer
+from outils.recherche_fiches import RechercheFiches
+
 # --- CONFIG GLOBALE ---
 st.set_page_config(page_title="Fiche de Trading", page_icon="📈", layout="wide")
+profilage.demarrer("trading_app")
 
 st.title("📋 Saisie de Fiche")
 
@@ -30,12 +39,19 @@ def sauvegarder_fiche(data, image_file):
     if image_file is not None:
         with open(image_path, "wb") as f:
             f.write(image_file.getbuffer())
+        with profilage.span("PIL · miniatures"):
+            generer(image_path)  # miniature + aperçu WebP, une fois pour toutes
 
     # Enregistrement JSON
     data_path = fiche_dir / f"fiche_{fiche_num}.json"
     with open(data_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
 
+    # Mise à jour de l'index des dates (recherche instantanée dans l'historique)
+    with profilage.span("index · ajout fiche"):
+        IndexFiches("data").ajouter(fiche_dir)
+        RechercheFiches("data").indexer(fiche_dir)  # recherche plein texte
+
     return fiche_num
 
 
@@ -68,3 +84,7 @@ with col2:
             fiche_num = sauvegarder_fiche(fiche_data, image_file)
             st.success(f"✅ Fiche {fiche_num} enregistrée avec succès !")
             st.balloons()
+
+
+# --- PROFILAGE DU RERUN ---
+profilage.panneau()
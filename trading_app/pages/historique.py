@@ -1,11 +1,18 @@
 import streamlit as st
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
-from PIL import Image
+
+# Modules communs (dossier outils/ à la racine du projet)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from outils import profilage
+from outils.index_fiches import ACTUALISATION_MIN_S, IndexFiches
+from outils.miniatures import rendu
 
 # --- CONFIGURATION ---
 st.set_page_config(page_title="Historique par Date", page_icon="📅", layout="wide")
+profilage.demarrer("trading_app")
 
 
 BASE_PATH = Path("data")
@@ -15,28 +22,17 @@ if not BASE_PATH.exists():
 
 
 # --- FONCTIONS ---
+@st.cache_resource(show_spinner=False)
+def _index_fiches():
+    """Index des dates partagé par toutes les sessions (reconstruit s'il manque)."""
+    return IndexFiches(BASE_PATH).charger()
+
+
 def chercher_fiches_par_date(date_selectionnee):
-    """Recherche les fiches du jour (tolérante sur les formats de date)."""
-    date_selectionnee = datetime.combine(date_selectionnee, datetime.min.time())
-    fiches_trouvees = []
-    for fiche_json in BASE_PATH.rglob("*.json"):
-        try:
-            with open(fiche_json, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            fiche_date = str(data.get("date", "")).strip()
-            if not fiche_date:
-                continue
-            for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y"]:
-                try:
-                    parsed = datetime.strptime(fiche_date, fmt)
-                    if parsed.date() == date_selectionnee.date():
-                        fiches_trouvees.append(fiche_json.parent)
-                    break
-                except ValueError:
-                    continue
-        except Exception:
-            continue
-    return sorted(fiches_trouvees, reverse=True)
+    """Recherche les fiches du jour via l'index (tolérant sur les formats de date)."""
+    with profilage.span("index · fiches du jour"):
+        index = _index_fiches().actualiser(ACTUALISATION_MIN_S)
+        return sorted(index.chercher(date_selectionnee), reverse=True)
 
 
 def afficher_fiche_styled(fiche_path: Path):
@@ -45,7 +41,7 @@ def afficher_fiche_styled(fiche_path: Path):
     image_file = fiche_path / "capture.png"
 
     if fiche_json:
-        with open(fiche_json, "r", encoding="utf-8") as f:
+        with profilage.span("json · lecture fiche"), open(fiche_json, "r", encoding="utf-8") as f:
             fiche_data = json.load(f)
 
         st.markdown(f"## 🧾 {fiche_path.name}")
@@ -53,9 +49,14 @@ def afficher_fiche_styled(fiche_path: Path):
         st.divider()
 
         # --- Image ---
+        # Aperçu WebP en cache ; l'original n'est envoyé qu'à la demande
         if image_file.exists():
-            img = Image.open(image_file)
-            st.image(img, caption="Capture associée", use_container_width=True)
+            if st.toggle("🔍 Pleine résolution", key=f"hd_{fiche_path}"):
+                st.image(str(image_file), caption="Capture associée", use_container_width=True)
+            else:
+                with profilage.span("PIL · aperçu capture"):
+                    apercu = rendu(image_file)
+                st.image(str(apercu), caption="Capture associée", use_container_width=True)
 
         # --- Style global ---
         st.markdown(
@@ -127,6 +128,17 @@ else:
     fiche_names = [f.name for f in fiches_du_jour]
     selected_fiche = st.sidebar.selectbox("Fiche trouvée :", fiche_names)
 
+    # Vignettes des fiches du jour (miniatures WebP en cache, jamais l'original)
+    captures = [f for f in fiches_du_jour if (f / "capture.png").exists()]
+    if captures:
+        with profilage.span("PIL · miniatures du jour"):
+            vignettes = [str(rendu(f / "capture.png", "miniature")) for f in captures]
+        st.sidebar.image(vignettes, caption=[f.name for f in captures], use_container_width=True)
+
     st.markdown(f"### 📆 Fiches du {date_selectionnee.strftime('%d %B %Y')}")
     fiche_path = [f for f in fiches_du_jour if f.name == selected_fiche][0]
     afficher_fiche_styled(fiche_path)
+
+
+# --- PROFILAGE DU RERUN ---
+profilage.panneau()
@@ -0,0 +1,91 @@
+import streamlit as st
+import sys
+import json
+import time
+from pathlib import Path
+
+# Modules communs (dossier outils/ à la racine du projet)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from outils import profilage
+from outils.recherche_fiches import ACTUALISATION_MIN_S, LIBELLES, RechercheFiches
+
+# --- CONFIGURATION ---
+st.set_page_config(page_title="Recherche dans les fiches", page_icon="🔎", layout="wide")
+profilage.demarrer("trading_app")
+
+
+BASE_PATH = Path("data")
+if not BASE_PATH.exists():
+    st.info("📭 Aucune fiche enregistrée pour le moment.")
+    st.stop()
+
+
+# --- FONCTIONS ---
+@st.cache_resource(show_spinner=False)
+def _index_recherche():
+    """Index plein texte partagé par toutes les sessions."""
+    return RechercheFiches(BASE_PATH)
+
+
+def afficher_resultat(resultat: dict):
+    """Carte d'un résultat : fiche, date et extraits surlignés."""
+    st.markdown(f"#### 🧾 {resultat['chemin'].name} — {resultat['date']}")
+    for champ, extrait in resultat["extraits"].items():
+        st.markdown(
+            f"<div class='fiche-text'><b>{LIBELLES[champ]}</b> : {extrait}</div>",
+            unsafe_allow_html=True,
+        )
+    with st.expander("Voir la fiche complète"):
+        fiche_json = next(resultat["chemin"].glob("*.json"), None)
+        if fiche_json:
+            with open(fiche_json, "r", encoding="utf-8") as f:
+                fiche_data = json.load(f)
+            for champ, libelle in LIBELLES.items():
+                st.markdown(f"**{libelle}**")
+                st.write(fiche_data.get(champ, ""))
+    st.divider()
+
+
+# --- STYLE ---
+st.markdown(
+    """
+    <style>
+        .fiche-text {
+            background-color: #f9fafb;
+            border-radius: 8px;
+            padding: 10px 12px;
+            margin-bottom: 8px;
+            color: #222;
+            line-height: 1.5;
+        }
+        .fiche-text mark { background-color: #fde68a; padding: 0 2px; border-radius: 3px; }
+    </style>
+    """,
+    unsafe_allow_html=True,
+)
+
+# --- PAGE ---
+st.title("🔎 Recherche dans les fiches")
+st.caption('Mots (tous requis), "expression exacte", OU entre deux alternatives — ex. "bol 15 minutes" OU pullback')
+
+index = _index_recherche()
+with profilage.span("FTS · actualisation index"):
+    index.actualiser(ACTUALISATION_MIN_S)  # au plus une fois par minute ; la saisie indexe déjà ses fiches
+
+texte = st.text_input("Rechercher :", placeholder="pullback, \"bol 15 minutes\"…")
+if texte.strip():
+    debut = time.perf_counter()
+    with profilage.span("FTS · recherche"):
+        resultats = index.chercher(texte, limite=50)
+    duree_ms = 1000 * (time.perf_counter() - debut)
+
+    if not resultats:
+        st.info("😕 Aucune fiche ne correspond.")
+    else:
+        st.caption(f"{len(resultats)} résultat(s) sur {len(index)} fiches — {duree_ms:.0f} ms")
+        for resultat in resultats:
+            afficher_resultat(resultat)
+
+
+# --- PROFILAGE DU RERUN ---
+profilage.panneau()